@@ -0,0 +1,148 @@
+# Cold-start benchmark for the Streamlit app.
+#
+# Every measurement runs in a fresh interpreter, so nothing is imported yet:
+#   1. import time of each app module and heavy dependency, with Streamlit already
+#      imported as it is inside the server
+#   2. the first script run of main.py through AppTest: time until the welcome page has
+#      been sent, time until the whole page (sidebar included) is done, and which heavy
+#      modules that first run loaded
+#   3. run_app.py: time from launch until the server answers its health check
+#
+# Usage:
+#   python benchmarks/import_benchmark.py
+#   python benchmarks/import_benchmark.py --repeat 5 --skip-server
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    "fastf1",
+    "scipy.signal",
+    "plotly.graph_objects",
+    "plotly.subplots",
+    "session_manager",
+    "data_analyser",
+    "chart_creator",
+    "main",
+]
+HEAVY = ["fastf1", "scipy.signal", "plotly.graph_objects"]
+
+IMPORT_SNIPPET = """
+import sys, time
+sys.path.insert(0, {root!r})
+import streamlit
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+FIRST_RUN_SNIPPET = """
+import json, os, sys, time
+sys.path.insert(0, {root!r})
+os.chdir({root!r})
+from streamlit.runtime.forward_msg_queue import ForwardMsgQueue
+from streamlit.testing.v1 import AppTest
+
+WELCOME = "KEY FEATURES"
+stamps = {{}}
+original = ForwardMsgQueue.enqueue
+
+def enqueue(self, msg):
+    if "welcome" not in stamps and WELCOME in str(msg.delta):
+        stamps["welcome"] = time.perf_counter()
+    return original(self, msg)
+
+ForwardMsgQueue.enqueue = enqueue
+at = AppTest.from_file(os.path.join({root!r}, "main.py"), default_timeout = 600)
+start = time.perf_counter()
+at.run()
+done = time.perf_counter()
+print(json.dumps({{
+    "welcome": stamps.get("welcome", done) - start,
+    "complete": done - start,
+    "loaded": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def _python(code):
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd = ROOT, capture_output = True, text = True, check = True
+    )
+    return out.stdout.strip().splitlines()[-1]
+
+
+def measure_imports(repeat):
+    print("Import time in a fresh interpreter (median)")
+    for module in MODULES:
+        times = [float(_python(IMPORT_SNIPPET.format(root = ROOT, module = module))) for _ in range(repeat)]
+        print(f"  {module:22s} {statistics.median(times) * 1000:8.1f} ms")
+
+
+def measure_first_run(repeat):
+    runs = [
+        json.loads(_python(FIRST_RUN_SNIPPET.format(root = ROOT, heavy = HEAVY)))
+        for _ in range(repeat)
+    ]
+    welcome = statistics.median(r["welcome"] for r in runs)
+    complete = statistics.median(r["complete"] for r in runs)
+    print("\nFirst script run of main.py (median)")
+    print(f"  welcome page sent      {welcome * 1000:8.1f} ms")
+    print(f"  page complete          {complete * 1000:8.1f} ms")
+    print(f"  heavy modules loaded   {', '.join(runs[-1]['loaded']) or 'none'}")
+
+
+def measure_server_start():
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        port = s.getsockname()[1]
+
+    env = dict(
+        os.environ,
+        STREAMLIT_SERVER_HEADLESS = "true",
+        STREAMLIT_SERVER_PORT = str(port),
+        STREAMLIT_BROWSER_GATHER_USAGE_STATS = "false",
+    )
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "run_app.py"], cwd = ROOT, env = env,
+        stdout = subprocess.DEVNULL, stderr = subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < 60:
+            try:
+                with urllib.request.urlopen(f"http://localhost:{port}/_stcore/health", timeout = 1) as r:
+                    if r.status == 200:
+                        print(f"\nrun_app.py server ready   {(time.perf_counter() - start) * 1000:8.1f} ms")
+                        return
+            except OSError:
+                time.sleep(0.05)
+        print("\nrun_app.py server did not become healthy within 60 s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Measure cold-start latency of the app")
+    parser.add_argument("--repeat", type = int, default = 3, help = "Fresh interpreters per measurement")
+    parser.add_argument("--skip-server", action = "store_true", help = "Do not launch run_app.py")
+    args = parser.parse_args()
+
+    measure_imports(args.repeat)
+    measure_first_run(args.repeat)
+    if not args.skip_server:
+        measure_server_start()
+
+
+if __name__ == "__main__":
+    main()
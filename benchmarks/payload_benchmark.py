@@ -0,0 +1,123 @@
+# Figure payload benchmark for the two-driver comparison page.
+#
+# Loads a session and compares two drivers through main.py headlessly
+# (streamlit.testing.v1.AppTest), recording every ForwardMsg the script sends. Each
+# encoding runs in a fresh interpreter so no cached figures are shared between them:
+#   plain    figure arrays sent as full-precision float64 (the encoding step disabled)
+#   compact  figure arrays rounded per channel and sent as float32 / small-int typed arrays
+# For the comparison run it reports the bytes of every chart message, the page total and
+# the time from the start of the run until the first chart message was sent (the
+# earliest the browser can start drawing).
+#
+# Usage:
+#   python benchmarks/payload_benchmark.py --year 2024 --gp "Monaco Grand Prix"
+#   F1_SESSION_BUNDLE=/data/f1.f1b python benchmarks/payload_benchmark.py --year 2024 --gp "Monaco Grand Prix"
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RUN_SNIPPET = """
+import json, os, sys, time
+sys.path.insert(0, {root!r})
+os.chdir({root!r})
+from streamlit.runtime.forward_msg_queue import ForwardMsgQueue
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1.element_tree import Selectbox
+
+# AppTest cannot map the driver selectboxes' values back through their format_func;
+# match the formatted option by its driver code instead
+_index = Selectbox.index.fget
+
+def index(self):
+    try:
+        return _index(self)
+    except ValueError:
+        return next(i for i, option in enumerate(self.options) if str(self.value) in option)
+
+Selectbox.index = property(index)
+
+import figure_encoding
+if {mode!r} == "plain":
+    figure_encoding.encode_array = lambda values, decimals: values
+
+messages = []
+original = ForwardMsgQueue.enqueue
+
+def enqueue(self, msg):
+    chart = ""
+    if msg.HasField("delta") and msg.delta.new_element.WhichOneof("type") == "plotly_chart":
+        chart = msg.delta.new_element.plotly_chart.id or "chart"
+    messages.append((time.perf_counter(), msg.ByteSize(), chart))
+    return original(self, msg)
+
+ForwardMsgQueue.enqueue = enqueue
+
+def button(at, label):
+    return next(b for b in at.sidebar.button if b.label == label)
+
+at = AppTest.from_file(os.path.join({root!r}, "main.py"), default_timeout = 600).run()
+at.sidebar.selectbox[0].select({year!r}).run()
+at.sidebar.selectbox[1].select({gp!r}).run()
+button(at, "LOAD SESSION").click().run()
+at.sidebar.radio[0].set_value("Compare Two Drivers").run()
+
+messages.clear()
+start = time.perf_counter()
+button(at, "COMPARE SELECTED DRIVERS").click().run()
+done = time.perf_counter()
+
+charts = [(stamp, size) for stamp, size, chart in messages if chart]
+print(json.dumps({{
+    "charts": [size for _, size in charts],
+    "total": sum(size for _, size, _ in messages),
+    "first_chart": (charts[0][0] - start) if charts else None,
+    "complete": done - start,
+    "exception": [str(e.value) for e in at.exception],
+}}))
+"""
+
+
+def _run(mode, year, gp):
+    code = RUN_SNIPPET.format(root = ROOT, mode = mode, year = year, gp = gp)
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd = ROOT, capture_output = True, text = True, check = True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Measure comparison-page figure payloads")
+    parser.add_argument("--year", type = int, required = True, help = "Season to load")
+    parser.add_argument("--gp", required = True, help = "Grand Prix name, e.g. 'Monaco Grand Prix'")
+    parser.add_argument("--repeat", type = int, default = 3, help = "Fresh interpreters per encoding")
+    args = parser.parse_args()
+
+    results = {}
+    for mode in ("plain", "compact"):
+        runs = [_run(mode, args.year, args.gp) for _ in range(args.repeat)]
+        if runs[-1]["exception"]:
+            print(f"{mode}: app raised {runs[-1]['exception']}")
+            return
+        results[mode] = runs
+
+    print("Comparison page, per chart message (KiB)")
+    plain, compact = results["plain"][-1]["charts"], results["compact"][-1]["charts"]
+    for i, (p, c) in enumerate(zip(plain, compact), start = 1):
+        print(f"  chart {i}: {p / 1024:8.1f} -> {c / 1024:8.1f}  ({c / p:5.1%})")
+
+    print("\nWhole comparison run (median)")
+    for mode, runs in results.items():
+        total = statistics.median(r["total"] for r in runs)
+        first = statistics.median(r["first_chart"] for r in runs if r["first_chart"] is not None)
+        complete = statistics.median(r["complete"] for r in runs)
+        print(f"  {mode:8s} {total / 1024:8.1f} KiB  first chart {first * 1000:7.1f} ms  complete {complete * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
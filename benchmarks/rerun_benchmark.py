@@ -0,0 +1,85 @@
+# Rerun latency / payload benchmark for the Streamlit app.
+#
+# Drives main.py headlessly with streamlit.testing.v1.AppTest and records every
+# ForwardMsg the script sends (the messages the server writes to the websocket).
+# For each scenario it reports the full-page rerun cost (what every widget
+# interaction used to cost) and the share of that run produced by each fragment
+# (what a widget inside that fragment now costs on its own).
+#
+# Usage:
+#   python benchmarks/rerun_benchmark.py                       # welcome page only
+#   python benchmarks/rerun_benchmark.py --year 2024 --gp "Monaco Grand Prix"
+
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+
+from streamlit.runtime.forward_msg_queue import ForwardMsgQueue
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MESSAGES = []
+
+
+def _recording_enqueue(original):
+    def enqueue(self, msg):
+        fragment_id = msg.delta.fragment_id if msg.HasField("delta") else ""
+        MESSAGES.append((time.perf_counter(), msg.ByteSize(), fragment_id))
+        return original(self, msg)
+    return enqueue
+
+
+def measure(label, action):
+    MESSAGES.clear()
+    start = time.perf_counter()
+    action()
+    elapsed = time.perf_counter() - start
+
+    total_bytes = sum(size for _, size, _ in MESSAGES)
+    print(f"\n{label}")
+    print(f"  full rerun: {elapsed * 1000:8.1f} ms  {total_bytes / 1024:8.1f} KiB  ({len(MESSAGES)} msgs)")
+
+    by_fragment = defaultdict(list)
+    for stamp, size, fragment_id in MESSAGES:
+        if fragment_id:
+            by_fragment[fragment_id].append((stamp, size))
+
+    for i, (fragment_id, msgs) in enumerate(by_fragment.items(), start = 1):
+        span = (msgs[-1][0] - msgs[0][0]) * 1000
+        size = sum(s for _, s in msgs)
+        print(f"  fragment {i:2d}: {span:8.1f} ms  {size / 1024:8.1f} KiB  ({len(msgs)} msgs)  [{fragment_id[:12]}]")
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Measure rerun latency and websocket payload per fragment")
+    parser.add_argument("--year", type = int, help = "Season to load (needs FastF1 API access)")
+    parser.add_argument("--gp", help = "Grand Prix name to load, e.g. 'Monaco Grand Prix'")
+    args = parser.parse_args()
+
+    ForwardMsgQueue.enqueue = _recording_enqueue(ForwardMsgQueue.enqueue)
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+
+    at = AppTest.from_file(os.path.join(ROOT, "main.py"), default_timeout = 600)
+    measure("Initial page load", at.run)
+
+    if not (args.year and args.gp):
+        return
+
+    measure("Select year", lambda: at.sidebar.selectbox[0].select(args.year).run())
+    measure("Select Grand Prix", lambda: at.sidebar.selectbox[1].select(args.gp).run())
+    measure("Load session", lambda: at.sidebar.button[0].click().run())
+    measure("Analyse pole position", lambda: at.sidebar.button[2].click().run())
+
+    measure("Switch to comparison mode", lambda: at.sidebar.radio[0].set_value("Compare Two Drivers").run())
+    measure("Compare drivers", lambda: at.sidebar.button[2].click().run())
+
+    drivers = at.sidebar.selectbox(key = "driver2_select").options
+    if len(drivers) > 2:
+        measure("Change driver 2 selectbox", lambda: at.sidebar.selectbox(key = "driver2_select").select_index(2).run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# build_bundle.py
+#
+# Prebuilds qualifying sessions into one read-only, memory-mappable file
+# (session_bundle.f1b by default) so a fresh deployment can serve them without
+# downloading or parsing anything through FastF1. Sessions missing from the
+# bundle are still loaded through FastF1 by the app.
+#
+# Usage:
+#   python build_bundle.py --years 2023 2024
+#   python build_bundle.py --years 2024 --events "Monaco Grand Prix" --output /data/f1.f1b
+
+import argparse
+import os
+import time
+
+import streamlit as st
+
+from data_analyser import DataAnalyser
+from session_bundle import SessionBundle, SessionBundleWriter
+from session_manager import SessionManager
+
+
+def build(years, events, output):
+    session_manager = SessionManager(use_bundle = False)
+    data_analyser = DataAnalyser()
+    fastf1 = session_manager._initialise_fastf1_cache()
+    writer = SessionBundleWriter()
+
+    for year in years:
+        available, message = session_manager.get_available_events_for_year(year)
+        print(message)
+        writer.add_events(year, available)
+
+        for gp_name in available:
+            if events and gp_name not in events:
+                continue
+
+            start = time.perf_counter()
+            try:
+                session = fastf1.get_session(year, gp_name, "Q")
+                session.load()
+            except Exception as e:
+                print(f"  skipped {year} {gp_name}: {e}")
+                continue
+
+            session_key = f"{year} {gp_name} Qualifying"
+            fastest_laps = {}
+            for driver_code in session_manager.get_available_drivers(session):
+                lap, _ = data_analyser.get_compact_lap(session, session_key, driver_code)
+                if lap is not None:
+                    fastest_laps[driver_code] = lap
+
+            lap_samples = data_analyser.get_session_lap_samples(session, session_key)
+            writer.add_session(year, gp_name, session, fastest_laps, lap_samples)
+            print(f"  {year} {gp_name}: {len(fastest_laps)} drivers ({time.perf_counter() - start:.1f}s)")
+
+            # Drop the memoised copies before the next session
+            st.cache_data.clear()
+
+    writer.write(output)
+    print(f"Wrote {output} ({os.path.getsize(output) / 1e6:.1f} MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Prebuild qualifying sessions into a session bundle")
+    parser.add_argument("--years", type = int, nargs = "+", required = True, help = "Seasons to include")
+    parser.add_argument("--events", nargs = "*", help = "Only these Grand Prix names (default: all)")
+    parser.add_argument("--output", default = SessionBundle.DEFAULT_PATH, help = "Bundle file to write")
+    args = parser.parse_args()
+
+    build(args.years, set(args.events or []), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,16 @@
+import copy
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from plotly.colors import sample_colorscale
-import plotly.graph_objects as go
 import numpy as np
 import pandas as pd
+from lap_alignment import ensure_distance, distance_time, common_distance_grid, interp_rows
+from downsampling import lttb_indices, change_point_indices, window_slice
+from figure_encoding import PRECISION, encode_figure, encode_trace
+from derived_channels import with_channels
+from signal_processing import savgol
+from time_loss import LapDelta
+from track_raster import TrackRaster, colorscale_lut, rgba
 
 class ChartCreator:
     def __init__(self):
@@ -18,26 +25,90 @@ class ChartCreator:
             'background': '#0e1117'
         }
 
+        # Level of detail for distance-based line charts: at most point_budget points per
+        # chart (shared by its traces), drawn over x_range metres (None = whole lap)
+        self.point_budget = 2000
+        self.x_range = None
+
+        # Decimal places kept per channel when figure arrays are encoded for sending
+        self.precision = dict(PRECISION)
+
+        # Track maps with more samples than this are drawn as a server-side image plus a
+        # light hover outline instead of vector segments (renderer = "auto")
+        self.raster_point_threshold = 3000
+
     # ---------------- Ensure distance column ----------------
     
     def _ensure_distance(self, telemetry):
-        if "Distance" in telemetry.columns:
-            return telemetry
-
-        telemetry = telemetry.copy()
-        if "X" in telemetry.columns and "Y" in telemetry.columns:
-            dx = telemetry["X"].diff().fillna(0)
-            dy = telemetry["Y"].diff().fillna(0)
-            telemetry["Distance"] = np.cumsum(np.hypot(dx, dy))
-        else:
-            telemetry["Distance"] = np.arange(len(telemetry), dtype = float)
+        return ensure_distance(telemetry)
+
+    def _rotate(self, x, y, rotate_deg):
+        # Rotate circuit coordinates so the track sits the usual way up
+        ang = np.radians(rotate_deg)
+        ca, sa = np.cos(ang), np.sin(ang)
+        return ca * x - sa * y, sa * x + ca * y
+
+    # ---------------- Level of detail ----------------
+
+    def with_detail(self, x_range = None, point_budget = None):
+        # Copy of this creator that draws only x_range (zoom) and/or uses another budget.
+        # A zoomed window gets the whole budget, so narrow windows come out at full resolution.
+        creator = copy.copy(self)
+        creator.x_range = tuple(x_range) if x_range is not None else None
+        if point_budget is not None:
+            creator.point_budget = point_budget
+        return creator
+
+    def _trace_xy(self, x, y, n_traces = 1, steps = False):
+        # Zoom window + shape-preserving downsampling (LTTB) for one line trace.
+        # steps = True for piecewise-constant channels (gear, on/off brake), which are
+        # reduced exactly to their change points.
+        x = np.asarray(x, dtype = float)
+        y = np.asarray(y, dtype = float)
+        window = window_slice(x, self.x_range)
+        x, y = x[window], y[window]
+
+        budget = max(self.point_budget // n_traces, 3) if self.point_budget else None
+        keep = change_point_indices(y) if steps else None
+        if budget is not None and (keep is None or keep.size > budget):
+            keep = lttb_indices(x, y, budget)
+        if keep is None:
+            return x, y
+        return x[keep], y[keep]
+
+    def _zoomed(self, fig):
+        # Fit the distance axis to the zoom window (the 1 km ticks are too coarse there)
+        if self.x_range is not None:
+            fig.update_xaxes(range = list(self.x_range), tickmode = "auto", dtick = None)
+        return fig
 
-        return telemetry
+    def _encoded(self, fig, **channels):
+        # Compact arrays for sending: each listed trace property rounded to its
+        # channel's precision and narrowed (float32 / small ints) to a binary typed array
+        return encode_figure(fig, self.precision, **channels)
+
+    # ---------------- Raster track maps ----------------
+
+    def _use_raster(self, renderer, n_points):
+        if renderer == "raster":
+            return True
+        return renderer == "auto" and n_points > self.raster_point_threshold
+
+    def _hover_outline(self, x, y, customdata, hovertemplate, max_points = 600):
+        # Thin vector line over a raster map that carries the hover labels
+        step = max(1, int(np.ceil(len(x) / max_points)))
+        return go.Scatter(
+            x = x[::step], y = y[::step], customdata = customdata[::step],
+            mode = "lines", line = dict(color = "rgba(120,120,120,0.35)", width = 1),
+            hovertemplate = hovertemplate, showlegend = False
+        )
 
     # ---------------- Comparison Track Map ----------------
     
-    def create_comparison_track_map(self, telemetry1, telemetry2, driver1_code, driver2_code, rotate_deg = 235):
-        # Create track map coloured by which driver was faster at each section
+    def create_comparison_track_map(self, telemetry1, telemetry2, driver1_code, driver2_code, rotate_deg = 235, renderer = "auto"):
+        # Create track map coloured by which driver was faster at each section.
+        # renderer: "vector", "raster" (server-side image at full sample resolution) or
+        # "auto" (raster above raster_point_threshold samples)
         if telemetry1 is None or telemetry1.empty or telemetry2 is None or telemetry2.empty:
             return None
 
@@ -63,22 +134,18 @@ class ChartCreator:
             if np.nanmedian(s2) < 60: 
                 s2 *= 3.6
 
-            # common distance grid over the overlap 
-            lap_m = float(min(d1.max(), d2.max()))
-            d = np.linspace(0.0, lap_m, 2000)
+            raster = self._use_raster(renderer, len(d1) + len(d2))
+
+            # common distance grid over the overlap (every sample's worth when rasterising)
+            d = common_distance_grid([d1, d2], max(2000, len(d1), len(d2)) if raster else 2000)
 
             # interpolate both speeds to common distance
             s1_i = np.interp(d, d1, s1)
             s2_i = np.interp(d, d2, s2)
 
-            # --- smoothing to remove GPS jitter ---
-            try:
-                from scipy.signal import savgol_filter
-                win = max(11, (len(d) // 150) * 2 + 1)  # odd window ~1–3% of lap
-                s1_i = savgol_filter(s1_i, win, 2)
-                s2_i = savgol_filter(s2_i, win, 2)
-            except Exception:
-                pass
+            # --- smoothing to remove GPS jitter (both speeds in one pass) ---
+            win = max(11, (len(d) // 150) * 2 + 1)  # odd window ~1–3% of lap
+            s1_i, s2_i = savgol(np.vstack((s1_i, s2_i)), win, 2)
 
             # speed difference at same distance (positive => driver1 faster)
             speed_diff = s1_i - s2_i
@@ -88,48 +155,60 @@ class ChartCreator:
             y1_i = np.interp(d, d1, y1)
 
             # rotation
-            ang = np.radians(rotate_deg)
-            ca, sa = np.cos(ang), np.sin(ang)
-            xr = ca * x1_i - sa * y1_i
-            yr = sa * x1_i + ca * y1_i
-
-            # masked segments for colouring without breaking path order
-            # Positive differences (driver1 faster)
-            x_pos = [x if dd >= 0 else None for x, dd in zip(xr, speed_diff)]
-            y_pos = [y if dd >= 0 else None for y, dd in zip(yr, speed_diff)]
-            cd_pos = [dd if dd >= 0 else None for dd in speed_diff]
-
-            # Negative differences (driver2 faster)
-            x_neg = [x if dd < 0 else None for x, dd in zip(xr, speed_diff)]
-            y_neg = [y if dd < 0 else None for y, dd in zip(yr, speed_diff)]
-            cd_neg = [abs(dd) if dd < 0 else None for dd in speed_diff]  # Use absolute values for display
+            xr, yr = self._rotate(x1_i, y1_i, rotate_deg)
 
             fig = go.Figure()
 
-            # grey outline for full track reference
-            fig.add_trace(go.Scatter(
-                x = xr, y = yr, mode = "lines",
-                line = dict(color = "lightgray", width = 3),
-                showlegend = False, hoverinfo = "skip"
-            ))
+            if raster:
+                # one image: grey outline, then each segment in the faster driver's colour
+                image = TrackRaster(xr, yr)
+                image.draw(xr, yr, rgba("lightgray"), width_px = 10)
+                faster = np.where((speed_diff[:-1] + speed_diff[1:] >= 0)[:, None],
+                                  rgba("#DC143C"), rgba("#0000CD"))
+                image.draw(xr, yr, faster, width_px = 6)
+                image.add_to_figure(fig)
+                fig.add_trace(self._hover_outline(
+                    xr, yr, speed_diff,
+                    f"Δ speed {driver1_code} − {driver2_code}: %{{customdata:+.1f}} km/h<extra></extra>"
+                ))
 
-            # driver2 faster (blue segments)
-            fig.add_trace(go.Scatter(
-                x = x_neg, y = y_neg, mode = "lines",
-                line = dict(color = "#0000CD", width = 2),
-                name = driver2_code, showlegend = False,
-                hovertemplate = f"{driver2_code} faster by: %{{customdata:.1f}} km/h<br>x: %{{x:.0f}}<br>y: %{{y:.0f}}<extra></extra>",
-                customdata = cd_neg, connectgaps = False
-            ))
+            else:
+                # masked segments for colouring without breaking path order (NaN = gap)
+                # Positive differences (driver1 faster)
+                pos = speed_diff >= 0
+                x_pos = np.where(pos, xr, np.nan)
+                y_pos = np.where(pos, yr, np.nan)
+                cd_pos = np.where(pos, speed_diff, np.nan)
+
+                # Negative differences (driver2 faster)
+                x_neg = np.where(~pos, xr, np.nan)
+                y_neg = np.where(~pos, yr, np.nan)
+                cd_neg = np.where(~pos, -speed_diff, np.nan)  # Use absolute values for display
+
+                # grey outline for full track reference
+                fig.add_trace(go.Scatter(
+                    x = xr, y = yr, mode = "lines",
+                    line = dict(color = "lightgray", width = 3),
+                    showlegend = False, hoverinfo = "skip"
+                ))
 
-            # driver1 faster (red segments)
-            fig.add_trace(go.Scatter(
-                x = x_pos, y = y_pos, mode = "lines",
-                line = dict(color = "#DC143C", width = 2),
-                name = driver1_code, showlegend = False,
-                hovertemplate = f"{driver1_code} faster by: %{{customdata:.1f}} km/h<br>x: %{{x:.0f}}<br>y: %{{y:.0f}}<extra></extra>",
-                customdata = cd_pos, connectgaps = False
-            ))
+                # driver2 faster (blue segments)
+                fig.add_trace(go.Scatter(
+                    x = x_neg, y = y_neg, mode = "lines",
+                    line = dict(color = "#0000CD", width = 2),
+                    name = driver2_code, showlegend = False,
+                    hovertemplate = f"{driver2_code} faster by: %{{customdata:.1f}} km/h<br>x: %{{x:.0f}}<br>y: %{{y:.0f}}<extra></extra>",
+                    customdata = cd_neg, connectgaps = False
+                ))
+
+                # driver1 faster (red segments)
+                fig.add_trace(go.Scatter(
+                    x = x_pos, y = y_pos, mode = "lines",
+                    line = dict(color = "#DC143C", width = 2),
+                    name = driver1_code, showlegend = False,
+                    hovertemplate = f"{driver1_code} faster by: %{{customdata:.1f}} km/h<br>x: %{{x:.0f}}<br>y: %{{y:.0f}}<extra></extra>",
+                    customdata = cd_pos, connectgaps = False
+                ))
 
             # legend markers (right hand side)
             fig.add_trace(go.Scatter(
@@ -144,103 +223,507 @@ class ChartCreator:
                 name = f"{driver2_code}", hoverinfo = "skip", showlegend = True
             ))
 
-            # layout
+            self._comparison_map_layout(fig, "Track Map: Speed Advantage by Driver")
+            return self._encoded(fig, x = "position", y = "position", customdata = "speed")
+
+        except Exception as e:
+            print(f"Error creating comparison track map: {e}")
+            return None
+
+    def _comparison_map_layout(self, fig, title):
+        # Equal-aspect track with hidden axes and the driver legend on the right
+        fig.update_xaxes(visible = False, constrain = "domain")
+        fig.update_yaxes(visible = False, scaleanchor = "x", scaleratio = 1, constrain = "domain")
+        fig.update_layout(
+            height = 700, width = 900,
+            margin = dict(l = 20, r = 120, t = 40, b = 20),
+            legend = dict(
+                orientation = "h", yanchor = "middle", y = 0.75,
+                xanchor = "left", x = 1.01,
+                font = dict(size = 16, color = "#444444", family = "Arial")
+            ),
+            title = dict(
+                text = title,
+                font = dict(size = 20, color = "#888888"),
+                x = 0.5, 
+                xanchor = "center"
+            ),
+            plot_bgcolor="white"
+        )
+        return fig
+
+    # ---------------- Ghost Replay ----------------
+
+    def create_ghost_replay_chart(self, replay, frames, driver_colors = None, rotate_deg = 235):
+        # One section of a GhostReplay (frames = (start, stop) frame range) as a plotly
+        # animation: the cars as one marker trace over the track outline, with a play
+        # button and a time slider. Frames are plain dicts that only move that trace.
+        if replay is None or replay.n_frames == 0:
+            return None
+
+        try:
+            from plotly.colors import qualitative
+
+            start, stop = frames
+            driver_colors = driver_colors or {}
+            palette = qualitative.Dark24
+            colors = [driver_colors.get(d) or palette[k % len(palette)] for k, d in enumerate(replay.drivers)]
+
+            # Same rotation as the comparison map; positions rounded to the map's precision
+            decimals = self.precision["position"]
+            ox, oy = self._rotate(replay.outline_x, replay.outline_y, rotate_deg)
+            xr, yr = self._rotate(replay.x[start:stop].astype(float), replay.y[start:stop].astype(float), rotate_deg)
+            xr, yr = np.round(xr, decimals), np.round(yr, decimals)
+            gaps = np.round(replay.gaps(slice(start, stop)), 0)
+            names = [f"{t:.1f}" for t in replay.time[start:stop]]
+
+            def cars(i):
+                return dict(x = xr[i].tolist(), y = yr[i].tolist(), customdata = gaps[i].tolist())
+
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(
+                x = ox, y = oy, mode = "lines",
+                line = dict(color = "lightgray", width = 6),
+                showlegend = False, hoverinfo = "skip"
+            ))
+            fig.add_trace(go.Scatter(
+                **cars(0), mode = "markers+text", text = replay.drivers,
+                textposition = "top center", textfont = dict(size = 13, color = "#444444"),
+                marker = dict(color = colors, size = 16, line = dict(color = "white", width = 2)),
+                hovertemplate = "%{text}: %{customdata:.0f} m behind<extra></extra>",
+                showlegend = False
+            ))
+
+            # legend markers (right hand side)
+            for driver, color in zip(replay.drivers, colors):
+                fig.add_trace(go.Scatter(
+                    x = [None], y = [None], mode = "markers",
+                    marker = dict(color = color, size = 16),
+                    name = driver, hoverinfo = "skip", showlegend = True
+                ))
+
+            frame_ms = 1000 / replay.fps
+            fig.frames = [dict(name = name, data = [cars(i)], traces = [1]) for i, name in enumerate(names)]
+
+            play = dict(
+                frame = dict(duration = frame_ms, redraw = False),
+                transition = dict(duration = frame_ms, easing = "linear"),
+                fromcurrent = True, mode = "immediate",
+            )
+            pause = dict(frame = dict(duration = 0, redraw = False), mode = "immediate")
+
+            self._comparison_map_layout(fig, f"Ghost Replay: {replay.time[start]:.0f}–{replay.time[stop - 1]:.0f} s")
+
+            # Fixed axes, so the view does not rescale while the cars move
+            pad = 0.03 * max(np.ptp(ox), np.ptp(oy))
+            fig.update_xaxes(range = [ox.min() - pad, ox.max() + pad])
+            fig.update_yaxes(range = [oy.min() - pad, oy.max() + pad])
+            fig.update_layout(
+                margin = dict(l = 20, r = 120, t = 40, b = 90),
+                updatemenus = [dict(
+                    type = "buttons", direction = "left", showactive = False,
+                    x = 0.0, xanchor = "left", y = -0.02, yanchor = "top",
+                    buttons = [
+                        dict(label = "▶ Play", method = "animate", args = [None, play]),
+                        dict(label = "❚❚ Pause", method = "animate", args = [[None], pause]),
+                    ],
+                )],
+                sliders = [dict(
+                    x = 0.2, len = 0.8, y = -0.02, yanchor = "top",
+                    currentvalue = dict(prefix = "Lap time: ", suffix = " s", font = dict(size = 14, color = "#444444")),
+                    transition = dict(duration = 0),
+                    # one step per second of lap time keeps the slider readable
+                    steps = [
+                        dict(method = "animate", label = f"{replay.time[start + i]:.0f}", args = [[names[i]], pause])
+                        for i in range(0, len(names), replay.fps)
+                    ],
+                )],
+            )
+            return self._encoded(fig, x = "position", y = "position")
+
+        except Exception as e:
+            print(f"Error creating ghost replay: {e}")
+            return None
+
+    # ---------------- Mini-Sector Track Map ----------------
+
+    def create_minisector_track_map(self, minisectors, colors = None, rotate_deg = 235, title = "Track Map: Fastest Driver per Mini-Sector"):
+        # Colour each mini-sector by the driver (or team) who was fastest through it
+        if not minisectors:
+            return None
+
+        try:
+            labels = list(minisectors["sector_times"].index)
+            fastest_idx = np.asarray(minisectors["fastest_idx"])
+            edges = np.asarray(minisectors["edges"])
+            margin = np.asarray(minisectors["margin"])
+
+            xr, yr = self._rotate(np.asarray(minisectors["x"]), np.asarray(minisectors["y"]), rotate_deg)
+
+            # sector number of every grid point; boundary points belong to both neighbours
+            # so that coloured segments join up without gaps
+            n_points = len(xr)
+            sector_of_point = np.clip(np.searchsorted(edges, np.arange(n_points), side = "right") - 1,
+                                      0, len(fastest_idx) - 1)
+            winner = fastest_idx[sector_of_point]
+            winner_prev = np.concatenate(([winner[0]], winner[:-1]))
+
+            palette = colors or {}
+            default_colors = sample_colorscale("Turbo", list(np.linspace(0.05, 0.95, max(len(labels), 2))))
+
+            fig = go.Figure()
+
+            # grey outline for full track reference
+            fig.add_trace(go.Scatter(
+                x = xr, y = yr, mode = "lines",
+                line = dict(color = "lightgray", width = 6),
+                showlegend = False, hoverinfo = "skip"
+            ))
+
+            sectors_won = np.bincount(fastest_idx, minlength = len(labels))
+            hover_data = np.column_stack((sector_of_point + 1, margin[sector_of_point]))
+
+            # one trace per label that won at least one mini-sector
+            for k in np.flatnonzero(sectors_won):
+                mask = (winner == k) | (winner_prev == k)
+                label = labels[k]
+                fig.add_trace(go.Scatter(
+                    x = np.where(mask, xr, np.nan), y = np.where(mask, yr, np.nan),
+                    mode = "lines", connectgaps = False,
+                    line = dict(color = palette.get(label, default_colors[k]), width = 4),
+                    name = f"{label} ({sectors_won[k]})",
+                    customdata = hover_data,
+                    hovertemplate = f"{label}<br>Mini-sector %{{customdata[0]:.0f}}"
+                                    f"<br>Ahead by: %{{customdata[1]:.3f}} s<extra></extra>"
+                ))
+
             fig.update_xaxes(visible = False, constrain = "domain")
             fig.update_yaxes(visible = False, scaleanchor = "x", scaleratio = 1, constrain = "domain")
             fig.update_layout(
-                height = 700, width = 900,
-                margin = dict(l = 20, r = 120, t = 40, b = 20),
+                height = 700,
+                margin = dict(l = 20, r = 20, t = 60, b = 20),
                 legend = dict(
-                    orientation = "h", yanchor = "middle", y = 0.75,
+                    title = dict(text = "Mini-sectors won"),
+                    yanchor = "middle", y = 0.5,
                     xanchor = "left", x = 1.01,
-                    font = dict(size = 16, color = "#444444", family = "Arial")
+                    font = dict(size = 14, color = "#444444", family = "Arial")
                 ),
                 title = dict(
-                    text = "Track Map: Speed Advantage by Driver",
+                    text = title,
                     font = dict(size = 20, color = "#888888"),
-                    x = 0.5, 
+                    x = 0.5,
                     xanchor = "center"
                 ),
-                plot_bgcolor="white"
+                plot_bgcolor = "white"
+            )
+            return self._encoded(fig, x = "position", y = "position", customdata = "time")
+
+        except Exception as e:
+            print(f"Error creating mini-sector track map: {e}")
+            return None
+
+    # ---------------- Ideal Lap Chart ----------------
+
+    def create_ideal_lap_chart(self, ideal_laps):
+        # Gap to pole of each driver's best lap vs their ideal (best mini-sectors) lap
+        if not ideal_laps or ideal_laps["summary"].empty:
+            return None
+
+        try:
+            summary = ideal_laps["summary"].iloc[::-1]  # fastest ideal lap at the top
+            drivers = list(summary.index)
+
+            fig = go.Figure()
+            fig.add_trace(go.Bar(
+                x = summary["best_gap_to_pole"], y = drivers, orientation = "h",
+                name = "Best lap", marker_color = "#bbbbbb",
+                hovertemplate = "%{y} best lap: +%{x:.3f} s<extra></extra>"
+            ))
+            fig.add_trace(go.Bar(
+                x = summary["ideal_gap_to_pole"], y = drivers, orientation = "h",
+                name = "Ideal lap", marker_color = self.f1_colors['driver1_color'],
+                hovertemplate = "%{y} ideal lap: %{x:+.3f} s<extra></extra>"
+            ))
+
+            fig.add_vline(x = 0, line_dash = "dash", line_color = "rgba(180,180,180,0.8)")
+            fig.update_layout(
+                title = dict(
+                    text = "Ideal Lap vs Pole",
+                    font = dict(size = 20, color = '#888888'),
+                    x = 0.5,
+                    xanchor = 'center'
+                ),
+                template = "plotly_white",
+                barmode = "group",
+                height = max(400, 28 * len(drivers) + 120),
+                plot_bgcolor = 'rgba(0,0,0,0)',
+                paper_bgcolor = 'rgba(0,0,0,0)',
+                xaxis = dict(
+                    title = "Gap to pole (s)",
+                    title_font = dict(size = 12, color = "#444444", family = "Arial"),
+                    tickfont = dict(size = 12, color = "#444444", family = "Arial"),
+                ),
+                yaxis = dict(tickfont = dict(size = 12, color = "#444444", family = "Arial")),
+                legend = dict(
+                    orientation = "h", yanchor = "bottom", y = 1.02,
+                    xanchor = "right", x = 1, font = dict(size = 14, color = "#444444")
+                ),
+                font = dict(color = "#444444")
             )
             return fig
 
         except Exception as e:
-            print(f"Error creating comparison track map: {e}")
+            print(f"Error creating ideal lap chart: {e}")
             return None
 
-    # ---------------- Delta Chart ----------------
-    
-    def create_delta_chart(self, telemetry1, telemetry2, driver1_code, driver2_code):
-        # Create time delta chart showing where driver2 gains/loses time vs driver1
-        
-            if telemetry1 is None or telemetry1.empty or telemetry2 is None or telemetry2.empty:
-                return None
+    # ---------------- Field Heatmap ----------------
 
-            def dist_time(df):
-                # Return (distance_m, cumulative_time_s) with safe handling 
-                d = df["Distance"].to_numpy(dtype=float)
-                d = np.maximum.accumulate(d)  # enforce monotonic distance
-
-                # true timestamps if present
-                t_col = None
-                for c in ("SessionTime", "Time", "LapTime", "Timestamp"):
-                    if c in df.columns:
-                        t_col = c
-                        break
-
-                if t_col is not None:
-                    s = df[t_col]
-                    if pd.api.types.is_timedelta64_dtype(s):
-                        t = s.dt.total_seconds().to_numpy()
-                    elif pd.api.types.is_datetime64_dtype(s):
-                        t = (s - s.min()).dt.total_seconds().to_numpy()
-                    else:
-                        t = s.to_numpy(dtype=float)
-                        # auto-convert ns -> s if values are too big
-                        if t.size and np.median(np.abs(t[t != 0])) > 1e6:
-                            t = t / 1e9
-                    t0 = np.interp(d.min(), d, t)
-                    return d, (t - t0)
-
-                # integrate from speed (km/h -> m/s)
-                v = df["Speed"].to_numpy(dtype = float)
-                v = np.where(v > 60.0, v / 3.6, v)
-                v = np.clip(v, 0.5, None)
-                ds = np.diff(d, prepend = d[0])
-                t = np.cumsum(ds / v)
-                return d, (t - t[0])
+    def create_field_heatmap(self, field_telemetry, metric = "speed", reference_driver = None, n_points = 1000):
+        # Drivers x distance heatmap of the whole field in one go.Heatmap trace.
+        # field_telemetry: {driver: telemetry}, in display order (top row first).
+        # metric: "speed" (km/h) or "delta" (cumulative time to reference_driver, s).
+        # All laps are interpolated onto the common distance grid (as in the delta chart)
+        # into a single drivers x grid matrix.
+        if not field_telemetry:
+            return None
 
-            try:
-                telemetry1 = self._ensure_distance(telemetry1)
-                telemetry2 = self._ensure_distance(telemetry2)
+        try:
+            drivers = list(field_telemetry)
+            series = [distance_time(self._ensure_distance(t)) for t in field_telemetry.values()]
+            distances = [d for d, _ in series]
+            grid = common_distance_grid(distances, n_points)
+
+            if metric == "delta":
+                reference_driver = reference_driver if reference_driver in field_telemetry else drivers[0]
+                times = interp_rows(grid, distances, [t for _, t in series])
+                z = times - times[drivers.index(reference_driver)]
+                bound = max(float(np.nanmax(np.abs(z))), 1e-3)
+                colors = dict(colorscale = "RdBu_r", zmid = 0.0, zmin = -bound, zmax = bound)
+                colorbar_title = f"Δ to {reference_driver} (s)"
+                hover = "%{y} at %{x:,.0f} m<br>Δ: %{z:+.3f} s<extra></extra>"
+                channel = "delta"
+            else:
+                speeds = []
+                for t in field_telemetry.values():
+                    v = t["Speed"].to_numpy(float)
+                    speeds.append(v * 3.6 if np.nanmedian(v) < 60 else v)
+                z = interp_rows(grid, distances, speeds)
+                colors = dict(colorscale = "Turbo")
+                colorbar_title = "Speed (km/h)"
+                hover = "%{y} at %{x:,.0f} m<br>%{z:.0f} km/h<extra></extra>"
+                channel = "speed"
+
+            fig = go.Figure(go.Heatmap(
+                z = z, x0 = float(grid[0]), dx = float(grid[1] - grid[0]), y = drivers,
+                colorbar = dict(title = colorbar_title, len = 0.8),
+                hovertemplate = hover, **colors
+            ))
+            fig.update_layout(
+                title = dict(
+                    text = "Full Field: Speed by Distance" if channel == "speed" else "Full Field: Delta by Distance",
+                    font = dict(size = 20, color = "#888888"), x = 0.5, xanchor = "center"
+                ),
+                template = "plotly_white",
+                height = max(400, 28 * len(drivers) + 140),
+                margin = dict(l = 60, r = 20, t = 70, b = 50),
+                xaxis = dict(
+                    title = "Distance (m)", tickmode = "linear", dtick = 1000, tickformat = ",",
+                    title_font = dict(size = 12, color = "#444444", family = "Arial"),
+                    tickfont = dict(size = 12, color = "#444444", family = "Arial"),
+                ),
+                yaxis = dict(
+                    autorange = "reversed", type = "category",
+                    tickfont = dict(size = 12, color = "#444444", family = "Arial"),
+                ),
+                font = dict(color = "#444444"),
+            )
+            return self._encoded(self._zoomed(fig), z = channel)
+
+        except Exception as e:
+            print(f"Error creating field heatmap: {e}")
+            return None
+
+    # ---------------- Qualifying Progression ----------------
+
+    def create_segment_progression_chart(self, progression):
+        # Each driver's best lap in Q1, Q2 and Q3 as dots on one row, joined by a line,
+        # drivers in classification order (progression from SessionIndex.progression)
+        if progression is None or progression.empty:
+            return None
+
+        try:
+            drivers = list(progression.index)
+            times = progression.to_numpy(float)
+            segment_colors = {"Q1": "#bbbbbb", "Q2": self.f1_colors['driver1_color'], "Q3": self.f1_colors['primary']}
+
+            fig = go.Figure()
+
+            # connectors: one trace, each driver's span separated by a gap
+            span_x = np.column_stack((np.nanmin(times, axis = 1), np.nanmax(times, axis = 1), np.full(len(drivers), np.nan)))
+            span_y = np.repeat(np.array(drivers, dtype = object), 3).reshape(-1, 3)
+            span_y[:, 2] = None
+            fig.add_trace(go.Scatter(
+                x = span_x.ravel(), y = span_y.ravel(), mode = "lines",
+                line = dict(color = "rgba(150,150,150,0.5)", width = 2),
+                hoverinfo = "skip", showlegend = False
+            ))
+
+            for k, segment in enumerate(progression.columns):
+                fig.add_trace(go.Scatter(
+                    x = times[:, k], y = drivers, mode = "markers", name = segment,
+                    marker = dict(color = segment_colors.get(segment, "#444444"), size = 11),
+                    hovertemplate = f"%{{y}} {segment}: %{{x:.3f}} s<extra></extra>"
+                ))
+
+            fig.update_layout(
+                title = dict(
+                    text = "Qualifying Progression: Best Lap per Segment",
+                    font = dict(size = 20, color = "#888888"), x = 0.5, xanchor = "center"
+                ),
+                template = "plotly_white",
+                height = max(400, 26 * len(drivers) + 140),
+                margin = dict(l = 60, r = 20, t = 70, b = 50),
+                xaxis = dict(
+                    title = "Lap time (s)",
+                    title_font = dict(size = 12, color = "#444444", family = "Arial"),
+                    tickfont = dict(size = 12, color = "#444444", family = "Arial"),
+                ),
+                yaxis = dict(
+                    autorange = "reversed", type = "category",
+                    tickfont = dict(size = 12, color = "#444444", family = "Arial"),
+                ),
+                legend = dict(
+                    orientation = "h", yanchor = "bottom", y = 1.02,
+                    xanchor = "right", x = 1, font = dict(size = 14, color = "#444444")
+                ),
+                font = dict(color = "#444444"),
+            )
+            return self._encoded(fig, x = "time")
+
+        except Exception as e:
+            print(f"Error creating progression chart: {e}")
+            return None
+
+    # ---------------- Session Timeline ----------------
+
+    def create_session_timeline_chart(self, timeline, driver_colors = None):
+        # Every lap time against session time, each driver's running best as a step line
+        # and the provisional pole line (timeline from DataAnalyser.get_lap_timeline).
+        # WebGL traces keep long sessions with hundreds of laps responsive.
+        if timeline is None or timeline.empty:
+            return None
 
-                d1, t1 = dist_time(telemetry1)
-                d2, t2 = dist_time(telemetry2)
+        try:
+            from plotly.colors import qualitative
+
+            driver_colors = driver_colors or {}
+            t0 = float(timeline["SessionTime"].min())
+            minutes = (timeline["SessionTime"].to_numpy(float) - t0) / 60.0
+            lap_time = timeline["LapTime"].to_numpy(float)
+            running_best = timeline["RunningBest"].to_numpy(float)
+            lap_number = timeline["LapNumber"].to_numpy(float)
+            counts = timeline["Counts"].to_numpy(bool)
 
-                # common distance grid over the overlap
-                lap_m = float(min(d1.max(), d2.max()))
-                x = np.linspace(0.0, lap_m, 2000)
-                t1i = np.interp(x, d1, t1)
-                t2i = np.interp(x, d2, t2)
+            fig = go.Figure()
+            palette = qualitative.Dark24
+            for k, (driver, rows) in enumerate(timeline.groupby("Driver", sort = True).indices.items()):
+                color = driver_colors.get(driver) or palette[k % len(palette)]
+                fig.add_trace(go.Scattergl(
+                    x = minutes[rows], y = lap_time[rows], customdata = lap_number[rows],
+                    mode = "markers", name = driver, legendgroup = driver,
+                    marker = dict(color = color, size = 7, opacity = np.where(counts[rows], 0.9, 0.3)),
+                    hovertemplate = f"{driver} lap %{{customdata:.0f}}<br>%{{y:.3f}} s<extra></extra>"
+                ))
+                fig.add_trace(go.Scattergl(
+                    x = minutes[rows], y = running_best[rows], mode = "lines",
+                    line = dict(color = color, width = 1.5, shape = "hv"),
+                    legendgroup = driver, showlegend = False, hoverinfo = "skip"
+                ))
+
+            # Provisional pole: only the laps that changed it, plus the end of the session
+            by_time = np.argsort(minutes, kind = "stable")
+            pole = timeline["ProvisionalPole"].to_numpy(float)[by_time]
+            changed = np.flatnonzero(np.isfinite(pole) & (np.diff(pole, prepend = np.nan) != 0))
+            changed = np.append(changed, by_time.size - 1) if changed.size else changed
+            fig.add_trace(go.Scattergl(
+                x = minutes[by_time][changed], y = pole[changed], mode = "lines",
+                line = dict(color = "#222222", width = 3, shape = "hv"),
+                name = "Provisional pole",
+                hovertemplate = "Provisional pole: %{y:.3f} s<extra></extra>"
+            ))
+
+            # Start of Q2 / Q3: the first lap completed in each later segment
+            segment = timeline["Segment"].to_numpy()
+            for number in range(2, int(segment.max()) + 1):
+                in_segment = segment == number
+                if in_segment.any():
+                    fig.add_vline(
+                        x = float(minutes[in_segment].min()), line_dash = "dot",
+                        line_color = "rgba(120,120,120,0.7)",
+                        annotation_text = f"Q{number}", annotation_position = "top left"
+                    )
+
+            # Focus on competitive laps; out- and in-laps stay reachable by zooming out
+            best = float(np.nanmin(pole)) if np.isfinite(pole).any() else float(np.nanmin(lap_time))
+            fig.update_layout(
+                title = dict(
+                    text = "Session Timeline: Lap Times and Provisional Pole",
+                    font = dict(size = 20, color = "#888888"), x = 0.5, xanchor = "center"
+                ),
+                template = "plotly_white",
+                height = 560,
+                margin = dict(l = 60, r = 20, t = 70, b = 50),
+                xaxis = dict(
+                    title = "Session time (min)",
+                    title_font = dict(size = 12, color = "#444444", family = "Arial"),
+                    tickfont = dict(size = 12, color = "#444444", family = "Arial"),
+                ),
+                yaxis = dict(
+                    title = "Lap time (s)", range = [best * 0.995, best * 1.07],
+                    title_font = dict(size = 12, color = "#444444", family = "Arial"),
+                    tickfont = dict(size = 12, color = "#444444", family = "Arial"),
+                    gridcolor = "rgba(200,200,200,0.60)",
+                ),
+                legend = dict(font = dict(size = 12, color = "#444444")),
+                font = dict(color = "#444444"),
+            )
+            return self._encoded(fig, x = "time", y = "time", customdata = "lap")
 
-                # delta in seconds (driver2 - driver1)
-                delta = t2i - t1i
+        except Exception as e:
+            print(f"Error creating session timeline: {e}")
+            return None
 
-                # savgol filter
-                try:
-                    from scipy.signal import savgol_filter
-                    delta = savgol_filter(delta, 31, 2)
-                except Exception:
-                    pass
+    # ---------------- Delta Chart ----------------
+    
+    def create_delta_chart(self, telemetry1, telemetry2, driver1_code, driver2_code, lap_delta = None):
+        # Create time delta chart showing where driver2 gains/loses time vs driver1.
+        # lap_delta: the pair's LapDelta when it is already computed (and cached)
+        
+            if telemetry1 is None or telemetry1.empty or telemetry2 is None or telemetry2.empty:
+                return None
 
-                final_gap = float(delta[-1])
+            try:
+                # delta in seconds (driver2 - driver1) on the common distance grid, smoothed
+                if lap_delta is None:
+                    lap_delta = LapDelta(telemetry1, telemetry2, (driver1_code, driver2_code))
+                x, delta = lap_delta.x, lap_delta.delta
+                final_gap = lap_delta.final_gap
 
                 # ---- plot ----
                 fig = go.Figure()
                 fig.add_hline(y = 0, line_dash = "dash", line_color = "rgba(180,180,180,0.8)")
+
+                # the three segments where the most time changed hands
+                for _, row in lap_delta.attribution("corners").head(3).iterrows():
+                    fig.add_vrect(
+                        x0 = row["From (m)"], x1 = row["To (m)"], fillcolor = "rgba(255,170,0,0.12)", line_width = 0,
+                        annotation_text = f"{row['Segment']}: {row['Faster']} {row['Time (s)']:.3f}s",
+                        annotation_position = "top left",
+                        annotation_font = dict(size = 10, color = "#888888"),
+                    )
+                x_plot, delta_plot = self._trace_xy(x, delta)
                 fig.add_trace(go.Scatter(
-                    x = x, y = delta, mode = "lines",
+                    x = x_plot, y = delta_plot, mode = "lines",
                     line = dict(width = 2, color = "#0000cd"),
                     name = f"Δ {driver2_code}-{driver1_code}",
                     hovertemplate = "Distance: %{x:.0f} m<br>Δ Time: %{y:.3f} s<extra></extra>"
@@ -282,7 +765,7 @@ class ChartCreator:
                     margin = dict(l = 40, r = 20, t = 70, b = 40), 
                     font = dict(size = 12, color = "#444444", family = "Arial")
                 )
-                return fig
+                return self._encoded(self._zoomed(fig), x = "distance", y = "delta")
 
             except Exception as e:
                 print(f"Error creating delta chart: {e}")
@@ -299,19 +782,22 @@ class ChartCreator:
         telemetry1 = self._ensure_distance(telemetry1)
         telemetry2 = self._ensure_distance(telemetry2)
 
+        x1, y1 = self._trace_xy(telemetry1["Distance"], telemetry1["Speed"], n_traces = 2)
+        x2, y2 = self._trace_xy(telemetry2["Distance"], telemetry2["Speed"], n_traces = 2)
+
         fig = go.Figure()
         
         fig.add_trace(go.Scatter(
-            x = telemetry1["Distance"],
-            y = telemetry1["Speed"],
+            x = x1,
+            y = y1,
             mode = "lines",
             name = driver1_code,
             line = dict(color = self.f1_colors['driver1_color'], width = 2)
         ))
 
         fig.add_trace(go.Scatter(
-            x = telemetry2["Distance"],
-            y = telemetry2["Speed"],
+            x = x2,
+            y = y2,
             mode = "lines",
             name = driver2_code,
             line = dict(color = self.f1_colors['driver2_color'], width = 2)
@@ -355,7 +841,7 @@ class ChartCreator:
             font = dict(color = "#444444")
         )
         
-        return fig
+        return self._encoded(self._zoomed(fig), x = "distance", y = "speed")
 
     def create_throttle_comparison_chart(self, telemetry1, telemetry2, driver1_code, driver2_code):
         # Create throttle comparison chart
@@ -369,19 +855,22 @@ class ChartCreator:
         telemetry1 = self._ensure_distance(telemetry1)
         telemetry2 = self._ensure_distance(telemetry2)
 
+        x1, y1 = self._trace_xy(telemetry1["Distance"], telemetry1["Throttle"], n_traces = 2)
+        x2, y2 = self._trace_xy(telemetry2["Distance"], telemetry2["Throttle"], n_traces = 2)
+
         fig = go.Figure()
         
         fig.add_trace(go.Scatter(
-            x = telemetry1["Distance"],
-            y = telemetry1["Throttle"],
+            x = x1,
+            y = y1,
             mode = "lines",
             name = driver1_code,
             line = dict(color = self.f1_colors['driver1_color'], width = 2)
         ))
 
         fig.add_trace(go.Scatter(
-            x = telemetry2["Distance"],
-            y = telemetry2["Throttle"],
+            x = x2,
+            y = y2,
             mode = "lines",
             name = driver2_code,
             line = dict(color = self.f1_colors['driver2_color'], width = 2)
@@ -425,7 +914,7 @@ class ChartCreator:
             font = dict(color = "#444444")
         )
         
-        return fig
+        return self._encoded(self._zoomed(fig), x = "distance", y = "percent")
 
     def create_brake_comparison_chart(self, telemetry1, telemetry2, driver1_code, driver2_code):
         # Create brake comparison chart
@@ -447,19 +936,22 @@ class ChartCreator:
         if brake2.dtype == bool:
             brake2 = brake2.astype(int) * 100
 
+        x1, y1 = self._trace_xy(telemetry1["Distance"], brake1, n_traces = 2, steps = True)
+        x2, y2 = self._trace_xy(telemetry2["Distance"], brake2, n_traces = 2, steps = True)
+
         fig = go.Figure()
         
         fig.add_trace(go.Scatter(
-            x = telemetry1["Distance"],
-            y = brake1,
+            x = x1,
+            y = y1,
             mode = "lines",
             name = driver1_code,
             line = dict(color = self.f1_colors['driver1_color'], width = 2)
         ))
 
         fig.add_trace(go.Scatter(
-            x = telemetry2["Distance"],
-            y = brake2,
+            x = x2,
+            y = y2,
             mode = "lines",
             name = driver2_code,
             line = dict(color = self.f1_colors['driver2_color'], width = 2)
@@ -503,7 +995,7 @@ class ChartCreator:
             font = dict(color = "#444444")
         )
         
-        return fig
+        return self._encoded(self._zoomed(fig), x = "distance", y = "percent")
 
     def create_driving_patterns_compare(self, metrics1, metrics2, driver1_code, driver2_code):
         
@@ -662,7 +1154,9 @@ class ChartCreator:
 
     # ---------------- Track map ----------------
     
-    def create_track_map_with_sectors(self, telemetry = None, driver_code = None, color_by_speed = True):
+    def create_track_map_with_sectors(self, telemetry = None, driver_code = None, color_by_speed = True, renderer = "auto"):
+        # renderer: "vector", "raster" (speed gradient drawn per sample into a
+        # server-side image) or "auto" (raster above raster_point_threshold samples)
         if telemetry is None or telemetry.empty:
             return None
 
@@ -681,29 +1175,55 @@ class ChartCreator:
                     line = dict(color = "lightgray", width = 3),
                     hoverinfo = "skip", showlegend = False
                 ))
-            else:
-                # gradient-by-speed: short line segments in Turbo colors
-                import numpy as np
-                from plotly.colors import sample_colorscale
+            elif self._use_raster(renderer, len(x)):
+                # gradient-by-speed at full resolution: every segment in its own Turbo
+                # colour, drawn into one image, with a light outline carrying the hover
+                v = telemetry["Speed"].to_numpy(float)
+                vmin, vmax = float(np.nanmin(v)), float(np.nanmax(v))
+                span = max(vmax - vmin, 1e-9)
 
+                lut = colorscale_lut("Turbo")
+                segment_v = np.nan_to_num((v[:-1] + v[1:]) / 2, nan = vmin)
+                shade = np.clip(((segment_v - vmin) / span * (len(lut) - 1)).astype(int), 0, len(lut) - 1)
+
+                image = TrackRaster(x, y)
+                image.draw(x, y, lut[shade], width_px = 6)
+                image.add_to_figure(fig)
+                fig.add_trace(self._hover_outline(x, y, v, "Speed: %{customdata:.0f} km/h<extra></extra>"))
+            else:
+                # gradient-by-speed: short line segments in Turbo colors, grouped into one
+                # trace per colour band (segments separated by NaN gaps) rather than one
+                # trace per segment
                 v = telemetry["Speed"].to_numpy(float)
                 vmin, vmax = float(np.nanmin(v)), float(np.nanmax(v))
                 span = max(vmax - vmin, 1e-9)
 
                 max_segments = 1200
+                n_bands = 64
                 step = max(1, int(np.ceil(len(x) / max_segments)))
 
-                for i in range(0, len(x) - 1, step):
-                    j = min(i + step, len(x) - 1)
-                    vn = (np.nanmean(v[i:j]) - vmin) / span
-                    color = sample_colorscale("Turbo", [vn])[0]
+                starts = np.arange(0, len(x) - 1, step)
+                ends = np.minimum(starts + step, len(x) - 1)
+                v_filled = np.where(np.isnan(v), 0.0, v)
+                counts = np.add.reduceat(~np.isnan(v[:-1]), starts)
+                sums = np.add.reduceat(v_filled[:-1], starts)
+                with np.errstate(invalid = "ignore", divide = "ignore"):
+                    vn = np.clip((sums / counts - vmin) / span, 0.0, 1.0)
+                band = np.minimum((np.nan_to_num(vn) * n_bands).astype(int), n_bands - 1)
+
+                colors = sample_colorscale("Turbo", list((np.arange(n_bands) + 0.5) / n_bands))
+                for k in np.unique(band):
+                    sel = band == k
+                    gaps = np.full(sel.sum(), np.nan)
                     fig.add_trace(go.Scatter(
-                        x = [x[i], x[j]], y = [y[i], y[j]],
-                        mode="lines",
-                        line = dict(color = color, width = 3),
+                        x = np.column_stack((x[starts[sel]], x[ends[sel]], gaps)).ravel(),
+                        y = np.column_stack((y[starts[sel]], y[ends[sel]], gaps)).ravel(),
+                        mode = "lines", connectgaps = False,
+                        line = dict(color = colors[k], width = 3),
                         hoverinfo = "skip", showlegend = False
                     ))
 
+            if color_by_speed and "Speed" in telemetry.columns:
                 # tiny invisible marker to display the colorbar
                 fig.add_trace(go.Scatter(
                     x = [None], y = [None], mode = "markers",
@@ -728,7 +1248,7 @@ class ChartCreator:
                 paper_bgcolor = "rgba(0,0,0,0)",
                 margin = dict(l = 50, r = 30, t = 70, b = 50)
             )
-            return fig
+            return self._encoded(fig, x = "position", y = "position", customdata = "speed")
 
         except Exception as e:
             print(f"Error creting track map: {e}")
@@ -778,8 +1298,9 @@ class ChartCreator:
 
         fig = self._base_line_fig("Speed", "km/h")
         
+        x, y = self._trace_xy(telemetry["Distance"], telemetry["Speed"])
         fig.add_trace(go.Scatter(
-            x = telemetry["Distance"], y = telemetry["Speed"],
+            x = x, y = y,
             mode = "lines", name = driver_code,
             line = dict(color = self.f1_colors.get('primary', '#ff1e30'), width = 2)
         ))
@@ -790,7 +1311,7 @@ class ChartCreator:
             rangemode = "tozero"
         )
         
-        return fig
+        return self._encoded(self._zoomed(fig), x = "distance", y = "speed")
 
     def create_throttle_chart(self, telemetry, driver_code):
         if telemetry is None or telemetry.empty or "Throttle" not in telemetry.columns:
@@ -799,15 +1320,16 @@ class ChartCreator:
 
         fig = self._base_line_fig("Throttle", "%")
         
+        x, y = self._trace_xy(telemetry["Distance"], telemetry["Throttle"])
         fig.add_trace(go.Scatter(
-            x = telemetry["Distance"], y = telemetry["Throttle"],
+            x = x, y = y,
             mode = "lines", name = driver_code,
             line = dict(color = self.f1_colors.get('secondary', '#f89fd3'), width = 2)
         ))
         
         fig.update_yaxes(tickvals = [20, 40, 60, 80, 100])
         
-        return fig
+        return self._encoded(self._zoomed(fig), x = "distance", y = "percent")
 
     def create_brake_chart(self, telemetry, driver_code):
         if telemetry is None or telemetry.empty or "Brake" not in telemetry.columns:
@@ -819,15 +1341,16 @@ class ChartCreator:
             brake = brake.astype(int) * 100
 
         fig = self._base_line_fig("Brake", "%")
+        x, y = self._trace_xy(telemetry["Distance"], brake, steps = True)
         fig.add_trace(go.Scatter(
-            x = telemetry["Distance"], y = brake,
+            x = x, y = y,
             mode = "lines", name = driver_code,
             line = dict(color = self.f1_colors.get('brake_color', '#09f845'), width = 2)
         ))
         
         fig.update_yaxes(tickvals = [20, 40, 60, 80, 100])
         
-        return fig
+        return self._encoded(self._zoomed(fig), x = "distance", y = "percent")
 
     def create_gear_chart(self, telemetry, driver_code):
         if telemetry is None or telemetry.empty:
@@ -846,24 +1369,29 @@ class ChartCreator:
 
         fig = self._base_line_fig("Gear", "Gear")
         
+        x, y = self._trace_xy(telemetry["Distance"], gear_data, steps = True)
         fig.add_trace(go.Scatter(
-            x = telemetry["Distance"], y = gear_data,
+            x = x, y = y,
             mode = "lines", name = driver_code,
             line = dict(color = self.f1_colors.get('gear_color', '#800080'), width = 2, shape = "hv")
         ))
         
         fig.update_yaxes(tickmode = "linear", dtick = 1, range = [0, 8.5])
 
-        return fig
+        return self._encoded(self._zoomed(fig), x = "distance", y = "gear")
 
     def create_longitudinal_accel_chart(self, telemetry, driver_code):
-        if telemetry is None or telemetry.empty or "longitudinal_accel_g" not in telemetry.columns:
+        if telemetry is None or telemetry.empty:
+            return None
+        telemetry = with_channels(telemetry, "longitudinal_accel_g")
+        if "longitudinal_accel_g" not in telemetry.columns:
             return None
         telemetry = self._ensure_distance(telemetry)
 
         fig = self._base_line_fig("Longitudinal Acceleration", "g")
+        x, y = self._trace_xy(telemetry["Distance"], telemetry["longitudinal_accel_g"])
         fig.add_trace(go.Scatter(
-            x = telemetry["Distance"], y = telemetry["longitudinal_accel_g"],
+            x = x, y = y,
             mode = "lines", name = driver_code,
             line = dict(color = self.f1_colors.get('long_color', '#ffaa00'), width = 2)
         ))
@@ -871,10 +1399,13 @@ class ChartCreator:
         fig.update_yaxes(range = [-6, 7], tickvals = [-6, -4, -2, 0, 2, 4, 6],
                         zeroline = True, zerolinecolor = "rgba(200,200,200,0.3)")
         
-        return fig
+        return self._encoded(self._zoomed(fig), x = "distance", y = "accel")
 
     def create_lateral_accel_chart(self, telemetry, driver_code):
-        if telemetry is None or telemetry.empty or "lateral_accel_g" not in telemetry.columns:
+        if telemetry is None or telemetry.empty:
+            return None
+        telemetry = with_channels(telemetry, "lateral_accel_g")
+        if "lateral_accel_g" not in telemetry.columns:
             return None
         telemetry = self._ensure_distance(telemetry)
 
@@ -883,8 +1414,9 @@ class ChartCreator:
 
         fig = self._base_line_fig("Lateral Acceleration", "g")
         
+        x, y = self._trace_xy(telemetry["Distance"], telemetry["lateral_accel_g"])
         fig.add_trace(go.Scatter(
-            x = telemetry["Distance"], y = telemetry["lateral_accel_g"],
+            x = x, y = y,
             mode = "lines", name = driver_code,
             line = dict(color = self.f1_colors.get('lat_color', '#00aaff'), width = 2)
         ))
@@ -892,4 +1424,103 @@ class ChartCreator:
         fig.update_yaxes(range = [-lat_max, lat_max],
                         tickvals = [-6, -4, -2, -1, 0, 1, 2, 4, 6],
                         zeroline = True, zerolinecolor = "rgba(200,200,200,0.3)")
-        return fig
+        return self._encoded(self._zoomed(fig), x = "distance", y = "accel")
+
+    # ---------- Single-driver telemetry dashboard ----------
+
+    def _distance_grid(self, distance):
+        # Uniform distance grid over the zoom window (or the whole lap) with at most
+        # point_budget points and no finer than the recorded samples
+        lo, hi = self.x_range if self.x_range is not None else (distance[0], distance[-1])
+        lo, hi = max(float(lo), float(distance[0])), min(float(hi), float(distance[-1]))
+        samples = int(np.count_nonzero((distance >= lo) & (distance <= hi)))
+        n = max(min(samples, self.point_budget or samples), 2)
+        return lo, (hi - lo) / (n - 1), n
+
+    def create_telemetry_dashboard(self, telemetry, driver_code):
+        # Every single-driver channel as stacked subplots of one figure sharing one
+        # distance axis: one figure to send and draw, and zooming any row zooms them all.
+        # Channels are resampled onto one uniform distance grid, so each trace carries
+        # only its y values; x is given as x0 + dx and no distance array is sent at all.
+        if telemetry is None or telemetry.empty:
+            return None
+        telemetry = self._ensure_distance(with_channels(telemetry, "longitudinal_accel_g", "lateral_accel_g"))
+
+        gear_col = next((c for c in telemetry.columns if c.lower() in ("gear", "ngear")), None)
+        lat = telemetry["lateral_accel_g"].dropna() if "lateral_accel_g" in telemetry.columns else []
+        lat_max = (max(abs(lat.min()), abs(lat.max())) * 1.05) if len(lat) else 3.0
+
+        # (column, title, y title, precision channel, step channel, colour, y-axis settings)
+        channels = [
+            ("Speed", "Speed", "km/h", "speed", False, self.f1_colors.get('primary', '#ff1e30'),
+             dict(tickvals = [0, 100, 200, 300, 400], rangemode = "tozero")),
+            ("Throttle", "Throttle", "%", "percent", False, self.f1_colors.get('secondary', '#f89fd3'),
+             dict(tickvals = [20, 40, 60, 80, 100])),
+            ("Brake", "Brake", "%", "percent", True, self.f1_colors.get('brake_color', '#09f845'),
+             dict(tickvals = [20, 40, 60, 80, 100])),
+            (gear_col, "Gear", "Gear", "gear", True, self.f1_colors.get('gear_color', '#800080'),
+             dict(tickmode = "linear", dtick = 1, range = [0, 8.5])),
+            ("longitudinal_accel_g", "Longitudinal Acceleration", "g", "accel", False, self.f1_colors.get('long_color', '#ffaa00'),
+             dict(range = [-6, 7], tickvals = [-6, -4, -2, 0, 2, 4, 6])),
+            ("lateral_accel_g", "Lateral Acceleration", "g", "accel", False, self.f1_colors.get('lat_color', '#00aaff'),
+             dict(range = [-lat_max, lat_max], tickvals = [-6, -4, -2, -1, 0, 1, 2, 4, 6])),
+        ]
+        channels = [c for c in channels if c[0] is not None and c[0] in telemetry.columns]
+        if not channels:
+            return None
+
+        distance = np.maximum.accumulate(telemetry["Distance"].to_numpy(float))
+        x0, dx, n = self._distance_grid(distance)
+        grid = x0 + dx * np.arange(n)
+        # Sample-and-hold positions for step channels (last recorded value at or before
+        # each grid point), so gear and brake changes stay sharp
+        held = np.clip(np.searchsorted(distance, grid, side = "right") - 1, 0, len(distance) - 1)
+
+        fig = make_subplots(
+            rows = len(channels), cols = 1, shared_xaxes = True,
+            vertical_spacing = 0.035, subplot_titles = [c[1] for c in channels],
+        )
+        for row, (column, title, y_title, channel, steps, color, yaxis) in enumerate(channels, start = 1):
+            values = telemetry[column]
+            if column == "Brake" and values.dtype == bool:
+                values = values.astype(int) * 100
+            values = pd.to_numeric(values, errors = "coerce").to_numpy(float)
+            if column == gear_col:
+                values = np.nan_to_num(values)
+            y = values[held] if steps else np.interp(grid, distance, values)
+
+            fig.add_trace(encode_trace(go.Scatter(
+                x0 = x0, dx = dx, y = y,
+                mode = "lines", name = title,
+                line = dict(color = color, width = 2, shape = "hv" if steps else "linear"),
+                hovertemplate = f"%{{x:,.0f}} m<br>%{{y:.1f}} {y_title}<extra>{title}</extra>",
+            ), self.precision, y = channel), row = row, col = 1)
+            fig.update_yaxes(
+                title = y_title, showgrid = True, gridcolor = "rgba(200,200,200,0.60)",
+                zeroline = True, zerolinecolor = "rgba(200,200,200,0.3)",
+                title_font = dict(size = 12, color = "#444444", family = "Arial"),
+                tickfont = dict(size = 12, color = "#444444", family = "Arial"),
+                row = row, col = 1, **yaxis,
+            )
+
+        fig.update_xaxes(
+            tickmode = "linear", dtick = 1000, tickformat = ",", showgrid = False,
+            tickfont = dict(size = 12, color = "#444444", family = "Arial"),
+        )
+        fig.update_xaxes(
+            title = "Distance (m)", title_font = dict(size = 12, color = "#444444", family = "Arial"),
+            row = len(channels), col = 1,
+        )
+        fig.update_annotations(font = dict(size = 16, color = '#888888'))
+        fig.update_layout(
+            title = dict(text = f"Telemetry: {driver_code}", font = dict(size = 20, color = '#888888'), x = 0.5, xanchor = 'center'),
+            template = "plotly_white",
+            height = 240 * len(channels) + 80,
+            plot_bgcolor = 'rgba(0,0,0,0)',
+            paper_bgcolor = 'rgba(0,0,0,0)',
+            margin = dict(l = 60, r = 20, t = 90, b = 50),
+            font = dict(color = "#444444"),
+            showlegend = False,
+            hovermode = "x",
+        )
+        return self._zoomed(fig)
@@ -1,14 +1,33 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 import numpy as np
 import streamlit as st
-from scipy.signal import savgol_filter
+from lap_data import CompactLap
+from shared_telemetry import SharedTelemetryStore
+from session_bundle import BundleSession
+from session_index import SessionIndex
+from ghost_replay import GhostReplay
+from live_timing import LiveSession
+from derived_channels import DerivedChannels
+from track_reference import TrackReference
+import lap_events
+import gear_shifts
+from time_loss import LapDelta, SEGMENTATIONS
+
+# Threads used to extract the field's laps
+FIELD_WORKERS = 8
+
+# Cached results kept per session-wide analysis; a live session adds one per update
+SESSION_CACHE_ENTRIES = 64
 
 
 class DataAnalyser:
     # Handles F1 telemetry data analysis and calculations for pole position laps
 
     def __init__(self):
-        pass
+        # Optional host-wide lap store shared by every server process (None when disabled)
+        self.shared_telemetry = SharedTelemetryStore.from_env()
 
     # ---------------- Session and Lap Handling ----------------
     def get_pole_position_lap(self, _session, driver_code):
@@ -17,22 +36,10 @@ class DataAnalyser:
             if _session is None:
                 return None, None, "No session loaded."
 
-            # Get laps for driver
-            laps = _session.laps.pick_drivers(driver_code)
-            if laps is None or laps.empty:
-                return None, None, f"No laps available for {driver_code} at this GP."
-
-            # Verify pole position 
-            try:
-                results = _session.results
-                pole_driver = results[results['Position'] == 1]['Abbreviation'].iloc[0]
-            except:
-                pass
-
-            # Get fastest lap (assumed pole lap)
-            pole_lap = laps.pick_fastest()
-            if pole_lap is None or pd.isna(pole_lap['LapTime']):
-                return None, None, f"No valid pole lap found for {driver_code}."
+            row, message = self._pole_lap_row(_session, driver_code)
+            if row is None:
+                return None, None, message
+            pole_lap = _session.laps.iloc[row]
 
             # Extract telemetry with distance
             telemetry = pole_lap.get_telemetry().add_distance()
@@ -44,183 +51,443 @@ class DataAnalyser:
         except Exception as e:
             return None, None, f"Error getting pole position lap: {e}"
 
+    def _pole_lap_row(self, _session, driver_code):
+        # Driver's laps and fastest lap (assumed pole lap) come from the session index
+        index = SessionIndex.for_session(_session)
+        if len(index.driver_lap_rows(driver_code)) == 0:
+            return None, f"No laps available for {driver_code} at this GP."
+
+        row = index.fastest_lap_row(driver_code)
+        if row is None:
+            return None, f"No valid pole lap found for {driver_code}."
+        return row, None
+
+    def get_pole_lap_time(self, _session):
+        # (driver, lap time in s) of the pole lap: the P1 driver's lap that
+        # get_pole_position_lap returns, or the session's fastest lap without a classification
+        try:
+            index = SessionIndex.for_session(_session)
+            lap_time = pd.to_timedelta(_session.laps["LapTime"]).dt.total_seconds().to_numpy()
+
+            driver_code = index.driver_at(1) if index.driver_by_position else None
+            if driver_code is None and index.fastest_row:
+                driver_code = min(index.fastest_row, key = lambda d: lap_time[index.fastest_row[d]])
+            if driver_code is None:
+                return None, np.nan
+
+            row, _ = self._pole_lap_row(_session, driver_code)
+            return driver_code, (float(lap_time[row]) if row is not None else np.nan)
+        except Exception as e:
+            print(f"Error finding the pole lap: {e}")
+            return None, np.nan
+
+    def get_compact_lap(self, _session, session_key, driver_code):
+        # Fastest lap as a CompactLap. With the shared store enabled, a lap another server
+        # process already extracted is attached from it instead of being rebuilt here.
+        # Sessions opened from the prebuilt bundle already carry their extracted laps
+        if isinstance(_session, BundleSession):
+            lap = _session.get_lap(driver_code)
+            if lap is None:
+                return None, f"No valid pole lap found for {driver_code}."
+            return lap, f"Pole position lap for {driver_code} loaded."
+
+        # A live session's fastest lap so far, extracted once per improvement
+        if isinstance(_session, LiveSession):
+            row = SessionIndex.for_session(_session).fastest_lap_row(driver_code)
+            if row is None:
+                return None, f"No valid lap yet for {driver_code}."
+            return self.get_compact_lap_at_row(_session, session_key, row)
+
+        key = f"{session_key}:{driver_code}"
+        if self.shared_telemetry is not None:
+            lap = self.shared_telemetry.get(key)
+            if lap is not None:
+                return lap, f"Pole position lap for {driver_code} loaded."
+
+        pole_lap, telemetry, message = self.get_pole_position_lap(_session, driver_code)
+        if pole_lap is None:
+            return None, message
+
+        # Ensure Distance exists
+        if "Distance" not in telemetry.columns:
+            telemetry = telemetry.copy()
+            telemetry["Distance"] = range(len(telemetry))
+
+        lap = CompactLap.from_fastf1(driver_code, pole_lap, telemetry)
+        if self.shared_telemetry is not None:
+            lap = self.shared_telemetry.publish(key, lap)
+        return lap, message
+
+    def get_compact_lap_at_row(self, _session, session_key, row):
+        # Any lap of the session, by its row in session.laps, as a CompactLap (used for
+        # the Q1 / Q2 / Q3 laps, which are not necessarily the driver's fastest)
+        driver_code = str(_session.laps["Driver"].iloc[row])
+
+        if isinstance(_session, BundleSession):
+            # The bundle keeps only each driver's fastest lap
+            if SessionIndex.for_session(_session).fastest_lap_row(driver_code) != row:
+                return None, f"Only fastest laps are stored for {driver_code} in the session bundle."
+            return self.get_compact_lap(_session, session_key, driver_code)
+
+        if isinstance(_session, LiveSession):
+            return _session.cached_lap(row, lambda: self._extract_lap_at_row(_session, row, driver_code))
+
+        key = f"{session_key}:{driver_code}:row{row}"
+        if self.shared_telemetry is not None:
+            lap = self.shared_telemetry.get(key)
+            if lap is not None:
+                return lap, f"Lap {row} for {driver_code} loaded."
+
+        lap, message = self._extract_lap_at_row(_session, row, driver_code)
+        if lap is not None and self.shared_telemetry is not None:
+            lap = self.shared_telemetry.publish(key, lap)
+        return lap, message
+
+    def _extract_lap_at_row(self, _session, row, driver_code):
+        try:
+            fastf1_lap = _session.laps.iloc[row]
+            telemetry = fastf1_lap.get_telemetry().add_distance()
+        except Exception as e:
+            return None, f"Error getting lap telemetry for {driver_code}: {e}"
+        if telemetry is None or telemetry.empty:
+            return None, f"No telemetry data for this lap of {driver_code}."
+
+        return CompactLap.from_fastf1(driver_code, fastf1_lap, telemetry), f"Lap {row} for {driver_code} loaded."
+
     def get_fastest_lap(self, _session, driver_code):
-        # Helper to fetch the pole lap 
+        # Helper to fetch the pole lap
         return self.get_pole_position_lap(_session, driver_code)
 
-    # ---------------- Utilities ----------------
-    def _smooth_signal(self, data, window_length = 7, polyorder = 3):
-        # Apply Savitzky-Golay smoothing to reduce noise while preserving features 
-        clean_data = data.ffill().bfill()
-        return savgol_filter(clean_data, window_length = window_length, polyorder = polyorder)
+    def get_field_fastest_laps(self, _session, session_key, drivers):
+        # Fastest lap of every driver as a CompactLap, keyed by driver code. Laps are
+        # extracted concurrently: most of each extraction is pandas / NumPy work on that
+        # driver's own telemetry, which releases the GIL. Not cached here: the app holds
+        # the field in its object store, so every section and user reads the same laps.
+        drivers = list(drivers)
+        if not drivers:
+            return {}
+
+        with ThreadPoolExecutor(max_workers = min(FIELD_WORKERS, len(drivers))) as pool:
+            results = pool.map(lambda d: self.get_compact_lap(_session, session_key, d), drivers)
+
+            field = {}
+            for driver_code, (lap, message) in zip(drivers, results):
+                if lap is None:
+                    print(message)
+                    continue
+                field[driver_code] = lap
+        return field
+
+    @st.cache_resource(show_spinner = False, max_entries = SESSION_CACHE_ENTRIES)
+    def get_track_reference(_self, _session, _session_key, circuit_key):
+        # Circuit reference line for position-based alignment, built from the session's
+        # fastest lap. Cached by circuit_key alone as a resource (not copied per call), so
+        # every session and user at the circuit shares one reference and its KD-tree.
+        # Failures raise ValueError rather than return None, which would stay cached for
+        # the circuit (e.g. before any lap is complete in a live session).
+        index = SessionIndex.for_session(_session)
+        if not index.fastest_row:
+            raise ValueError("No completed lap to build the track reference from.")
+        lap_time = pd.to_timedelta(_session.laps["LapTime"]).dt.total_seconds().to_numpy()
+        driver_code = min(index.fastest_row, key = lambda d: lap_time[index.fastest_row[d]])
+
+        lap, message = _self.get_compact_lap(_session, _session_key, driver_code)
+        if lap is None:
+            raise ValueError(message)
+        try:
+            reference = TrackReference(lap.telemetry)
+            reference.tree  # built once here, not by the first threads to align with it
+            return reference
+        except Exception as e:
+            raise ValueError(f"Error building track reference: {e}") from e
+
+    @st.cache_data(show_spinner = False, max_entries = SESSION_CACHE_ENTRIES)
+    def get_field_events(_self, _session, session_key, circuit_key, drivers, _field = None):
+        # (apex distances, event table) of the field's fastest laps: braking / throttle
+        # events of every driver on the circuit's track-position axis, assigned to the
+        # corners of the fastest lap. _field: the laps if the caller already holds them.
+        field = _field if _field is not None else _self.get_field_fastest_laps(_session, session_key, drivers)
+        if not field:
+            return None
+
+        # Raises ValueError while the reference cannot be built, so no table measured on
+        # raw Distance is cached in the meantime
+        reference = _self.get_track_reference(_session, session_key, circuit_key)
+        try:
+            order = list(field)
+            telemetries = reference.align_many([field[d].telemetry for d in order])
+            distance = {d: np.maximum.accumulate(t["Distance"].to_numpy(float)) for d, t in zip(order, telemetries)}
+
+            def lap_seconds(driver):
+                lap_time = field[driver].get("LapTime")
+                return lap_time.total_seconds() if pd.notna(lap_time) else np.inf
+
+            fastest = min(order, key = lap_seconds)
+            apexes = lap_events.find_corners(distance[fastest], field[fastest].derived.get("Speed").astype(float))
+            table = lap_events.field_events({d: field[d].derived for d in order}, distance, apexes)
+            return apexes, table
+        except Exception as e:
+            print(f"Error detecting lap events: {e}")
+            return None
+
+    @st.cache_data(show_spinner = False, max_entries = SESSION_CACHE_ENTRIES)
+    def get_field_shifts(_self, _session, session_key, drivers, _field = None):
+        # Every gear shift of the field's fastest laps as one table (gear_shifts).
+        # _field: the laps if the caller already holds them.
+        field = _field if _field is not None else _self.get_field_fastest_laps(_session, session_key, drivers)
+        try:
+            return gear_shifts.extract_shifts({d: lap.telemetry for d, lap in field.items()})
+        except Exception as e:
+            print(f"Error extracting gear shifts: {e}")
+            return None
+
+    @st.cache_data(show_spinner = False, max_entries = SESSION_CACHE_ENTRIES)
+    def get_season_shifts(_self, _session_manager, gp_name, year):
+        # Shift table of an event's qualifying in one season, cached by event and season
+        # alone: the session is only loaded on a miss, so rerunning a view of other seasons
+        # never deserialises their sessions again. Failures raise ValueError and are not
+        # cached, here or by the session loader, so the next rerun tries again.
+        session, message = _session_manager.load_qualifying_session(gp_name, year)
+        if session is None:
+            _session_manager.load_qualifying_session.clear(gp_name, year)
+            raise ValueError(message)
+        drivers = tuple(_session_manager.get_drivers_and_teams_for_session(session).keys())
+        shifts = _self.get_field_shifts(session, f"{year} {gp_name} Qualifying", drivers)
+        if shifts is None:
+            raise ValueError(f"❌ Could not extract gear shifts for {year} {gp_name} Qualifying")
+        return shifts
+
+    @st.cache_data(show_spinner = False, max_entries = SESSION_CACHE_ENTRIES)
+    def get_lap_delta(_self, _telemetry1, _telemetry2, pair_key, drivers):
+        # Time delta of a pair of laps together with its time-loss attribution tables,
+        # computed once per pair (pair_key names both laps and their alignment)
+        try:
+            lap_delta = LapDelta(_telemetry1, _telemetry2, drivers)
+            for segmentation in SEGMENTATIONS:
+                lap_delta.attribution(segmentation)
+            return lap_delta
+        except Exception as e:
+            print(f"Error computing lap delta: {e}")
+            return None
+
+    @st.cache_data(show_spinner = False, max_entries = SESSION_CACHE_ENTRIES)
+    def get_ghost_replay(_self, _laps, session_key, drivers, fps = 10):
+        # Positions of the given drivers' laps on one clock at a fixed frame rate
+        # (_laps: {driver: CompactLap}), computed once per session and set of drivers
+        laps = {d: _laps[d].telemetry for d in drivers if d in _laps}
+        if len(laps) < 2:
+            return None
+        try:
+            return GhostReplay(laps, fps = fps)
+        except Exception as e:
+            print(f"Error building ghost replay: {e}")
+            return None
+
+    @st.cache_data(show_spinner = False, max_entries = SESSION_CACHE_ENTRIES)
+    def get_session_lap_samples(_self, _session, session_key):
+        # Car-data samples for every timed lap of every driver. Each lap is the window of
+        # its driver's car data that get_pole_position_lap's telemetry is sliced from, with
+        # distance integrated as add_distance does (speed x time since the previous sample,
+        # the first one timed from the lap start), then normalised to a 0 -> 1 lap fraction
+        # so laps of slightly different measured length line up. All drivers' car data is
+        # concatenated and every lap window found with one lexsort / searchsorted pass.
+        # pole_time: lap time of the pole lap that get_pole_position_lap returns.
+        if _session is None:
+            return None
+
+        pole_driver, pole_time = _self.get_pole_lap_time(_session)
+
+        if isinstance(_session, BundleSession):
+            samples = _session.lap_samples()
+            return None if samples is None else {**samples, "pole_driver": pole_driver, "pole_time": pole_time}
+
+        try:
+            laps = _session.laps
+            laps = laps[laps["LapTime"].notna() & laps["LapStartTime"].notna() & laps["Time"].notna()]
+            laps = laps[laps["PitInTime"].isna() & laps["PitOutTime"].isna()]
+            if "Deleted" in laps.columns:
+                laps = laps[laps["Deleted"] != True]
+
+            # Every car's samples end to end, sorted by (car, session time)
+            numbers = [n for n in pd.unique(laps["DriverNumber"].astype(str)) if n in _session.car_data]
+            cars = [_session.car_data[n] for n in numbers]
+            cars = [(n, c) for n, c in zip(numbers, cars) if c is not None and not c.empty]
+            if not cars:
+                return None
+            numbers = [n for n, _ in cars]
+            t = np.concatenate([c["SessionTime"].dt.total_seconds().to_numpy() for _, c in cars])
+            v = np.concatenate([c["Speed"].to_numpy(dtype = float) for _, c in cars]) / 3.6
+            car = np.repeat(np.arange(len(cars)), [len(c) for _, c in cars])
+            order = np.lexsort((t, car))
+            t, v, car = t[order], v[order], car[order]
+
+            # (car, time) as one sorted key: each car on its own band of the time axis
+            stride = float(np.nanmax(t)) + 1.0
+            key = car * stride + t
+
+            lap_car = pd.Index(numbers).get_indexer(laps["DriverNumber"].astype(str))
+            lap_start = laps["LapStartTime"].dt.total_seconds().to_numpy()
+            lap_end = laps["Time"].dt.total_seconds().to_numpy()
+
+            # sample window of every lap
+            i0 = np.searchsorted(key, lap_car * stride + lap_start, side = "left")
+            i1 = np.searchsorted(key, lap_car * stride + lap_end, side = "right")
+            keep = (lap_car >= 0) & ((i1 - i0) >= 2)
+            if not keep.any():
+                return None
+            i0, i1, lap_start = i0[keep], i1[keep], lap_start[keep]
+            n = i1 - i0
+            first = np.cumsum(n) - n
+            last = first + n - 1
+
+            # flat index of every sample in every lap (concatenated ranges)
+            sample_idx = np.arange(n.sum()) - np.repeat(first - i0, n)
+            lap_of_sample = np.repeat(np.arange(len(n)), n)
+
+            ts = t[sample_idx]
+            lap_time_s = ts - lap_start[lap_of_sample]
+            dt = np.diff(lap_time_s, prepend = 0.0)
+            dt[first] = lap_time_s[first]
+
+            ds = v[sample_idx] * dt
+            dist = np.cumsum(ds)
+            dist -= np.repeat(dist[first] - ds[first], n)
+            total = np.maximum(dist[last], 1e-9)
+
+            return {
+                "laps": pd.DataFrame({
+                    "Driver": laps["Driver"].to_numpy()[keep],
+                    "LapNumber": laps["LapNumber"].to_numpy()[keep],
+                    "LapTime": laps["LapTime"].dt.total_seconds().to_numpy()[keep],
+                }),
+                "fraction": dist / np.repeat(total, n),
+                "time": lap_time_s,
+                "lengths": n,
+                "pole_driver": pole_driver,
+                "pole_time": pole_time,
+            }
+
+        except Exception as e:
+            print(f"Error extracting session lap samples: {e}")
+            return None
+
+    @st.cache_data(show_spinner = False, max_entries = SESSION_CACHE_ENTRIES)
+    def get_lap_timeline(_self, _session, session_key):
+        # Every timed lap of the session in session-time order, with each driver's running
+        # best and the provisional pole (session-wide running best) after every lap.
+        # One sort by (driver, time) and group-wise cumulative minima; no per-driver loops.
+        if _session is None:
+            return None
 
-    def _calculate_time_deltas(self, time_series):
-        # Calculate Δt between samples
-        time_diff = time_series.diff().dt.total_seconds()
-        time_diff = time_diff.replace(0, 0.001).fillna(0.001)
-        time_diff[time_diff <= 0] = 0.001
-        return time_diff
+        try:
+            laps = _session.laps
+            lap_time = pd.to_timedelta(laps["LapTime"]).dt.total_seconds().to_numpy()
+            if "Time" in laps.columns:
+                end_time = pd.to_timedelta(laps["Time"]).dt.total_seconds().to_numpy()
+            else:
+                end_time = (pd.to_timedelta(laps["LapStartTime"]) + pd.to_timedelta(laps["LapTime"])).dt.total_seconds().to_numpy()
+            drivers = laps["Driver"].astype(str).to_numpy()
+
+            rows = np.flatnonzero(~np.isnan(lap_time) & ~np.isnan(end_time) & laps["Driver"].notna().to_numpy())
+            if rows.size == 0:
+                return None
+
+            # Laps deleted for track limits are shown but never count as a best
+            counts = np.ones(len(laps), dtype = bool)
+            if "Deleted" in laps.columns:
+                counts = (laps["Deleted"] != True).to_numpy()
+
+            codes, group = np.unique(drivers[rows], return_inverse = True)
+            order = np.lexsort((end_time[rows], group))
+            rows, group = rows[order], group[order]
+
+            # Group-wise running minimum in one pass: shifting each driver's values below
+            # every earlier driver's makes np.minimum.accumulate restart at each group.
+            # Laps that do not count use a sentinel above any lap time.
+            sentinel, shift = 1.0e6, 1.0e7
+            key = np.where(counts[rows], lap_time[rows], sentinel)
+            running = np.minimum.accumulate(key - group * shift) + group * shift
+            running_best = np.where(running >= sentinel, np.nan, running)
+
+            # Provisional pole: running minimum over all counted laps in session-time order
+            by_time = np.argsort(end_time[rows], kind = "stable")
+            pole = np.empty(rows.size)
+            pole[by_time] = np.minimum.accumulate(np.where(counts[rows], lap_time[rows], np.inf)[by_time])
+            pole[np.isinf(pole)] = np.nan
+
+            segment = SessionIndex.for_session(_session).lap_segment
+            return pd.DataFrame({
+                "Driver": drivers[rows],
+                "LapNumber": laps["LapNumber"].to_numpy()[rows] if "LapNumber" in laps.columns else np.nan,
+                "SessionTime": end_time[rows],
+                "LapTime": lap_time[rows],
+                "Counts": counts[rows],
+                "RunningBest": running_best,
+                "ProvisionalPole": pole,
+                "Segment": segment[rows] if len(segment) == len(laps) else 0,
+            })
+
+        except Exception as e:
+            print(f"Error building lap timeline: {e}")
+            return None
 
     # ---------------- Performance Metrics ----------------
     def calculate_performance_metrics(self, telemetry):
-        # Calculate lap performance metrics
-        if telemetry is None or telemetry.empty:
+        # Calculate lap performance metrics from recorded and derived channels. telemetry
+        # is a lap's DerivedChannels (channels memoised with the lap) or a telemetry frame.
+        channels = telemetry if isinstance(telemetry, DerivedChannels) else DerivedChannels(telemetry)
+        if channels.telemetry is None or channels.telemetry.empty:
             return {}
 
         metrics = {}
         try:
-            total_points = len(telemetry)
+            total_points = len(channels.telemetry)
 
             # ---- Full Throttle Percentage ----
-            if "Throttle" in telemetry.columns:
-                throttle = pd.to_numeric(telemetry["Throttle"], errors = "coerce").fillna(0)
-
-                # Normalise throttle values
-                if throttle.max() <= 1.0:
-                    throttle *= 100
-
-                # Full throttle defined as ≥ 98% 
-                full_throttle_pct = (throttle >= 98).sum() / total_points * 100
-                metrics["full_throttle"] = round(full_throttle_pct)
+            if channels.available("full_throttle"):
+                metrics["full_throttle"] = round(channels.get("full_throttle").sum() / total_points * 100)
             else:
                 metrics["full_throttle"] = None
 
             # ---- Heavy Braking Percentage ----
-            if "Brake" in telemetry.columns:
-                brake = pd.to_numeric(telemetry["Brake"], errors = "coerce").fillna(0)
-
-                # Normalise brake values 
-                if brake.max() <= 1.0:
-                    brake *= 100
-
+            if channels.available("brake_pct"):
                 # Heavy braking = brake pressure > 50%
+                brake = channels.get("brake_pct")
                 metrics["heavy_braking"] = round((brake > 50).sum() / total_points * 100) if brake.sum() > 0 else 0
             else:
                 metrics["heavy_braking"] = None
 
             # ---- Cornering Time + Speeds ----
-            if "Speed" in telemetry.columns:
+            if channels.available("Speed"):
                 # Define cornering as speed < 200 km/h
-                cornering_pct = (telemetry["Speed"] < 200).sum() / total_points * 100
+                speed = channels.get("Speed").astype(float)
                 metrics.update({
-                    "cornering": round(cornering_pct),
-                    "max_speed": float(telemetry["Speed"].max()),
-                    "min_speed": float(telemetry["Speed"].min()),
+                    "cornering": round((speed < 200).sum() / total_points * 100),
+                    "max_speed": float(np.nanmax(speed)),
+                    "min_speed": float(np.nanmin(speed)),
                 })
             else:
                 metrics.update({"cornering": None, "max_speed": None, "min_speed": None})
 
             # ---- Longitudinal Acceleration ----
-            if "Speed" in telemetry.columns and "Time" in telemetry.columns:
-                # km/h to m/s
-                speed_ms = telemetry["Speed"] / 3.6
-
-                # Δt between samples
-                time_diff = self._calculate_time_deltas(telemetry["Time"])
-
-                # Acceleration = Δv / Δt
-                longitudinal_accel_ms2 = speed_ms.diff() / time_diff
-
-                # m/s^2 to g by dividing by 9.81
-                telemetry["longitudinal_accel_g"] = (longitudinal_accel_ms2 / 9.81).clip(-6, 6)
-
-                # Max forward acceleration & Max braking 
-                valid_accel = telemetry["longitudinal_accel_g"].replace([np.inf, -np.inf], np.nan).dropna()
-                if not valid_accel.empty:
-                    metrics["max_accel_g"] = float(valid_accel.max())
-                    metrics["max_braking_g"] = float(abs(valid_accel.min()))
-                else:
-                    metrics.update({"max_accel_g": None, "max_braking_g": None})
+            # Max forward acceleration & Max braking
+            accel = channels.get("longitudinal_accel_g")
+            accel = accel[np.isfinite(accel)] if accel is not None else []
+            if len(accel):
+                metrics["max_accel_g"] = float(accel.max())
+                metrics["max_braking_g"] = float(abs(accel.min()))
             else:
                 metrics.update({"max_accel_g": None, "max_braking_g": None})
 
             # ---- Lateral Acceleration ----
-            if all(col in telemetry.columns for col in ["X", "Y", "Speed"]):
-                try:
-                    if len(telemetry) >= 7:
-                        # Much lighter smoothing to preserve cornering detail
-                        x_smooth = self._smooth_signal(telemetry["X"], window_length = 5, polyorder = 2)
-                        y_smooth = self._smooth_signal(telemetry["Y"], window_length = 5, polyorder = 2)
-
-                        # Calculate derivatives
-                        dx, dy = np.gradient(x_smooth), np.gradient(y_smooth)
-                        ds = np.sqrt(dx**2 + dy**2)
-                        ds[ds < 0.1] = 0.1
-
-                        # Calculate heading
-                        heading = np.arctan2(dy, dx)
-
-                        # Calculate heading changes
-                        dheading = np.diff(heading)
-                        
-                        # Handle angle wrapping
-                        dheading = np.where(dheading > np.pi, dheading - 2*np.pi, dheading)
-                        dheading = np.where(dheading < -np.pi, dheading + 2*np.pi, dheading)
-                        dheading = np.append(dheading, 0)
-
-                        # Calculate curvature (less restrictive clipping)
-                        raw_curvature = dheading / ds
-                        
-                        # Use percentile-based clipping instead of hard limits
-                        curvature_99 = np.percentile(np.abs(raw_curvature), 99)
-                        curvature_limit = max(curvature_99, 0.1)  # At least 0.1 rad/m for F1 corners
-                        
-                        curvature = np.clip(raw_curvature, -curvature_limit, curvature_limit)
-
-                        # Calculate lateral acceleration
-                        speed_ms = telemetry["Speed"] / 3.6
-                        lateral_accel_ms2 = speed_ms**2 * np.abs(curvature)
-                        
-                        # Convert to g 
-                        lat_accel_g = lateral_accel_ms2 / 9.81
-                        
-                        # Apply realistic limits (0-8g)
-                        telemetry["lateral_accel_g"] = np.clip(lat_accel_g, 0, 8)
-
-                        # Calculate maximum
-                        valid_lateral = telemetry["lateral_accel_g"].replace([np.inf, -np.inf], np.nan).dropna()
-                        if not valid_lateral.empty and valid_lateral.max() > 0.5:
-                            metrics["max_lateral_g"] = float(valid_lateral.max())
-                        else:
-                            # Fallback calculation if primary method fails
-                            print("Primary lateral calculation produced low values, using fallback...")
-                            
-                            # Simple speed-based estimation for corners
-                            speed_threshold = telemetry["Speed"].quantile(0.8) * 0.75
-                            corner_mask = telemetry["Speed"] < speed_threshold
-                            
-                            # Estimate lateral g based on speed drop in corners
-                            corner_speeds = telemetry.loc[corner_mask, "Speed"] / 3.6
-                            estimated_lat_g = np.zeros(len(telemetry))
-                            
-                            # For corners, estimate lateral g 
-                            estimated_lat_g[corner_mask] = (corner_speeds / 20) + 2  # 2-5g range
-                            
-                            telemetry["lateral_accel_g"] = estimated_lat_g
-                            metrics["max_lateral_g"] = float(estimated_lat_g.max()) if estimated_lat_g.max() > 0 else 3.0
-                            
-                    else:
-                        telemetry["lateral_accel_g"] = np.zeros(len(telemetry))
-                        metrics["max_lateral_g"] = 0.0
-                        
-                except Exception as e:
-                    print(f"Lateral acceleration calculation failed: {e}")
-                    # fallback ==> estimate based on speed patterns
-                    if "Speed" in telemetry.columns:
-                        speed_var = telemetry["Speed"].rolling(window = 10).std().fillna(0)
-                        estimated_lat = (speed_var / 10).clip(0, 5)  # Speed variation indicates cornering
-                        telemetry["lateral_accel_g"] = estimated_lat
-                        metrics["max_lateral_g"] = float(estimated_lat.max())
-                    else:
-                        telemetry["lateral_accel_g"] = np.zeros(len(telemetry))
-                        metrics["max_lateral_g"] = None
-            else:
-                telemetry["lateral_accel_g"] = np.zeros(len(telemetry))
+            lateral = channels.get("lateral_accel_g")
+            if lateral is None:
                 metrics["max_lateral_g"] = None
-
-            # Store raw longitudinal accel in m/s^2 for plotting
-            if "longitudinal_accel_g" in telemetry.columns:
-                telemetry["longitudinal_accel"] = telemetry["longitudinal_accel_g"] * 9.81
+            elif len(lateral) < 7:
+                metrics["max_lateral_g"] = 0.0
+            else:
+                peak = np.nanmax(lateral)
+                metrics["max_lateral_g"] = float(peak) if peak > 0 else 3.0
 
             return metrics
 
@@ -289,4 +556,4 @@ class DataAnalyser:
             }
         except Exception as e:
             print(f"Error analysing braking patterns: {e}")
-            return {}
\ No newline at end of file
+            return {}
\ No newline at end of file
@@ -0,0 +1,203 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from signal_processing import savgol
+
+
+# ---------------- Derived channels ----------------
+# Channels computed from a lap's recorded telemetry (accelerations, curvature, ...). Each
+# is registered with the channels it reads; a DerivedChannels object computes a channel
+# the first time it is asked for, after its inputs, and keeps the result for the lap, so
+# charts and metrics request only what they use and nothing is computed twice.
+
+G = 9.81
+
+REGISTRY = {}   # name -> (input channel names, function of the input arrays)
+
+
+def derived(name, *inputs):
+    # Registers the decorated function as channel name, computed from inputs
+    def register(function):
+        REGISTRY[name] = (inputs, function)
+        return function
+    return register
+
+
+class DerivedChannels:
+
+    def __init__(self, telemetry):
+        self.telemetry = telemetry
+        self._values = {}
+        self._lock = threading.RLock()
+
+    def available(self, name):
+        # Recorded, or derivable from what the lap recorded
+        if name in self.telemetry.columns:
+            return True
+        spec = REGISTRY.get(name)
+        return spec is not None and all(self.available(i) for i in spec[0])
+
+    def get(self, name):
+        # The channel as an array: recorded columns as they are, derived channels computed
+        # on first request. None when the lap lacks an input.
+        if name in self.telemetry.columns:
+            return self.telemetry[name].to_numpy()
+        with self._lock:
+            if name not in self._values:
+                if not self.available(name):
+                    return None
+                inputs, function = REGISTRY[name]
+                self._values[name] = function(*(self.get(i) for i in inputs))
+            return self._values[name]
+
+    def frame(self, *names):
+        # Shallow copy of the telemetry with the requested derived channels attached
+        frame = self.telemetry.copy(deep = False)
+        for name in names:
+            if name not in frame.columns and self.available(name):
+                frame[name] = self.get(name)
+        return frame
+
+    @property
+    def nbytes(self):
+        return sum(getattr(v, "nbytes", 0) for v in self._values.values())
+
+
+def with_channels(telemetry, *names):
+    # telemetry itself when it already has the channels, else a copy with them attached
+    if all(name in telemetry.columns for name in names):
+        return telemetry
+    return DerivedChannels(telemetry).frame(*names)
+
+
+# ---------------- Time / speed ----------------
+@derived("time_s", "Time")
+def _time_s(time):
+    # Lap time channel in seconds (timedelta or plain seconds)
+    if np.issubdtype(time.dtype, np.timedelta64):
+        return time / np.timedelta64(1, "s")
+    return time.astype(float)
+
+
+@derived("dt", "time_s")
+def _dt(time_s):
+    # Δt between samples (s); missing and non-positive steps count as 1 ms
+    dt = np.diff(time_s, prepend = np.nan)
+    return np.where(np.isfinite(dt) & (dt > 0), dt, 0.001)
+
+
+@derived("speed_ms", "Speed")
+def _speed_ms(speed):
+    return speed.astype(float) / 3.6
+
+
+@derived("speed_delta", "Speed")
+def _speed_delta(speed):
+    # Speed change from the previous sample (km/h)
+    return np.diff(speed.astype(float), prepend = np.nan)
+
+
+@derived("longitudinal_accel_g", "speed_ms", "dt")
+def _longitudinal_accel_g(speed_ms, dt):
+    # Δv / Δt in g, limited to ±6 g
+    return np.clip(np.diff(speed_ms, prepend = np.nan) / dt / G, -6, 6)
+
+
+@derived("longitudinal_accel", "longitudinal_accel_g")
+def _longitudinal_accel(accel_g):
+    # m/s²
+    return accel_g * G
+
+
+@derived("jerk", "longitudinal_accel", "dt")
+def _jerk(accel, dt):
+    # Rate of change of longitudinal acceleration (m/s³)
+    return np.diff(accel, prepend = np.nan) / dt
+
+
+# ---------------- Position / cornering ----------------
+@derived("xy_smooth", "X", "Y")
+def _xy_smooth(x, y):
+    # X and Y with light Savitzky-Golay smoothing that keeps cornering detail, filtered
+    # together as the two rows of one array
+    return savgol(np.vstack((x, y)), 5, 2)
+
+
+@derived("x_smooth", "xy_smooth")
+def _x_smooth(xy):
+    return xy[0]
+
+
+@derived("y_smooth", "xy_smooth")
+def _y_smooth(xy):
+    return xy[1]
+
+
+@derived("heading", "x_smooth", "y_smooth")
+def _heading(x, y):
+    # Direction of travel (rad)
+    return np.arctan2(np.gradient(y), np.gradient(x))
+
+
+@derived("curvature", "x_smooth", "y_smooth", "heading")
+def _curvature(x, y, heading):
+    # Heading change per unit of path (rad/m), clipped at the 99th percentile (at least
+    # 0.1 rad/m for F1 corners) instead of a hard limit
+    ds = np.hypot(np.gradient(x), np.gradient(y))
+    ds[ds < 0.1] = 0.1
+    dheading = np.diff(heading)
+    dheading = np.where(dheading > np.pi, dheading - 2 * np.pi, dheading)
+    dheading = np.where(dheading < -np.pi, dheading + 2 * np.pi, dheading)
+    raw = np.append(dheading, 0) / ds
+    limit = max(np.percentile(np.abs(raw), 99), 0.1)
+    return np.clip(raw, -limit, limit)
+
+
+@derived("lateral_accel_g", "Speed", "curvature")
+def _lateral_accel_g(speed, curvature):
+    # v² · |curvature| in g, limited to 0-8 g
+    speed = speed.astype(float)
+    if speed.size < 7:
+        return np.zeros(speed.size)
+    lateral = np.clip((speed / 3.6) ** 2 * np.abs(curvature) / G, 0, 8)
+    if np.nanmax(lateral) > 0.5:
+        return lateral
+
+    # Position data too coarse for curvature: estimate from the speed in the slow
+    # corners (2-5 g)
+    corner = speed < np.nanquantile(speed, 0.8) * 0.75
+    return np.where(corner, speed / 3.6 / 20 + 2, 0.0)
+
+
+# ---------------- Driver inputs ----------------
+def _percent(values):
+    # Pedal channel in % (some sources record 0-1 or booleans)
+    values = pd.to_numeric(pd.Series(values), errors = "coerce").fillna(0).to_numpy(dtype = float)
+    return values * 100 if values.size and values.max() <= 1.0 else values
+
+
+@derived("throttle_pct", "Throttle")
+def _throttle_pct(throttle):
+    return _percent(throttle)
+
+
+@derived("brake_pct", "Brake")
+def _brake_pct(brake):
+    return _percent(brake)
+
+
+@derived("full_throttle", "throttle_pct")
+def _full_throttle(throttle_pct):
+    # Full throttle is ≥ 98%
+    return throttle_pct >= 98
+
+
+@derived("throttle_on_distance", "Distance", "full_throttle")
+def _throttle_on_distance(distance, full_throttle):
+    # Metres covered since the driver last went to full throttle (0 off full throttle)
+    step = np.diff(distance.astype(float), prepend = distance[:1].astype(float))
+    covered = np.cumsum(np.where(full_throttle, step, 0.0))
+    start = np.maximum.accumulate(np.where(full_throttle, 0.0, covered))
+    return np.where(full_throttle, covered - start, 0.0)
@@ -0,0 +1,66 @@
+import numpy as np
+
+
+# ---------------- Level-of-detail helpers for line traces ----------------
+# All functions return sorted indices into the input, so any other array sampled at the
+# same points (hover data, a second channel) can be subset the same way.
+
+def lttb_indices(x, y, n_out):
+    # Largest-Triangle-Three-Buckets: keeps the first and last point and, from each of
+    # n_out - 2 equal-count buckets, the point forming the largest triangle with the point
+    # kept from the previous bucket and the mean of the next bucket. Peaks, troughs and
+    # braking points survive; flat stretches collapse.
+    x = np.asarray(x, dtype = float)
+    y = np.asarray(y, dtype = float)
+    n = x.size
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Bucket boundaries over the interior points 1 .. n-2
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts, stops = edges[:-1], edges[1:]
+
+    # Mean of each bucket (the "next bucket" term), with the last point after the final bucket
+    counts = np.maximum(stops - starts, 1)
+    mean_x = np.append(np.add.reduceat(x[:-1], starts) / counts, x[-1])
+    mean_y = np.append(np.add.reduceat(y[:-1], starts) / counts, y[-1])
+
+    keep = np.empty(n_out, dtype = np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = starts[b], stops[b]
+        if hi <= lo:
+            keep[b + 1] = lo
+            a = lo
+            continue
+        # Twice the triangle area (a, candidate, next-bucket mean); the constant factor
+        # does not change the argmax
+        area = np.abs(
+            (x[a] - mean_x[b + 1]) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (mean_y[b + 1] - y[a])
+        )
+        a = lo + int(np.nanargmax(area)) if np.isfinite(area).any() else lo
+        keep[b + 1] = a
+
+    return np.unique(keep)
+
+
+def change_point_indices(y):
+    # Exact reduction for piecewise-constant channels (gear, on/off brake): keep the
+    # samples on both sides of every change plus the two ends
+    y = np.asarray(y)
+    n = y.size
+    if n <= 2:
+        return np.arange(n)
+    changed = np.flatnonzero(y[1:] != y[:-1])
+    return np.unique(np.concatenate(([0, n - 1], changed, changed + 1)))
+
+
+def window_slice(x, x_range):
+    # Samples inside x_range on a sorted x, widened by one point each side so the line
+    # still reaches the window edges
+    if x_range is None:
+        return slice(0, len(x))
+    lo, hi = np.searchsorted(x, x_range)
+    return slice(max(lo - 1, 0), min(hi + 1, len(x)))
@@ -0,0 +1,66 @@
+import numpy as np
+import plotly
+
+
+# ---------------- Compact figure arrays ----------------
+# Figures reach the browser as JSON. plotly.py 6+ writes NumPy arrays as base64 typed
+# arrays ({"dtype": "f4", "bdata": ...}) instead of decimal text, keeping whatever dtype
+# the array has, so narrowing each array to the precision its channel actually needs
+# (float32, or small integers for whole-number channels) shrinks the payload further.
+# Older plotly.py writes text either way; there the values are only rounded, which
+# still shortens every number.
+
+TYPED_ARRAYS = int(plotly.__version__.split(".")[0]) >= 6
+
+# Decimal places kept per channel (the precision policy)
+PRECISION = {
+    "distance": 1,    # m
+    "position": 0,    # circuit X/Y, FastF1 units of 0.1 m
+    "speed": 1,       # km/h
+    "percent": 0,     # throttle / brake
+    "gear": 0,
+    "accel": 2,       # g
+    "delta": 3,       # s
+    "time": 3,        # s
+    "lap": 0,         # lap numbers
+}
+
+
+def encode_array(values, decimals):
+    # Round to the channel's precision and narrow the dtype; None becomes NaN, which
+    # plotly draws as a gap just like None
+    array = np.round(np.asarray(values, dtype = float), decimals)
+    if not TYPED_ARRAYS:
+        return array
+
+    if decimals <= 0 and array.size and np.isfinite(array).all():
+        lo, hi = array.min(), array.max()
+        for dtype in (np.int8, np.int16, np.int32):
+            info = np.iinfo(dtype)
+            if info.min <= lo and hi <= info.max:
+                return array.astype(dtype)
+    return array.astype(np.float32)
+
+
+def encode_trace(trace, precision = None, **channels):
+    # channels maps a trace property ("x", "y", "customdata", "marker.color", ...) to
+    # the channel it holds, e.g. encode_trace(trace, x = "distance", y = "speed")
+    precision = precision or PRECISION
+    for prop, channel in channels.items():
+        values = trace[prop]
+        if values is None or isinstance(values, str) or np.ndim(values) == 0 or len(values) < 2:
+            continue
+        # Clear first: plotly ignores an assignment that compares equal to the current
+        # value, which would keep the old list / float64 array
+        trace[prop] = None
+        trace[prop] = encode_array(values, precision[channel])
+    return trace
+
+
+def encode_figure(fig, precision = None, **channels):
+    # encode_trace for every trace of the figure that has the given properties
+    for trace in fig.data:
+        encode_trace(trace, precision, **{
+            prop: channel for prop, channel in channels.items() if prop.split(".")[0] in trace
+        })
+    return fig
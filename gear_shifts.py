@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+from lap_alignment import ensure_distance
+from signal_processing import fill_gaps
+
+
+# ---------------- Gear-shift analysis ----------------
+# Every up- and downshift of any number of laps with its distance, speed and RPM. The laps'
+# channels are concatenated and scanned with one diff / nonzero pass, masking the joins
+# between laps, so a season's worth of stored laps is a single vectorised extraction.
+# Summaries are pivots of the resulting shift table.
+
+SHIFT_COLUMNS = ["Driver", "Direction", "From", "To", "Distance", "Speed", "RPM"]
+
+
+def extract_shifts(telemetry_by_driver):
+    # Shift table of {driver: telemetry}. Speed is taken at the shift, RPM just before it
+    # (the engine speed the driver shifted at). Neutral (0) readings hold the last gear.
+    laps = {
+        d: ensure_distance(t) for d, t in telemetry_by_driver.items()
+        if t is not None and len(t) > 1 and "nGear" in t.columns
+    }
+    if not laps:
+        return pd.DataFrame(columns = SHIFT_COLUMNS)
+
+    drivers = list(laps)
+    lengths = np.array([len(t) for t in laps.values()])
+
+    def channel(name):
+        return np.concatenate([
+            t[name].to_numpy(float) if name in t.columns else np.full(len(t), np.nan)
+            for t in laps.values()
+        ])
+
+    # Gaps are filled lap by lap, so a lap's leading neutral readings take its own first
+    # gear rather than the previous driver's last one. A lap without any gear stays NaN.
+    gear = channel("nGear")
+    gear = np.concatenate([
+        fill_gaps(g) for g in np.split(np.where(gear > 0, gear, np.nan), np.cumsum(lengths)[:-1])
+    ])
+    lap = np.repeat(np.arange(len(drivers)), lengths)
+
+    change = np.flatnonzero(
+        (gear[1:] != gear[:-1]) & (lap[1:] == lap[:-1]) & ~np.isnan(gear[1:]) & ~np.isnan(gear[:-1])
+    ) + 1
+    before, after = gear[change - 1], gear[change]
+    return pd.DataFrame({
+        "Driver": pd.Categorical.from_codes(lap[change], categories = drivers),
+        "Direction": pd.Categorical(np.where(after > before, "up", "down"), categories = ["up", "down"]),
+        "From": before.astype(np.int8),
+        "To": after.astype(np.int8),
+        "Distance": channel("Distance")[change].astype(np.float32),
+        "Speed": channel("Speed")[change].astype(np.float32),
+        "RPM": channel("RPM")[change - 1].astype(np.float32),
+    })
+
+
+def _transition_columns(shifts):
+    # "3→4" labels in gear order
+    pairs = shifts[["From", "To"]].drop_duplicates().sort_values(["From", "To"])
+    return [f"{a}→{b}" for a, b in pairs.itertuples(index = False)]
+
+
+def shift_points(shifts, value = "Speed", direction = "up", by = "Driver"):
+    # by x gear changes: median value (Speed, RPM, Distance) at every up- or downshift
+    rows = shifts[shifts["Direction"] == direction]
+    if rows.empty:
+        return pd.DataFrame()
+    labels = rows["From"].astype(str) + "→" + rows["To"].astype(str)
+    table = rows.assign(Shift = labels).pivot_table(
+        index = by, columns = "Shift", values = value, aggfunc = "median", observed = True
+    )
+    return table[[c for c in _transition_columns(rows) if c in table.columns]]
+
+
+def shift_summary(shifts):
+    # Per-driver distribution of shift points: counts, upshift RPM quartiles, top gear
+    up = shifts[shifts["Direction"] == "up"]
+    rpm = up.groupby("Driver", observed = True)["RPM"]
+    summary = pd.DataFrame({
+        "Upshifts": up.groupby("Driver", observed = True).size(),
+        "Downshifts": shifts[shifts["Direction"] == "down"].groupby("Driver", observed = True).size(),
+        "Upshift RPM (median)": rpm.median(),
+        "Upshift RPM (IQR)": rpm.quantile(0.75) - rpm.quantile(0.25),
+        "Top gear": shifts.groupby("Driver", observed = True)["To"].max(),
+    })
+    return summary.fillna(0)
@@ -0,0 +1,57 @@
+import numpy as np
+
+from lap_alignment import ensure_distance, distance_time, interp_rows
+
+
+# ---------------- Ghost-car replay ----------------
+# Several drivers' laps replayed on one clock. Every lap's X / Y position is resampled
+# from its lap-time channel onto a fixed frame rate once, so any stretch of the replay is
+# a slice of (frames, drivers) arrays and no chart ever interpolates telemetry itself.
+# A driver whose lap is over waits on the line until the slowest lap finishes.
+
+class GhostReplay:
+
+    def __init__(self, laps, fps = 10, outline_points = 600):
+        # laps: {driver code: telemetry with X, Y and Time (or Distance + Speed)}
+        self.drivers = list(laps)
+        self.fps = fps
+
+        times, xs, ys, distances = [], [], [], []
+        for telemetry in laps.values():
+            telemetry = ensure_distance(telemetry)
+            d, t = distance_time(telemetry)
+            times.append(np.maximum.accumulate(t))
+            xs.append(telemetry["X"].to_numpy(float))
+            ys.append(telemetry["Y"].to_numpy(float))
+            distances.append(d - d[0])
+
+        self.lap_times = np.array([t[-1] for t in times])
+        n_frames = int(np.ceil(self.lap_times.max() * fps)) + 1
+        self.time = np.arange(n_frames) / fps
+
+        # One interpolation per channel for all drivers; queries past the end of a lap
+        # are clipped to its last sample, which holds the car on the line
+        self.x = interp_rows(self.time, times, xs).T.astype(np.float32)
+        self.y = interp_rows(self.time, times, ys).T.astype(np.float32)
+        self.distance = interp_rows(self.time, times, distances).T.astype(np.float32)
+
+        # Track outline from the first lap, thinned for drawing under the cars
+        step = max(1, int(np.ceil(len(xs[0]) / outline_points)))
+        self.outline_x = np.append(xs[0][::step], xs[0][-1])
+        self.outline_y = np.append(ys[0][::step], ys[0][-1])
+
+    @property
+    def n_frames(self):
+        return self.time.size
+
+    def chunks(self, seconds):
+        # (start, stop) frame ranges of consecutive sections of the replay; each section
+        # ends on the frame the next one starts from, so playback continues seamlessly
+        step = max(1, int(round(seconds * self.fps)))
+        starts = range(0, max(self.n_frames - 1, 1), step)
+        return [(start, min(start + step, self.n_frames - 1) + 1) for start in starts]
+
+    def gaps(self, frames):
+        # Distance (m) each driver is behind the car furthest round the lap, per frame
+        distance = self.distance[frames]
+        return distance.max(axis = 1, keepdims = True) - distance
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+
+# ---------------- Distance / time extraction ----------------
+
+def ensure_distance(telemetry):
+    # Add a Distance column from X/Y when the telemetry has none
+    if "Distance" in telemetry.columns:
+        return telemetry
+
+    telemetry = telemetry.copy()
+    if "X" in telemetry.columns and "Y" in telemetry.columns:
+        dx = telemetry["X"].diff().fillna(0)
+        dy = telemetry["Y"].diff().fillna(0)
+        telemetry["Distance"] = np.cumsum(np.hypot(dx, dy))
+    else:
+        telemetry["Distance"] = np.arange(len(telemetry), dtype = float)
+
+    return telemetry
+
+
+def distance_time(df):
+    # Return (distance_m, cumulative_time_s) with safe handling
+    d = df["Distance"].to_numpy(dtype = float)
+    d = np.maximum.accumulate(d)  # enforce monotonic distance
+
+    # true timestamps if present
+    t_col = None
+    for c in ("SessionTime", "Time", "LapTime", "Timestamp"):
+        if c in df.columns:
+            t_col = c
+            break
+
+    if t_col is not None:
+        s = df[t_col]
+        if pd.api.types.is_timedelta64_dtype(s):
+            t = s.dt.total_seconds().to_numpy()
+        elif pd.api.types.is_datetime64_dtype(s):
+            t = (s - s.min()).dt.total_seconds().to_numpy()
+        else:
+            t = s.to_numpy(dtype = float)
+            # auto-convert ns -> s if values are too big
+            if t.size and np.median(np.abs(t[t != 0])) > 1e6:
+                t = t / 1e9
+        t0 = np.interp(d.min(), d, t)
+        return d, (t - t0)
+
+    # integrate from speed (km/h -> m/s)
+    v = df["Speed"].to_numpy(dtype = float)
+    v = np.where(v > 60.0, v / 3.6, v)
+    v = np.clip(v, 0.5, None)
+    ds = np.diff(d, prepend = d[0])
+    t = np.cumsum(ds / v)
+    return d, (t - t[0])
+
+
+# ---------------- Many-series interpolation ----------------
+
+def common_distance_grid(distances, n_points = 2000):
+    # Evenly spaced distance grid over the stretch that every lap covers
+    lap_m = float(min(np.max(d) for d in distances))
+    return np.linspace(0.0, lap_m, n_points)
+
+
+def interp_rows(grid, xs, ys):
+    # Interpolate many (x, y) series onto one shared grid with a single np.interp call
+    if len(xs) == 0:
+        return np.empty((0, np.size(grid)))
+
+    lengths = np.array([len(x) for x in xs])
+    return interp_concatenated(grid, np.concatenate(xs), np.concatenate(ys), lengths)
+
+
+def interp_concatenated(grid, x_cat, y_cat, lengths):
+    # Same as interp_rows for series that are already concatenated end to end.
+    # Each series is shifted onto its own band of the x axis so they form one
+    # monotonic array; queries are clipped to each series' own range so that
+    # no row ever reads values from its neighbour.
+    grid = np.asarray(grid, dtype = float)
+    x_cat = np.asarray(x_cat, dtype = float)
+    y_cat = np.asarray(y_cat, dtype = float)
+    lengths = np.asarray(lengths)
+    n_rows = len(lengths)
+
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    row_min = np.minimum.reduceat(x_cat, starts)
+    row_max = np.maximum.reduceat(x_cat, starts)
+
+    stride = float(max(row_max.max(), grid.max()) - min(row_min.min(), grid.min())) * 2 + 1.0
+    offsets = np.arange(n_rows) * stride
+
+    xp = x_cat + np.repeat(offsets, lengths)
+    queries = np.clip(grid[None, :], row_min[:, None], row_max[:, None]) + offsets[:, None]
+
+    return np.interp(queries.ravel(), xp, y_cat).reshape(n_rows, grid.size)
@@ -0,0 +1,136 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from derived_channels import DerivedChannels
+
+
+class CompactLap:
+    # Slim copy of an analysed lap for per-user state: the handful of lap fields the UI
+    # shows plus float32 / int8 / bool arrays for the telemetry channels the app uses.
+    # Unused FastF1 channels (Date, SessionTime, DRS, Source, Status, DriverAhead, ...) and
+    # the back-reference to the whole Session that a FastF1 Lap carries are dropped.
+    # shared_path is set when the arrays are memory-mapped from a SharedTelemetryStore.
+
+    __slots__ = ("driver", "info", "columns", "shared_path", "_frame", "_derived")
+
+    _derived_lock = threading.Lock()
+
+    LAP_FIELDS = (
+        "Driver", "Team", "LapNumber", "LapTime",
+        "Sector1Time", "Sector2Time", "Sector3Time", "Compound",
+    )
+
+    CHANNEL_DTYPES = {
+        "Distance": np.float32,
+        "Time": np.float32,  # seconds from lap start
+        "Speed": np.float32,
+        "Throttle": np.float32,
+        "Brake": np.bool_,
+        "nGear": np.int8,
+        "RPM": np.float32,
+        "X": np.float32,
+        "Y": np.float32,
+    }
+
+    def __init__(self, driver, info, columns, shared_path = None):
+        self.driver = driver
+        self.info = info
+        self.columns = columns
+        self.shared_path = shared_path
+        self._frame = None
+        self._derived = None
+
+    @classmethod
+    def from_fastf1(cls, driver, lap, telemetry):
+        # Build from a FastF1 Lap and its telemetry
+        info = {field: lap[field] for field in cls.LAP_FIELDS if field in lap.index}
+
+        columns = {}
+        for name, dtype in cls.CHANNEL_DTYPES.items():
+            if name not in telemetry.columns:
+                continue
+
+            values = telemetry[name]
+            if pd.api.types.is_timedelta64_dtype(values):
+                values = values.dt.total_seconds()
+            elif dtype is np.bool_:
+                values = pd.to_numeric(values, errors = "coerce").fillna(0) > 0
+            elif dtype is np.int8:
+                values = pd.to_numeric(values, errors = "coerce").fillna(0)
+
+            columns[name] = values.to_numpy(dtype = dtype)
+
+        return cls(driver, info, columns)
+
+    def __getstate__(self):
+        # The lazily built DataFrame is not pickled (st.cache_data stores these), and a
+        # shared lap pickles only its path so unpickling maps the same files again
+        if self.shared_path is not None:
+            return self.driver, self.info, None, self.shared_path
+        return self.driver, self.info, self.columns, None
+
+    def __setstate__(self, state):
+        self.driver, self.info, self.columns, self.shared_path = state
+        if self.columns is None:
+            from shared_telemetry import SharedTelemetryStore
+            self.columns = SharedTelemetryStore.load_columns(self.shared_path)
+        self._frame = None
+        self._derived = None
+
+    # ---------------- Lap fields ----------------
+    def __getitem__(self, field):
+        return self.info[field]
+
+    def get(self, field, default = None):
+        return self.info.get(field, default)
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()), ()))
+
+    def info_to_json(self):
+        # Lap fields as JSON-safe values (timedeltas as {"seconds": x}, missing as None)
+        encoded = {}
+        for field, value in self.info.items():
+            if value is None or value is pd.NaT or (isinstance(value, float) and np.isnan(value)):
+                encoded[field] = None
+            elif isinstance(value, (pd.Timedelta, np.timedelta64)):
+                encoded[field] = {"seconds": pd.Timedelta(value).total_seconds()}
+            elif isinstance(value, np.generic):
+                encoded[field] = value.item()
+            else:
+                encoded[field] = value
+        return encoded
+
+    @staticmethod
+    def info_from_json(encoded):
+        return {
+            field: pd.Timedelta(seconds = value["seconds"]) if isinstance(value, dict) else value
+            for field, value in encoded.items()
+        }
+
+    # ---------------- Telemetry ----------------
+    @property
+    def telemetry(self):
+        # DataFrame over the compact arrays (no copy), built on first use. It is shared
+        # between users and never written to.
+        if self._frame is None:
+            self._frame = pd.DataFrame(self.columns, copy = False)
+        return self._frame
+
+    @property
+    def derived(self):
+        # The lap's derived channels: each computed on first request and kept with the lap,
+        # so every user, chart and metric reading a shared lap reuses it
+        if self._derived is None:
+            with self._derived_lock:
+                if self._derived is None:
+                    self._derived = DerivedChannels(self.telemetry)
+        return self._derived
+
+    @property
+    def nbytes(self):
+        frame_bytes = 0 if self._frame is None else int(self._frame.memory_usage(deep = True).sum())
+        derived_bytes = 0 if self._derived is None else self._derived.nbytes
+        return max(frame_bytes, sum(a.nbytes for a in self.columns.values())) + derived_bytes
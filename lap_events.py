@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+from signal_processing import savgol
+
+
+# ---------------- Driver-input events ----------------
+# Braking onsets and releases, throttle pickups and full-throttle points found by edge
+# detection on a lap's brake and throttle channels. Events are placed by along-track
+# distance and assigned to the circuit's corners; with the laps aligned on one reference
+# line (TrackReference) every driver's events share one distance axis, so comparing the
+# field's braking points is a single query on the event table.
+
+EVENTS = {
+    "brake_on": "Braking point",
+    "brake_off": "Brake release",
+    "throttle_pickup": "Throttle pickup",
+    "full_throttle": "Full throttle",
+}
+
+BRAKE_ON_PCT = 10      # brake counts as applied above this
+PICKUP_PCT = 10        # throttle pickup = rising through this after a lift
+MIN_STATE_M = 10       # brake / throttle states shorter than this are sensor blips
+CORNER_REACH_M = 50    # events this far past an apex still belong to that corner
+
+
+def rising_edges(state):
+    return np.flatnonzero(~state[:-1] & state[1:]) + 1
+
+
+def falling_edges(state):
+    return np.flatnonzero(state[:-1] & ~state[1:]) + 1
+
+
+def debounce(state, distance, min_m = MIN_STATE_M):
+    # Runs of a boolean channel shorter than min_m metres flipped to match their surroundings
+    if state.size < 2:
+        return state
+    edges = np.flatnonzero(np.diff(state.astype(np.int8))) + 1
+    starts = np.concatenate(([0], edges))
+    stops = np.concatenate((edges, [state.size]))
+    short = distance[stops - 1] - distance[starts] < min_m
+    short[[0, -1]] = False  # the lap's first and last runs may be cut by the line
+    return state ^ np.repeat(short, stops - starts)
+
+
+def find_corners(distance, speed, min_drop_kmh = 15, min_gap_m = 100):
+    # Apex distances of the lap's corners: minima of the smoothed speed that follow a drop
+    # of at least min_drop_kmh; of two minima closer than min_gap_m the slower is kept
+    speed = savgol(speed, 9, 2)
+    minima = np.flatnonzero((speed[1:-1] < speed[:-2]) & (speed[1:-1] <= speed[2:])) + 1
+    if minima.size == 0:
+        return np.empty(0)
+
+    # Highest speed between the previous minimum and this one
+    peaks = np.maximum.reduceat(speed, np.concatenate(([0], minima)))[:minima.size]
+    minima = minima[peaks - speed[minima] >= min_drop_kmh]
+
+    apexes = []
+    for i in minima:
+        if apexes and distance[i] - distance[apexes[-1]] < min_gap_m:
+            if speed[i] < speed[apexes[-1]]:
+                apexes[-1] = i
+            continue
+        apexes.append(i)
+    return distance[apexes]
+
+
+def detect_events(channels, distance, apexes):
+    # Event table of one lap: channels is the lap's DerivedChannels, distance its
+    # along-track coordinate (m) per sample, apexes the corner apex distances
+    rows = []
+    speed = channels.get("Speed")
+    speed = speed.astype(float) if speed is not None else np.full(distance.size, np.nan)
+
+    brake = channels.get("brake_pct")
+    if brake is not None:
+        braking = debounce(brake > BRAKE_ON_PCT, distance)
+        rows += [("brake_on", rising_edges(braking)), ("brake_off", falling_edges(braking))]
+
+    throttle = channels.get("throttle_pct")
+    if throttle is not None:
+        rows.append(("throttle_pickup", rising_edges(debounce(throttle >= PICKUP_PCT, distance))))
+        rows.append(("full_throttle", rising_edges(debounce(channels.get("full_throttle"), distance))))
+
+    frames = []
+    for event, index in rows:
+        at = distance[index]
+        # Braking belongs to the next corner, throttle to the corner just taken
+        if event.startswith("brake"):
+            corner = np.searchsorted(apexes, at - CORNER_REACH_M, side = "left")
+        else:
+            corner = np.searchsorted(apexes, at + CORNER_REACH_M, side = "right") - 1
+        valid = (corner >= 0) & (corner < apexes.size)
+        frames.append(pd.DataFrame({
+            "Event": event,
+            "Corner": (corner[valid] + 1).astype(np.int16),
+            "Distance": at[valid].astype(np.float32),
+            "Speed": speed[index[valid]].astype(np.float32),
+        }))
+    if not frames:
+        return pd.DataFrame(columns = ["Event", "Corner", "Distance", "Speed"])
+    return pd.concat(frames, ignore_index = True)
+
+
+def field_events(channels_by_driver, distance_by_driver, apexes):
+    # One compact table of every driver's events: Driver, Event, Corner, Distance, Speed
+    frames = []
+    for driver, channels in channels_by_driver.items():
+        events = detect_events(channels, distance_by_driver[driver], apexes)
+        events.insert(0, "Driver", driver)
+        frames.append(events)
+    if not frames:
+        return None
+
+    table = pd.concat(frames, ignore_index = True)
+    table["Driver"] = pd.Categorical(table["Driver"], categories = list(channels_by_driver))
+    table["Event"] = pd.Categorical(table["Event"], categories = list(EVENTS))
+    return table.sort_values(["Driver", "Distance"], ignore_index = True)
+
+
+def event_matrix(table, event, value = "Distance"):
+    # Drivers x corners of one event type (the first of that event at each corner)
+    rows = table[table["Event"] == event]
+    return rows.pivot_table(index = "Driver", columns = "Corner", values = value, aggfunc = "first", observed = False)
@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+
+class LiveSession:
+    # Stands in for a fastf1 Session during a live qualifying session. The source is a
+    # session loaded from a FastF1 live-timing recording (the stand-in for the live feed);
+    # a replay clock reveals its laps in the order they were completed, speed times faster
+    # than real time. Every update appends only the newly completed laps:
+    #   - laps grows append-only, so a lap's row never changes between updates
+    #   - each driver's best lap and the provisional classification are updated from the
+    #     new laps alone, and the update that last changed a driver's best is recorded, so
+    #     readers recompute only the drivers that changed since they last looked
+    #   - laps extracted for analysis are kept by row for every later update
+    # Everything else (event, car data, ...) is the source session's.
+    #
+    # The app offers the replay when F1_LIVE_RECORDING names a recording file
+    # (python -m fastf1.livetiming save <file>).
+
+    ENV_VAR = "F1_LIVE_RECORDING"
+
+    def __init__(self, source, speed = 1.0):
+        self._source = source
+        self.speed = float(speed)
+        self.name = source.name
+        self.date = source.date
+        self.event = source.event
+
+        # Completion order of the source laps; laps without a time come last
+        laps = source.laps
+        lap_time = pd.to_timedelta(laps["LapTime"]).dt.total_seconds().to_numpy()
+        end_time = pd.to_timedelta(laps["Time"]).dt.total_seconds().to_numpy()
+        end_time = np.where(np.isnan(end_time), np.inf, end_time)
+        self._order = np.argsort(end_time, kind = "stable")
+        self._end_time = end_time[self._order]
+        self._lap_time = lap_time[self._order]
+        self._driver = laps["Driver"].astype(str).to_numpy()[self._order]
+        self._timed = int(np.isfinite(self._end_time).sum())   # laps the replay can reveal
+
+        # Same candidates as SessionIndex's fastest lap: personal-best laps when flagged
+        candidate = ~np.isnan(self._lap_time)
+        if "IsPersonalBest" in laps.columns:
+            candidate &= (laps["IsPersonalBest"] == True).to_numpy()[self._order]
+        self._candidate = candidate
+
+        # Replay clock: starts when the first lap started
+        start = np.nan
+        if "LapStartTime" in laps.columns:
+            start = pd.to_timedelta(laps["LapStartTime"]).dt.total_seconds().min()
+        self._origin = float(start) if pd.notna(start) else 0.0
+        self._started = time.monotonic()
+
+        self.version = 0          # laps revealed so far
+        self._best = {}           # driver -> (lap time s, row)
+        self._changed_at = {}     # driver -> version whose laps last changed its best
+        self._laps_cache = {}     # row -> CompactLap
+        self._lock = threading.RLock()
+
+        self.laps = laps.iloc[self._order[:0]]
+        self.results = self._provisional_results()
+
+    @classmethod
+    def recording_from_env(cls):
+        # Recording configured for this deployment, or None when there is none
+        path = os.environ.get(cls.ENV_VAR)
+        return path if path and os.path.exists(path) else None
+
+    def __getattr__(self, name):
+        # Anything not tracked live comes from the source session
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._source, name)
+
+    # ---------------- Replay clock ----------------
+    @property
+    def clock(self):
+        # Current session time (s) of the replay
+        return self._origin + (time.monotonic() - self._started) * self.speed
+
+    @property
+    def finished(self):
+        # Laps without a time are never revealed, so they do not hold the replay open
+        return self.version >= self._timed
+
+    def update(self):
+        # Reveal every lap completed by now. Returns the drivers whose best lap changed.
+        with self._lock:
+            n = int(np.searchsorted(self._end_time, self.clock, side = "right"))
+            if n <= self.version:
+                return set()
+
+            start, self.version = self.version, n
+            new_rows = np.arange(start, n)
+            changed = set()
+            for driver in np.unique(self._driver[new_rows]):
+                rows = new_rows[(self._driver[new_rows] == driver) & self._candidate[new_rows]]
+                if rows.size == 0:
+                    continue
+                row = int(rows[np.argmin(self._lap_time[rows])])
+                best = self._best.get(driver)
+                if best is None or self._lap_time[row] < best[0]:
+                    self._best[driver] = (float(self._lap_time[row]), row)
+                    self._changed_at[driver] = n
+                    changed.add(driver)
+
+            self.laps = self._source.laps.iloc[self._order[:n]]
+            if changed:
+                self.results = self._provisional_results()
+            return changed
+
+    def changed_since(self, version):
+        # Drivers whose best lap changed after the given version
+        return {driver for driver, at in self._changed_at.items() if at > version}
+
+    def _provisional_results(self):
+        # Source classification with positions from the best laps revealed so far
+        results = self._source.results
+        if results is None or results.empty or "Abbreviation" not in results.columns:
+            return results
+        results = results.copy()
+        best = results["Abbreviation"].map(lambda d: self._best.get(d, (np.nan,))[0])
+        results["Position"] = best.rank(method = "first")
+        return results.sort_values("Position", na_position = "last")
+
+    # ---------------- Extracted laps ----------------
+    def lap_id(self, driver_code):
+        # Identifies the driver's current best lap; changes only when it improves
+        best = self._best.get(driver_code)
+        return driver_code if best is None else f"{driver_code}@{best[1]}"
+
+    def cached_lap(self, row, extract):
+        # The lap at row as a CompactLap, extracted once: rows never change, so a lap
+        # extracted at one update is reused by every later one. extract() -> (lap, message)
+        lap = self._laps_cache.get(row)
+        if lap is not None:
+            return lap, f"Lap {row} for {lap.driver} loaded."
+        lap, message = extract()
+        if lap is not None:
+            self._laps_cache[row] = lap
+        return lap, message
@@ -1,23 +1,54 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 from session_manager import SessionManager
-from data_analyser import DataAnalyser
-from chart_creator import ChartCreator
 from ui_styler import UIStyler
+from minisector_analyser import MiniSectorAnalyser
+from object_store import ObjectStore
+from live_timing import LiveSession
+import lap_events
+import gear_shifts
+from time_loss import SEGMENTATIONS
 import pandas as pd
 import numpy as np
 
+# Seconds between polls of a live session's replay clock
+LIVE_REFRESH_SECONDS = 5
+
 
 class F1QualifyingApp:
     # ---- Main app ----
     def __init__(self):
         self.session_manager = SessionManager()
-        self.data_analyser = DataAnalyser()
-        self.chart_creator = ChartCreator()
         self.ui_styler = UIStyler()
+        self.minisector_analyser = MiniSectorAnalyser()
+        self.store = self._get_object_store()
+
+        self._in_full_run = False
+        self._data_analyser = None
+        self._chart_creator = None
 
         self._setup_page_config()
         self._initialise_session_state()
 
+    # ---- Heavy components, imported on first use ----
+    # data_analyser pulls in SciPy and chart_creator pulls in Plotly; neither is needed
+    # for the welcome page or the session selection sidebar
+    @property
+    def data_analyser(self):
+        if self._data_analyser is None:
+            from data_analyser import DataAnalyser
+            self._data_analyser = DataAnalyser()
+        return self._data_analyser
+
+    @property
+    def chart_creator(self):
+        if self._chart_creator is None:
+            from chart_creator import ChartCreator
+            self._chart_creator = ChartCreator()
+        return self._chart_creator
+
     def _setup_page_config(self):
         st.set_page_config(
             page_title = "Formula 1 Qualifying Laps Analysis",
@@ -28,13 +59,14 @@ class F1QualifyingApp:
 
     def _initialise_session_state(self):
         session_vars = [
-            "current_session",
+            "session_handle",
             "session_name",
             "last_session_key",
             "selected_year",
             "available_gps",
             "gp_load_message",
             "comparison_mode",
+            "live_version",
         ]
         
         for var in session_vars:
@@ -45,12 +77,13 @@ class F1QualifyingApp:
         for var in [
             "driver1",
             "driver2",
-            "pole_lap1",
-            "pole_lap2",
-            "telemetry1",
-            "telemetry2",
-            "track_map1",
-            "track_map2",
+            "lap_handle1",
+            "lap_handle2",
+            "track_map_handle1",
+            "track_map_handle2",
+            "segment_lap_handle1",
+            "segment_lap_handle2",
+            "field_handle",
         ]:
             if var not in st.session_state:
                 st.session_state[var] = None
@@ -61,6 +94,18 @@ class F1QualifyingApp:
         if "comparison_mode" not in st.session_state:
             st.session_state.comparison_mode = False
 
+        if "field_mode" not in st.session_state:
+            st.session_state.field_mode = False
+
+        if "segment_mode" not in st.session_state:
+            st.session_state.segment_mode = False
+
+        # Bumped whenever the main page needs to change; lets sidebar fragments
+        # trigger a full rerun only when they actually changed what is displayed
+        if "view_version" not in st.session_state:
+            st.session_state.view_version = 0
+            st.session_state.rendered_view_version = 0
+
         if st.session_state.selected_year is None:
             import datetime
             st.session_state.selected_year = datetime.datetime.now().year
@@ -68,111 +113,345 @@ class F1QualifyingApp:
         if st.session_state.available_gps is None:
             st.session_state.available_gps = []
 
+    # ---------------- Shared Objects ----------------
+    @st.cache_resource
+    def _get_object_store(_self):
+        # One store per server process; session state only holds keys into it
+        return ObjectStore()
+
+    def _owner_id(self):
+        ctx = get_script_run_ctx()
+        return ctx.session_id if ctx is not None else "local"
+
+    def _acquire(self, handle_name, key, factory):
+        # Point a session-state handle at the shared object for key, releasing whatever
+        # it pointed to before. Returns None (handle unchanged) if factory gives nothing.
+        obj = self.store.acquire(self._owner_id(), key, factory)
+        if obj is None:
+            return None
+        self.store.release(self._owner_id(), st.session_state.get(handle_name))
+        st.session_state[handle_name] = key
+        return obj
+
+    def _release(self, handle_name):
+        self.store.release(self._owner_id(), st.session_state.get(handle_name))
+        st.session_state[handle_name] = None
+
+    def _shared(self, handle_name):
+        key = st.session_state.get(handle_name)
+        return None if key is None else self.store.get(key)
+
+    def _current_session(self):
+        return self._shared("session_handle")
+
+    def _session_key(self):
+        # Cache key for session-wide analysis. A live session adds its version, so those
+        # caches follow the laps as they complete.
+        session = self._current_session()
+        if isinstance(session, LiveSession):
+            return f"{st.session_state.session_name}@{session.version}"
+        return st.session_state.session_name
+
+    def _circuit_key(self):
+        # Sessions of one event share a circuit layout
+        event = self._current_session().event
+        date = event.get("EventDate")
+        return f"{date.year if pd.notna(date) else ''}:{event.get('EventName')}"
+
+    def _field_laps(self):
+        # Fastest lap of every driver ({code: CompactLap}), held in the store like the
+        # single laps: every field section, rerun and user viewing the session reads the
+        # same laps and their memoised derived channels. A live session's key carries its
+        # version, so an update moves the handle to the new field and drops the old one.
+        key = f"field:{self._session_key()}"
+        if st.session_state.get("field_handle") == key:
+            field = self._shared("field_handle")
+            if field is not None:
+                return field
+
+        session, session_key = self._current_session(), self._session_key()
+        drivers = tuple((st.session_state.driver_info or {}).keys())
+        with st.spinner("Loading fastest laps for the full field..."):
+            field = self._acquire(
+                "field_handle", key,
+                lambda: self.data_analyser.get_field_fastest_laps(session, session_key, drivers),
+            )
+        return field or {}
+
+    def _lap(self, driver_num):
+        return self._shared(f"lap_handle{driver_num}")
+
+    def _track_map(self, driver_num):
+        return self._shared(f"track_map_handle{driver_num}")
+
+    HANDLES = [
+        "session_handle", "lap_handle1", "lap_handle2", "track_map_handle1", "track_map_handle2",
+        "segment_lap_handle1", "segment_lap_handle2", "field_handle",
+    ]
+
+    def _check_handles(self, required = ()):
+        # Keep this browser session alive in the store. If any of its objects (or any of
+        # the required handles) was evicted while the tab sat idle, start over instead of
+        # rendering from dangling keys; returns False in that case
+        self.store.touch(self._owner_id())
+
+        released = any(st.session_state.get(h) is not None and self._shared(h) is None for h in self.HANDLES)
+        if released or any(self._shared(h) is None for h in required):
+            self._reset_driver_state()
+            return False
+        return True
+
+    def _fragment_ready(self, *required):
+        # First call of every fragment. Fragment reruns (a widget inside one section, the
+        # live poll) never pass through run(), so they keep the browser session alive
+        # here too, and redraw the whole page from the reset state rather than read a
+        # handle the store has released
+        if self._check_handles(required):
+            return True
+        st.session_state.handles_released = True
+        st.rerun()
+
     # ---------------- Sidebar ----------------
     def run(self):
-        self.render_sidebar()
-        self.render_main_content()
+        self._in_full_run = True
+        released = st.session_state.pop("handles_released", False)
+        if not self._check_handles() or released:
+            st.toast("Session data was released after inactivity. Please load the session again.")
+        try:
+            if self._showing_welcome_screen():
+                # Nothing loaded yet: draw the welcome page before the sidebar, which has to
+                # import FastF1 for the event list. Rerun if the sidebar moved past it.
+                self.render_main_content()
+                self.render_sidebar()
+                if not self._showing_welcome_screen():
+                    st.rerun()
+            else:
+                self.render_sidebar()
+                self.render_main_content()
+        finally:
+            self._in_full_run = False
+
+    def _showing_welcome_screen(self):
+        return (
+            not st.session_state.field_mode
+            and not st.session_state.segment_mode
+            and st.session_state.driver1 is None
+        )
 
     def render_sidebar(self):
         with st.sidebar:
-            st.header("SESSION SELECTION")
+            self._render_session_selection()
 
-            # Year
-            available_years = self.session_manager.get_available_years()
-            st.write("")
-            selected_year = st.selectbox(
-                "Select Year",
-                available_years,
-                index = max(0, len(available_years) - 1),
-                help = f"Data available from {min(available_years)} to {max(available_years)}.",
+            if isinstance(self._current_session(), LiveSession):
+                self._render_live_status()
+
+            if self._current_session() is not None:
+                self._render_analysis_options()
+
+    @st.fragment
+    def _render_session_selection(self):
+        # Year / GP widgets rerun only this fragment unless the loaded session changes
+        if not self._fragment_ready():
+            return
+        st.header("SESSION SELECTION")
+
+        # Year
+        available_years = self.session_manager.get_available_years()
+        st.write("")
+        selected_year = st.selectbox(
+            "Select Year",
+            available_years,
+            index = max(0, len(available_years) - 1),
+            help = f"Data available from {min(available_years)} to {max(available_years)}.",
+        )
+
+        # When year changes, reload GP list
+        if (
+            "last_year" not in st.session_state
+            or st.session_state.last_year != selected_year
+            or not st.session_state.available_gps
+        ):
+            with st.spinner(f"Loading Grand Prix events for {selected_year}..."):
+                gps, message = self.session_manager.get_available_events_for_year(
+                    selected_year
+                )
+                st.session_state.available_gps = gps
+                st.session_state.gp_load_message = message
+                st.session_state.last_year = selected_year
+                st.session_state.selected_year = selected_year
+                self._reset_driver_state()
+
+        if st.session_state.available_gps:
+            st.success(st.session_state.gp_load_message)
+
+            selected_gp = st.selectbox(
+                "Select Grand Prix",
+                st.session_state.available_gps,
+                index = 0,
+                help = f"Available Grand Prix events for {selected_year}",
             )
 
-            # When year changes, reload GP list
             if (
-                "last_year" not in st.session_state
-                or st.session_state.last_year != selected_year
-                or not st.session_state.available_gps
+                "last_gp" not in st.session_state
+                or st.session_state.last_gp != selected_gp
             ):
-                with st.spinner(f"Loading Grand Prix events for {selected_year}..."):
-                    gps, message = self.session_manager.get_available_events_for_year(
-                        selected_year
-                    )
-                    st.session_state.available_gps = gps
-                    st.session_state.gp_load_message = message
-                    st.session_state.last_year = selected_year
-                    st.session_state.selected_year = selected_year
-                    self._reset_driver_state()
-
-            if st.session_state.available_gps:
-                st.success(st.session_state.gp_load_message)
-
-                selected_gp = st.selectbox(
-                    "Select Grand Prix",
-                    st.session_state.available_gps,
-                    index = 0,
-                    help = f"Available Grand Prix events for {selected_year}",
-                )
+                st.session_state.last_gp = selected_gp
+                self._reset_driver_state()
 
-                if (
-                    "last_gp" not in st.session_state
-                    or st.session_state.last_gp != selected_gp
-                ):
-                    st.session_state.last_gp = selected_gp
-                    self._reset_driver_state()
-
-                col1, col2 = st.columns(2)
-                with col1:
-                    if st.button("LOAD SESSION", type = "primary"):
-                        self._load_session(selected_gp, selected_year)
-                        
-                with col2:
-                    if st.button("RELOAD", type = "secondary"):
-                        self._load_session(selected_gp, selected_year)
-
-                if st.session_state.current_session is not None:
-                    self._render_analysis_options()
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("LOAD SESSION", type = "primary"):
+                    self._load_session(selected_gp, selected_year)
                     
-            else:
-                st.error(
-                    st.session_state.gp_load_message
-                    or f"No Grand Prix events found for {selected_year}"
+            with col2:
+                if st.button("RELOAD", type = "secondary"):
+                    self._load_session(selected_gp, selected_year)
+
+            # Live-timing replay, offered when the deployment has a recording
+            recording = LiveSession.recording_from_env()
+            if recording:
+                st.selectbox(
+                    "Live replay speed", [1, 5, 20, 60], format_func = lambda s: f"{s}×",
+                    key = "live_speed",
                 )
-                st.info("Try selecting a different year.")
+                if st.button("REPLAY LIVE RECORDING", type = "secondary", use_container_width = True):
+                    self._load_session(selected_gp, selected_year, live_recording = recording)
+
+            if self._current_session() is not None and st.session_state.get("session_load_message"):
+                st.success(st.session_state.session_load_message)
+                
+        else:
+            st.error(
+                st.session_state.gp_load_message
+                or f"No Grand Prix events found for {selected_year}"
+            )
+            st.info("Try selecting a different year.")
+
+        self._sync_main_content()
+
+    def _mark_view_changed(self):
+        st.session_state.view_version += 1
+
+    def _sync_main_content(self):
+        # Called at the end of sidebar fragments: when the fragment reran on its own,
+        # rerun the whole page only if it changed something the main content displays
+        if self._in_full_run:
+            return
+        if st.session_state.view_version != st.session_state.rendered_view_version:
+            st.rerun()
+
+    def _set_analysis_view(self, comparison_mode, field_mode, segment_mode = False):
+        view = (comparison_mode, field_mode, segment_mode)
+        current = (st.session_state.comparison_mode, st.session_state.field_mode, st.session_state.segment_mode)
+        if current != view:
+            st.session_state.comparison_mode = comparison_mode
+            st.session_state.field_mode = field_mode
+            st.session_state.segment_mode = segment_mode
+            self._mark_view_changed()
 
     def _reset_driver_state(self):
         st.session_state.driver1 = None
         st.session_state.driver2 = None
-        st.session_state.pole_lap1 = None
-        st.session_state.pole_lap2 = None
-        st.session_state.telemetry1 = None
-        st.session_state.telemetry2 = None
-        st.session_state.track_map1 = None
-        st.session_state.track_map2 = None
-        st.session_state.current_session = None
+        for handle_name in [
+            "lap_handle1", "lap_handle2", "track_map_handle1", "track_map_handle2",
+            "segment_lap_handle1", "segment_lap_handle2", "field_handle", "session_handle",
+        ]:
+            self._release(handle_name)
         st.session_state.last_session_key = None
         st.session_state.driver_info = {}
         st.session_state.comparison_mode = False
+        st.session_state.field_mode = False
+        st.session_state.segment_mode = False
+        st.session_state.session_load_message = None
+        st.session_state.analysis_message = None
+        self._mark_view_changed()
+
+    def _load_session(self, gp_name, year, live_recording = None):
+        session_name = f"{year} {gp_name} Qualifying"
+        key = f"session:{session_name}"
+        loaded = {"message": f"✅ Successfully loaded {year} {gp_name} Qualifying"}
+
+        # A live replay is one shared session per speed: everyone watching sees the same laps
+        speed = st.session_state.get("live_speed") or 1
+        if live_recording:
+            session_name = f"{session_name} (live)"
+            key = f"live:{session_name}:{speed}x"
+
+        def load():
+            if live_recording:
+                session, loaded["message"] = self.session_manager.load_live_session(
+                    gp_name, year, live_recording, speed
+                )
+            else:
+                session, loaded["message"] = self.session_manager.load_qualifying_session(
+                    gp_name, year
+                )
+            if session is not None:
+                # Build the lookup tables now, so reruns never scan results or laps
+                self.session_manager.get_session_index(session)
+            return session
 
-    def _load_session(self, gp_name, year):
         with st.spinner(f"Loading {year} {gp_name} Qualifying sessions..."):
-            session, message = self.session_manager.load_qualifying_session(
-                gp_name, year
-            )
-            
+            # Take the new reference before the reset releases the old one, so reloading
+            # the session this user already holds does not drop and rebuild it
+            session = self.store.acquire(self._owner_id(), key, load)
+
             if session:
-                st.session_state.current_session = session
-                st.session_state.session_name = f"{year} {gp_name} Qualifying"
                 self._reset_driver_state()
-                st.session_state.current_session = session
+                st.session_state.session_handle = key
+                st.session_state.session_name = session_name
                 st.session_state.driver_info = (
                     self.session_manager.get_drivers_and_teams_for_session(session)
                 )
-                st.success(message)
+                st.session_state.session_load_message = loaded["message"]
+                st.session_state.live_version = getattr(session, "version", None)
             else:
-                st.error(message)
+                st.error(loaded["message"])
+
+    # ---------------- Live session ----------------
+    @st.fragment(run_every = LIVE_REFRESH_SECONDS)
+    def _render_live_status(self):
+        # Polls the live session; the page reruns only when something it shows has changed
+        if not self._fragment_ready():
+            return
+        session = self._current_session()
+        if not isinstance(session, LiveSession):
+            return
+
+        session.update()
+        seen = st.session_state.live_version or 0
+        if session.version != seen:
+            self._apply_live_update(session, session.changed_since(seen))
+            st.session_state.live_version = session.version
+
+        clock = self._format_time(pd.Timedelta(seconds = max(session.clock, 0.0))).split(".")[0]
+        status = "replay finished" if session.finished else f"session time {clock}"
+        st.caption(f"🔴 LIVE · {status} · {session.version} laps completed")
+
+        self._sync_main_content()
+
+    def _apply_live_update(self, session, changed):
+        # changed: drivers whose best lap improved since this browser session last looked.
+        # Provisional positions move with every improvement.
+        if changed:
+            st.session_state.driver_info = self.session_manager.get_drivers_and_teams_for_session(session)
+
+        # Re-analyse only the drivers on screen that improved; every other lap, its
+        # metrics and track map stay in the store as they are
+        for driver_num in (1, 2):
+            driver = st.session_state.get(f"driver{driver_num}")
+            if driver in changed and self._lap(driver_num) is not None:
+                self._analyse_single_driver(driver, driver_num)
+
+        # Session-wide views: the timeline shows every lap, the field view only best laps
+        if st.session_state.segment_mode or (st.session_state.field_mode and changed):
+            self._mark_view_changed()
 
     # ---------------- Analysis Options ----------------
+    @st.fragment
     def _render_analysis_options(self):
+        if not self._fragment_ready("session_handle"):
+            return
         # st.header("ANALYSIS MODE")
         # st.write("")
 
@@ -198,30 +477,48 @@ class F1QualifyingApp:
         st.write("")
 
         pole_driver, pole_message = self.session_manager.get_pole_position_driver(
-            st.session_state.current_session
+            self._current_session()
         )
 
         analysis_mode = st.radio(
             "Select Analysis Mode",
-            ["Analyse Pole Position", "Analyse Specific Driver", "Compare Two Drivers"],
+            [
+                "Analyse Pole Position", "Analyse Specific Driver", "Compare Two Drivers",
+                "Full-Field Mini-Sectors", "Q1 / Q2 / Q3 Progression",
+            ],
             index=0,
         )
 
         st.write("")
 
         if analysis_mode == "Analyse Pole Position":
-            st.session_state.comparison_mode = False
+            self._set_analysis_view(comparison_mode = False, field_mode = False)
             self._render_single_driver_analysis(pole_driver, pole_message)
 
         elif analysis_mode == "Analyse Specific Driver":
             # single driver flow, but user chooses who
-            st.session_state.comparison_mode = False
+            self._set_analysis_view(comparison_mode = False, field_mode = False)
             self._render_manual_driver_select(1)
 
-        else:  # Compare Two Drivers
-            st.session_state.comparison_mode = True
+        elif analysis_mode == "Compare Two Drivers":
+            self._set_analysis_view(comparison_mode = True, field_mode = False)
             self._render_custom_comparison_analysis()
 
+        elif analysis_mode == "Full-Field Mini-Sectors":
+            self._set_analysis_view(comparison_mode = False, field_mode = st.session_state.field_mode)
+            self._render_field_analysis_options()
+
+        else:  # Q1 / Q2 / Q3 Progression
+            self._set_analysis_view(
+                comparison_mode = False, field_mode = False, segment_mode = st.session_state.segment_mode
+            )
+            self._render_segment_analysis_options()
+
+        if st.session_state.get("analysis_message"):
+            st.success(st.session_state.analysis_message)
+
+        self._sync_main_content()
+
     def _render_single_driver_analysis(self, pole_driver, pole_message):
         if pole_driver:
             driver_info = st.session_state.driver_info.get(pole_driver, {})
@@ -284,6 +581,17 @@ class F1QualifyingApp:
                     self._analyse_single_driver(driver1, 1)
                     self._analyse_single_driver(driver2, 2)
 
+    def _render_field_analysis_options(self):
+        if st.button("ANALYSE FULL FIELD", type = "primary", use_container_width = True):
+            self._set_analysis_view(comparison_mode = False, field_mode = True)
+
+    def _render_segment_analysis_options(self):
+        index = self.session_manager.get_session_index(self._current_session())
+        if index is None or not index.has_segments:
+            st.info("The Q1 / Q2 / Q3 split is not available for this session; only the session timeline will be shown.")
+        if st.button("ANALYSE QUALIFYING SEGMENTS", type = "primary", use_container_width = True):
+            self._set_analysis_view(comparison_mode = False, field_mode = False, segment_mode = True)
+
     def _render_manual_driver_select(self, driver_num):
         available = (
             list(st.session_state.driver_info.keys())
@@ -312,41 +620,54 @@ class F1QualifyingApp:
 
     # ---------------- Analysis Methods ----------------
     def _analyse_single_driver(self, driver_code, driver_num):
-        with st.spinner(f"Analysing {driver_code}'s qualifying lap..."):
-            pole_lap, telemetry, message = self.data_analyser.get_pole_position_lap(
-                st.session_state.current_session, driver_code
+        # A live driver's lap is identified by its row, so an improvement is a new lap
+        session = self._current_session()
+        lap_id = session.lap_id(driver_code) if isinstance(session, LiveSession) else driver_code
+        key = f"{st.session_state.session_name}:{lap_id}"
+        result = {"message": f"No lap data available for {driver_code}"}
+
+        def build_lap():
+            # Only the compact lap is kept, not the FastF1 Lap and its full telemetry
+            lap, result["message"] = self.data_analyser.get_compact_lap(
+                self._current_session(), st.session_state.session_name, driver_code
             )
+            return lap
+
+        with st.spinner(f"Analysing {driver_code}'s qualifying lap..."):
+            lap = self._acquire(f"lap_handle{driver_num}", f"lap:{key}", build_lap)
 
-            if pole_lap is None:
-                st.error(message)
+            if lap is None:
+                st.error(result["message"])
                 return
 
             setattr(st.session_state, f"driver{driver_num}", driver_code)
-            setattr(st.session_state, f"pole_lap{driver_num}", pole_lap)
-            setattr(st.session_state, f"telemetry{driver_num}", telemetry)
-
-            # Ensure Distance exists
-            if "Distance" not in telemetry.columns:
-                telemetry = telemetry.copy()
-                telemetry["Distance"] = range(len(telemetry))
-                setattr(st.session_state, f"telemetry{driver_num}", telemetry)
 
-            track_map = self.chart_creator.create_track_map_with_sectors(
-                telemetry = telemetry, driver_code = driver_code
+            self._acquire(
+                f"track_map_handle{driver_num}",
+                f"track_map:{key}",
+                lambda: self.chart_creator.create_track_map_with_sectors(
+                    telemetry = lap.telemetry, driver_code = driver_code
+                ),
             )
-            setattr(st.session_state, f"track_map{driver_num}", track_map)
 
-            st.success(f"✅ Loaded data for {driver_code}")
+            st.session_state.analysis_message = f"✅ Loaded data for {driver_code}"
+            self._mark_view_changed()
 
     # ---------------- Main Content ----------------
     def render_main_content(self):
+        st.session_state.rendered_view_version = st.session_state.view_version
+
         self.ui_styler.apply_custom_css()
         st.markdown(
             '<h1 class="main-header">Formula 1 Qualifying Lap Analysis</h1>',
             unsafe_allow_html=True,
         )
 
-        if st.session_state.driver1 is None:
+        if st.session_state.field_mode:
+            self._render_field_results()
+        elif st.session_state.segment_mode:
+            self._render_segment_results()
+        elif st.session_state.driver1 is None:
             self._render_welcome_screen()
         elif st.session_state.comparison_mode and st.session_state.driver2 is not None:
             self._render_comparison_results()
@@ -407,34 +728,70 @@ class F1QualifyingApp:
         st.write("")
         st.info("💡 **Tip:** Use **Compare Two Drivers** to see exactly where time was won or lost along the lap.")
 
+    # Each results section below is a fragment: widgets inside one section
+    # rerun only that section instead of the whole page
+
     def _render_single_results(self):
+        self._render_single_metrics()
+        self._render_single_track_map()
+        self._render_single_telemetry()
+
+    @st.fragment
+    def _render_single_metrics(self):
+        if not self._fragment_ready("lap_handle1"):
+            return
         driver = st.session_state.driver1
-        pole_lap = st.session_state.pole_lap1
-        telemetry = st.session_state.telemetry1
+        pole_lap = self._lap(1)
 
         st.subheader("ANALYSIS")
         self._render_basic_lap_info(pole_lap, driver, 1)
 
         # single-driver: show metrics + patterns in one block
-        self._render_performance_metrics(telemetry, driver, 1)
+        self._render_performance_metrics(pole_lap.derived, driver, 1)
 
         self._render_lap_details(pole_lap)
 
+    @st.fragment
+    def _render_single_track_map(self):
+        if not self._fragment_ready():
+            return
         st.subheader("VISUAL ANALYSIS")
         st.write("")
-        if st.session_state.track_map1:
+        track_map = self._track_map(1)
+        if track_map:
             st.plotly_chart(
-                st.session_state.track_map1, use_container_width = True, key = "track_map_single"
+                track_map, use_container_width = True, key = "track_map_single"
             )
 
-        
+    @st.fragment
+    def _render_single_telemetry(self):
+        if not self._fragment_ready("lap_handle1"):
+            return
+        driver = st.session_state.driver1
+        lap = self._lap(1)
+        telemetry = lap.telemetry
+
+        zoom_key = f"telemetry_zoom_{driver}"
+        self._render_zoom_control(zoom_key, [telemetry])
+        charts = self.chart_creator.with_detail(x_range = self._zoom_window(zoom_key, [telemetry]))
+
+        # Dashboard: every channel stacked in one figure on one distance axis, so it is
+        # sent and drawn once and zooming one channel zooms them all
+        if st.toggle("Combined telemetry dashboard", value = True, key = "telemetry_dashboard"):
+            fig = charts.create_telemetry_dashboard(
+                lap.derived.frame("longitudinal_accel_g", "lateral_accel_g"), driver
+            )
+            if fig is not None:
+                st.plotly_chart(fig, use_container_width = True, key = f"telemetry_dashboard_{driver}")
+            return
+
         figs = [
-            self.chart_creator.create_speed_chart(telemetry, driver),
-            self.chart_creator.create_throttle_chart(telemetry, driver),
-            self.chart_creator.create_brake_chart(telemetry, driver),
-            self.chart_creator.create_gear_chart(telemetry, driver),
-            self.chart_creator.create_longitudinal_accel_chart(telemetry, driver),
-            self.chart_creator.create_lateral_accel_chart(telemetry, driver),
+            charts.create_speed_chart(telemetry, driver),
+            charts.create_throttle_chart(telemetry, driver),
+            charts.create_brake_chart(telemetry, driver),
+            charts.create_gear_chart(telemetry, driver),
+            charts.create_longitudinal_accel_chart(lap.derived.frame("longitudinal_accel_g"), driver),
+            charts.create_lateral_accel_chart(lap.derived.frame("lateral_accel_g"), driver),
         ]
 
         # Keep only charts that exist 
@@ -444,17 +801,87 @@ class F1QualifyingApp:
             st.plotly_chart(fig, use_container_width = True, key = f"telemetry_single_{driver}_{i}")
 
     def _render_comparison_results(self):
+        # Start building every comparison chart on the worker pool straight away so
+        # they are constructed while the metric cards above them are being rendered
+        self._pending_charts = self._submit_charts(self._comparison_chart_jobs())
+
+        self._render_comparison_metrics()
+        self._render_comparison_track_map()
+        self._render_comparison_telemetry()
+        self._render_comparison_delta()
+        self._render_comparison_replay()
+
+    def _comparison_chart_jobs(self, keys = None):
+        # Shallow copies: the laps are shared between users, and a shallow copy keeps
+        # its own column index so nothing a chart adds leaks back into the shared frame
+        telemetry1, telemetry2 = self._aligned(
+            "comparison_alignment",
+            [self._lap(1).telemetry.copy(deep = False), self._lap(2).telemetry.copy(deep = False)],
+        )
+        args = (telemetry1, telemetry2, st.session_state.driver1, st.session_state.driver2)
+        lap_delta = self._comparison_lap_delta(telemetry1, telemetry2)
+
+        # Telemetry traces follow the section's zoom window (read from its widget state,
+        # since the full-page run submits these before the slider is drawn)
+        window = self._zoom_window(self._comparison_zoom_key(), [telemetry1, telemetry2])
+        traces = self.chart_creator.with_detail(x_range = window)
+
+        jobs = {
+            "comparison_map": (self.chart_creator.create_comparison_track_map, args),
+            "speed_comparison": (traces.create_speed_comparison_chart, args),
+            "throttle_comparison": (traces.create_throttle_comparison_chart, args),
+            "brake_comparison": (traces.create_brake_comparison_chart, args),
+            "delta_chart": (self.chart_creator.create_delta_chart, args + (lap_delta,)),
+        }
+        return {k: v for k, v in jobs.items() if keys is None or k in keys}
+
+    def _comparison_lap_delta(self, telemetry1 = None, telemetry2 = None):
+        # The compared laps' delta and time-loss attribution, cached per pair of laps and
+        # alignment; the delta chart and the attribution table share it
+        if telemetry1 is None:
+            telemetry1, telemetry2 = self._aligned(
+                "comparison_alignment",
+                [self._lap(1).telemetry.copy(deep = False), self._lap(2).telemetry.copy(deep = False)],
+            )
+        pair_key = (
+            self._session_key(), st.session_state.lap_handle1, st.session_state.lap_handle2,
+            st.session_state.get("comparison_alignment", self.ALIGNMENT_MODES[0]),
+        )
+        return self.data_analyser.get_lap_delta(
+            telemetry1, telemetry2, pair_key, (st.session_state.driver1, st.session_state.driver2)
+        )
+
+    def _take_chart_futures(self, keys):
+        # Futures submitted by the full-page run, or fresh ones when a fragment reruns on its own
+        pending = getattr(self, "_pending_charts", {})
+        futures = {k: pending.pop(k) for k in keys if k in pending}
+        missing = [k for k in keys if k not in futures]
+        if missing:
+            futures.update(self._submit_charts(self._comparison_chart_jobs(missing)))
+        return {k: futures[k] for k in keys}
+
+    def _build_patterns_chart(self, metrics, driver_code):
+        fig = self.chart_creator.create_driving_patterns_chart(metrics, driver_code)
+        if fig is not None:
+            fig.update_yaxes(automargin = True)
+            fig.update_layout(margin = dict(l = 0, r = 20, t = 10, b = 10))
+        return fig
+
+    @st.fragment
+    def _render_comparison_metrics(self):
+        if not self._fragment_ready("lap_handle1", "lap_handle2"):
+            return
         # --- Driver headers ---
         col1, col2 = st.columns(2)
         with col1:
             st.subheader("DRIVER COMPARISON")
             self._render_basic_lap_info(
-                st.session_state.pole_lap1, st.session_state.driver1, 1
+                self._lap(1), st.session_state.driver1, 1
             )
         with col2:
             st.subheader("")
             self._render_basic_lap_info(
-                st.session_state.pole_lap2, st.session_state.driver2, 2
+                self._lap(2), st.session_state.driver2, 2
             )
 
         st.write("")
@@ -464,12 +891,12 @@ class F1QualifyingApp:
         with col1:
             st.subheader("PERFORMANCE COMPARISON")
             self._render_performance_metrics(
-                st.session_state.telemetry1, st.session_state.driver1, 1
+                self._lap(1).derived, st.session_state.driver1, 1
             )
         with col2:
             st.subheader("")
             self._render_performance_metrics(
-                st.session_state.telemetry2, st.session_state.driver2, 2
+                self._lap(2).derived, st.session_state.driver2, 2
             )
 
         # --- Driving patterns ---
@@ -478,26 +905,17 @@ class F1QualifyingApp:
         m2 = st.session_state.get("metrics2")
 
         c1, c2 = st.columns(2)
-        with c1:
-            if m1:
-                fig1 = self.chart_creator.create_driving_patterns_chart(
-                    m1, st.session_state.driver1
-                )
-                fig1.update_yaxes(automargin = True)
-                fig1.update_layout(margin = dict(l = 0, r = 20, t = 10, b = 10))
-                st.plotly_chart(
-                    fig1, use_container_width = True, config = {"displayModeBar": False}
-                )
-        with c2:
-            if m2:
-                fig2 = self.chart_creator.create_driving_patterns_chart(
-                    m2, st.session_state.driver2
-                )
-                fig2.update_yaxes(automargin = True)
-                fig2.update_layout(margin = dict(l = 0, r = 20, t = 10, b = 10))
-                st.plotly_chart(
-                    fig2, use_container_width = True, config = {"displayModeBar": False}
-                )
+        pattern_jobs = {}
+        if m1:
+            pattern_jobs["patterns_1"] = (self._build_patterns_chart, (m1, st.session_state.driver1))
+        if m2:
+            pattern_jobs["patterns_2"] = (self._build_patterns_chart, (m2, st.session_state.driver2))
+
+        containers = {"patterns_1": c1, "patterns_2": c2}
+        self._render_charts_as_completed(
+            self._submit_charts(pattern_jobs), containers = containers,
+            config = {"displayModeBar": False},
+        )
 
         # --- Lap details comparison ---
         st.write("")
@@ -505,71 +923,622 @@ class F1QualifyingApp:
         st.write("")
         self._render_lap_comparison()
 
+    @st.fragment
+    def _render_comparison_track_map(self):
+        if not self._fragment_ready("lap_handle1", "lap_handle2"):
+            return
         # --- Visual comparison ---
         st.write("")
         st.subheader("VISUAL BREAKDOWN")
         st.write("")
 
-        comparison_map = self.chart_creator.create_comparison_track_map(
-            st.session_state.telemetry1,
-            st.session_state.telemetry2,
-            st.session_state.driver1,
-            st.session_state.driver2,
-        )
-        
-        if comparison_map:
-            st.plotly_chart(comparison_map, use_container_width = True, key = "comparison_map")
+        # Every comparison chart is built from the aligned laps, so a change reruns the page
+        self._render_alignment_control("comparison_alignment", on_change = self._mark_view_changed)
+        self._sync_main_content()
 
+        self._render_charts_as_completed(self._take_chart_futures(["comparison_map"]))
+
+    @st.fragment
+    def _render_comparison_telemetry(self):
+        if not self._fragment_ready("lap_handle1", "lap_handle2"):
+            return
         # Telemetry comparison
         st.write("### TELEMETRY COMPARISON")
-        speed_chart = self.chart_creator.create_speed_comparison_chart(
-            st.session_state.telemetry1,
-            st.session_state.telemetry2,
-            st.session_state.driver1,
-            st.session_state.driver2,
-        ) 
-        
-        if speed_chart:
-            st.plotly_chart(speed_chart, use_container_width = True, key = "speed_comparison")
+        self._render_zoom_control(
+            self._comparison_zoom_key(), [self._lap(1).telemetry, self._lap(2).telemetry]
+        )
+        self._render_charts_as_completed(
+            self._take_chart_futures(["speed_comparison", "throttle_comparison", "brake_comparison"])
+        )
+
+    @st.fragment
+    def _render_comparison_delta(self):
+        if not self._fragment_ready("lap_handle1", "lap_handle2"):
+            return
+        # Delta analysis
+        st.write("### TIME DELTA ANALYSIS")
+        st.write("")
+        self._render_charts_as_completed(self._take_chart_futures(["delta_chart"]))
 
-        throttle_chart = self.chart_creator.create_throttle_comparison_chart(
-            st.session_state.telemetry1,
-            st.session_state.telemetry2,
-            st.session_state.driver1,
-            st.session_state.driver2,
+        # Where the time went: segments ranked by time won or lost, with the main cause
+        lap_delta = self._comparison_lap_delta()
+        if lap_delta is None:
+            return
+        st.write("#### TIME LOSS BY SEGMENT")
+        segmentation = st.radio(
+            "Segments", list(SEGMENTATIONS), format_func = SEGMENTATIONS.get,
+            horizontal = True, key = "time_loss_segments",
         )
-        
-        if throttle_chart:
-            st.plotly_chart(
-                throttle_chart, use_container_width = True, key = "throttle_comparison"
+        st.caption(
+            "Time is the change in the delta over the segment; Δ columns are the faster "
+            "driver's margin (later braking, higher minimum / exit speed)."
+        )
+        st.dataframe(lap_delta.attribution(segmentation), use_container_width = True, hide_index = True)
+
+    @st.fragment
+    def _render_comparison_replay(self):
+        if not self._fragment_ready("lap_handle1", "lap_handle2"):
+            return
+        st.write("### GHOST REPLAY")
+        d1, d2 = st.session_state.driver1, st.session_state.driver2
+        replay = self.data_analyser.get_ghost_replay(
+            {d1: self._lap(1), d2: self._lap(2)}, self._session_key(), (d1, d2)
+        )
+        self._render_ghost_replay(
+            replay, f"ghost_replay_{d1}_{d2}", {d1: "#DC143C", d2: "#0000CD"}
+        )
+
+    # ---------------- Ghost replay ----------------
+    REPLAY_SECTION_SECONDS = 20
+
+    def _render_ghost_replay(self, replay, key, driver_colors = None):
+        # The replay is sent one section at a time: only the selected section's frames are
+        # serialised, so the first section is ready to play straight away
+        if replay is None:
+            st.warning("Ghost replay needs position data for at least two laps.")
+            return
+
+        sections = replay.chunks(self.REPLAY_SECTION_SECONDS)
+        labels = [f"{replay.time[a]:.0f}–{replay.time[b - 1]:.0f} s" for a, b in sections]
+        if len(sections) > 1:
+            label = st.select_slider("Replay section (lap time)", options = labels, key = f"{key}_section")
+        else:
+            label = labels[0]
+
+        chart = self.chart_creator.create_ghost_replay_chart(
+            replay, sections[labels.index(label)], driver_colors
+        )
+        if chart:
+            st.plotly_chart(chart, use_container_width = True, key = f"{key}_chart")
+        st.caption("Press ▶ Play to run this section; move the section slider on to continue the lap.")
+
+    # ---------------- Telemetry zoom ----------------
+    def _comparison_zoom_key(self):
+        return f"telemetry_zoom_{st.session_state.driver1}_{st.session_state.driver2}"
+
+    def _lap_length(self, telemetry_frames):
+        return int(np.ceil(max(float(t["Distance"].max()) for t in telemetry_frames)))
+
+    def _render_zoom_control(self, key, telemetry_frames):
+        # Distance window for a telemetry section. Traces are downsampled to a per-chart
+        # point budget; a zoomed window gets the whole budget, so zooming in far enough
+        # shows every recorded sample.
+        lap_m = self._lap_length(telemetry_frames)
+        st.slider(
+            "Zoom (distance window, m)",
+            min_value = 0, max_value = lap_m, value = (0, lap_m), step = 10,
+            key = key,
+        )
+
+    # ---------------- Lap alignment ----------------
+    ALIGNMENT_MODES = ["Lap distance", "Track position"]
+
+    def _render_alignment_control(self, key, on_change = None):
+        st.radio(
+            "Align laps by", self.ALIGNMENT_MODES, horizontal = True, key = key, on_change = on_change,
+            help = "Track position projects every sample onto the circuit's reference line, "
+                   "so distance drift between cars does not build up through the lap",
+        )
+
+    def _aligned(self, key, telemetry_frames):
+        # The laps as the alignment control at key selects: with their own Distance, or
+        # with Distance replaced by the position along the circuit's reference line
+        if st.session_state.get(key, self.ALIGNMENT_MODES[0]) == self.ALIGNMENT_MODES[0]:
+            return telemetry_frames
+        try:
+            reference = self.data_analyser.get_track_reference(
+                self._current_session(), self._session_key(), self._circuit_key()
+            )
+        except ValueError as e:
+            # Not cached: the next rerun tries again (e.g. once a live lap completes)
+            print(f"Track-position alignment unavailable, using lap distance: {e}")
+            return telemetry_frames
+        return reference.align_many(telemetry_frames)
+
+    def _zoom_window(self, key, telemetry_frames):
+        # Current window of a zoom slider, or None for the whole lap
+        window = st.session_state.get(key)
+        if window is None:
+            return None
+        lo, hi = window
+        if lo <= 0 and hi >= self._lap_length(telemetry_frames):
+            return None
+        return (float(lo), float(hi))
+
+    # ---------------- Concurrent chart construction ----------------
+    @st.cache_resource
+    def _get_chart_executor(_self):
+        # One worker pool per server process, shared by every user session
+        return ThreadPoolExecutor(
+            max_workers = min(8, os.cpu_count() or 2), thread_name_prefix = "chart"
+        )
+
+    def _submit_charts(self, jobs):
+        executor = self._get_chart_executor()
+        return {key: executor.submit(fn, *args) for key, (fn, args) in jobs.items()}
+
+    def _render_charts_as_completed(self, futures, containers = None, config = None):
+        # Reserve a slot per chart in a stable order, then fill the slots as the
+        # workers finish; Streamlit calls stay on the script thread
+        placeholders = {}
+        for key in futures:
+            target = (containers or {}).get(key, st)
+            placeholders[key] = target.empty()
+            placeholders[key].caption("Building chart...")
+
+        keys_by_future = {future: key for key, future in futures.items()}
+        for future in as_completed(keys_by_future):
+            key = keys_by_future[future]
+            try:
+                fig = future.result()
+            except Exception as e:
+                print(f"Error building chart {key}: {e}")
+                fig = None
+
+            if fig is None:
+                placeholders[key].empty()
+                continue
+
+            placeholders[key].plotly_chart(
+                fig, use_container_width = True, key = key, config = config or {}
+            )
+
+    def _render_field_results(self):
+        self._render_minisector_section()
+        self._render_field_heatmap_section()
+        self._render_field_events_section()
+        self._render_gear_shift_section()
+        self._render_field_replay_section()
+        self._render_ideal_lap_section()
+
+    @st.fragment
+    def _render_minisector_section(self):
+        if not self._fragment_ready("session_handle"):
+            return
+        session = self._current_session()
+        driver_info = st.session_state.driver_info or {}
+
+        st.subheader("FULL-FIELD MINI-SECTORS")
+        st.write("")
+
+        c1, c2 = st.columns([2, 1])
+        with c1:
+            n_sectors = st.slider(
+                "Number of Mini-Sectors",
+                min_value = 10, max_value = 60, value = 25, step = 5,
+                key = "minisector_count",
+                help = "The lap is split into this many equal-distance mini-sectors.",
             )
+        with c2:
+            color_by = st.radio(
+                "Colour Mini-Sectors By",
+                ["Driver", "Team"],
+                horizontal = True,
+                key = "minisector_color_by",
+            )
+
+        field = self._field_laps()
 
-        brake_chart = self.chart_creator.create_brake_comparison_chart(
-            st.session_state.telemetry1,
-            st.session_state.telemetry2,
-            st.session_state.driver1,
-            st.session_state.driver2,
+        if not field:
+            st.error("No telemetry available for this session.")
+            return
+
+        pole_driver, _ = self.session_manager.get_pole_position_driver(session)
+        minisectors = self.minisector_analyser.calculate_minisector_times(
+            {d: lap.telemetry for d, lap in field.items()},
+            n_sectors = n_sectors, reference_driver = pole_driver,
         )
-        
-        if brake_chart:
-            st.plotly_chart(brake_chart, use_container_width = True, key = "brake_comparison")
+        if not minisectors:
+            st.error("Could not calculate mini-sector times.")
+            return
 
-        # Delta analysis
-        st.write("### TIME DELTA ANALYSIS")
+        if color_by == "Team":
+            teams = {d: info.get("team", d) for d, info in driver_info.items()}
+            minisectors = self.minisector_analyser.fastest_by_team(minisectors, teams)
+            colors = {
+                info.get("team"): info.get("team_color")
+                for info in driver_info.values() if info.get("team_color")
+            }
+        else:
+            colors = None
+
+        minisector_map = self.chart_creator.create_minisector_track_map(minisectors, colors = colors)
+        if minisector_map:
+            st.plotly_chart(minisector_map, use_container_width = True, key = "minisector_map")
+
+        sectors_won = self.minisector_analyser.count_sectors_won(minisectors)
+        st.caption(
+            " | ".join(f"{label}: {count}" for label, count in sectors_won.items() if count > 0)
+        )
+
+    @st.fragment
+    def _render_field_heatmap_section(self):
+        if not self._fragment_ready("session_handle"):
+            return
+        session = self._current_session()
+
+        st.write("")
+        st.subheader("FIELD HEATMAP")
         st.write("")
-        delta_chart = self.chart_creator.create_delta_chart(
-            st.session_state.telemetry1,
-            st.session_state.telemetry2,
-            st.session_state.driver1,
-            st.session_state.driver2,
+
+        metric = st.radio(
+            "Show",
+            ["Speed", "Delta to Pole"],
+            horizontal = True,
+            key = "field_heatmap_metric",
         )
-        
-        if delta_chart:
-            st.plotly_chart(delta_chart, use_container_width = True, key = "delta_chart")
+
+        # Same held laps as the mini-sector section, so they are only extracted once
+        field = self._field_laps()
+        if not field:
+            st.error("No telemetry available for this session.")
+            return
+
+        # Fastest lap at the top
+        def lap_seconds(driver):
+            lap_time = field[driver].get("LapTime")
+            return lap_time.total_seconds() if pd.notna(lap_time) else float("inf")
+
+        order = sorted(field, key = lap_seconds)
+        pole_driver, _ = self.session_manager.get_pole_position_driver(session)
+
+        self._render_alignment_control("field_heatmap_alignment")
+        telemetries = self._aligned("field_heatmap_alignment", [field[d].telemetry for d in order])
+        heatmap = self.chart_creator.create_field_heatmap(
+            dict(zip(order, telemetries)),
+            metric = "delta" if metric == "Delta to Pole" else "speed",
+            reference_driver = pole_driver,
+        )
+        if heatmap:
+            st.plotly_chart(heatmap, use_container_width = True, key = "field_heatmap")
+
+    @st.fragment
+    def _render_field_events_section(self):
+        if not self._fragment_ready("session_handle"):
+            return
+        session = self._current_session()
+
+        st.write("")
+        st.subheader("BRAKING & THROTTLE POINTS")
+        st.write("")
+
+        c1, c2 = st.columns([2, 1])
+        with c1:
+            event = st.radio(
+                "Event",
+                list(lap_events.EVENTS),
+                format_func = lap_events.EVENTS.get,
+                horizontal = True,
+                key = "field_events_type",
+            )
+        with c2:
+            show = st.radio(
+                "Show",
+                ["Relative to pole", "Distance", "Speed"],
+                horizontal = True,
+                key = "field_events_value",
+                help = "Relative to pole: metres after (+) or before (−) the pole lap's event at the same corner",
+            )
+
+        field = self._field_laps()
+        with st.spinner("Detecting braking and throttle points for the full field..."):
+            try:
+                result = self.data_analyser.get_field_events(
+                    session, self._session_key(), self._circuit_key(), tuple(field), _field = field
+                )
+            except ValueError as e:
+                print(e)
+                result = None
+        if result is None or result[1] is None or not len(result[0]):
+            st.error("Could not detect braking and throttle points for this session.")
+            return
+        apexes, events = result
+
+        table = lap_events.event_matrix(events, event, "Speed" if show == "Speed" else "Distance")
+        pole_driver, _ = self.session_manager.get_pole_position_driver(session)
+        if show == "Relative to pole" and pole_driver in table.index:
+            table = table - table.loc[pole_driver]
+
+        table.columns = [f"T{corner} ({apexes[corner - 1]:,.0f} m)" for corner in table.columns]
+        unit = "km/h" if show == "Speed" else "m"
+        st.caption(
+            f"{lap_events.EVENTS[event]} per corner ({unit}), on the track-position axis shared "
+            "by every driver. Corners are the speed minima of the fastest lap."
+        )
+        st.dataframe(table.astype(float).round(0 if show != "Speed" else 1), use_container_width = True)
+
+    @st.fragment
+    def _render_gear_shift_section(self):
+        if not self._fragment_ready("session_handle"):
+            return
+        session = self._current_session()
+
+        st.write("")
+        st.subheader("GEAR SHIFTS")
+        st.write("")
+
+        c1, c2 = st.columns(2)
+        with c1:
+            direction = st.radio("Shifts", ["up", "down"], horizontal = True, key = "gear_shift_direction",
+                                 format_func = lambda d: f"{d.capitalize()}shifts")
+        with c2:
+            value = st.radio("Show", ["Speed", "RPM", "Distance"], horizontal = True, key = "gear_shift_value")
+
+        field = self._field_laps()
+        with st.spinner("Extracting gear shifts for the full field..."):
+            shifts = self.data_analyser.get_field_shifts(
+                session, self._session_key(), tuple(field), _field = field
+            )
+        if shifts is None or shifts.empty:
+            st.error("No gear data available for this session.")
+            return
+
+        st.caption(f"Median {value.lower()} at every {direction}shift of each driver's fastest lap")
+        st.dataframe(gear_shifts.shift_points(shifts, value, direction).astype(float).round(0), use_container_width = True)
+        st.dataframe(gear_shifts.shift_summary(shifts).round(0), use_container_width = True)
+
+        # Same circuit in other seasons: the field's median shift points per season
+        event = session.event
+        date = event.get("EventDate")
+        if pd.isna(date):
+            return
+        gp_name, year = event.get("EventName"), date.year
+        seasons = st.multiselect(
+            "Compare with seasons",
+            [y for y in self.session_manager.get_available_years() if y != year],
+            key = "gear_shift_seasons",
+            help = f"Loads {gp_name} qualifying of each selected season",
+        )
+        if not seasons:
+            return
+
+        # Each season's shift table is cached on its own; its session is loaded only once
+        tables = {year: shifts}
+        with st.spinner(f"Loading {gp_name} qualifying for {len(seasons)} season(s)..."):
+            for other in seasons:
+                try:
+                    other_shifts = self.data_analyser.get_season_shifts(self.session_manager, gp_name, other)
+                except ValueError as e:
+                    st.warning(str(e))
+                    continue
+                if not other_shifts.empty:
+                    tables[other] = other_shifts
+
+        by_season = pd.concat(tables, names = ["Season"]).reset_index(level = "Season")
+        st.dataframe(
+            gear_shifts.shift_points(by_season, value, direction, by = "Season").sort_index().astype(float).round(0),
+            use_container_width = True,
+        )
+
+    @st.fragment
+    def _render_field_replay_section(self):
+        if not self._fragment_ready("session_handle"):
+            return
+        driver_info = st.session_state.driver_info or {}
+
+        st.write("")
+        st.subheader("GHOST REPLAY")
+        st.write("")
+
+        field = self._field_laps()
+        if len(field) < 2:
+            st.error("Ghost replay needs at least two laps with telemetry.")
+            return
+
+        # Classification order, the top three replayed by default
+        drivers = [d for d in driver_info if d in field]
+        selected = st.multiselect(
+            "Drivers", drivers, default = drivers[:3], key = "field_replay_drivers",
+        )
+        if len(selected) < 2:
+            st.info("Select at least two drivers to replay.")
+            return
+
+        replay = self.data_analyser.get_ghost_replay(
+            field, self._session_key(), tuple(selected)
+        )
+        colors = {d: driver_info[d].get("team_color") for d in selected}
+        self._render_ghost_replay(replay, "field_replay", colors)
+
+    # ---------------- Q1 / Q2 / Q3 ----------------
+    def _render_segment_results(self):
+        self._render_session_timeline()
+
+        index = self.session_manager.get_session_index(self._current_session())
+        if index is None or not index.has_segments:
+            st.warning("The Q1 / Q2 / Q3 split is not available for this session.")
+            return
+        self._render_segment_progression(index)
+        self._render_segment_comparison(index)
+
+    @st.fragment
+    def _render_session_timeline(self):
+        if not self._fragment_ready("session_handle"):
+            return
+        st.subheader("SESSION TIMELINE")
+        st.write("")
+
+        with st.spinner("Building the session timeline..."):
+            timeline = self.data_analyser.get_lap_timeline(
+                self._current_session(), self._session_key()
+            )
+        if timeline is None or timeline.empty:
+            st.warning("No timed laps available for this session.")
+            return
+
+        driver_colors = {
+            d: info.get("team_color") for d, info in (st.session_state.driver_info or {}).items()
+        }
+        chart = self.chart_creator.create_session_timeline_chart(timeline, driver_colors)
+        if chart:
+            st.plotly_chart(chart, use_container_width = True, key = "session_timeline")
+        st.caption("Faded points are deleted laps. Double-click a driver in the legend to isolate them.")
+
+    @st.fragment
+    def _render_segment_progression(self, index):
+        if not self._fragment_ready("session_handle"):
+            return
+        st.subheader("QUALIFYING PROGRESSION")
+        st.write("")
+
+        # Segment splits and best laps were worked out when the session was loaded
+        progression = index.progression()
+        chart = self.chart_creator.create_segment_progression_chart(progression)
+        if chart:
+            st.plotly_chart(chart, use_container_width = True, key = "segment_progression")
+
+        table = progression.apply(lambda col: pd.to_timedelta(col, unit = "s").map(self._format_time))
+        first, last = progression.bfill(axis = 1).iloc[:, 0], progression.ffill(axis = 1).iloc[:, -1]
+        table["Improvement"] = (last - first).map(lambda s: f"{s:+.3f}s" if pd.notna(s) else "N/A")
+        st.dataframe(table, use_container_width = True)
+
+    def _acquire_segment_lap(self, handle_name, row):
+        session = self._current_session()
+        session_name = st.session_state.session_name
+        result = {"message": "No lap data available."}
+
+        def build_lap():
+            lap, result["message"] = self.data_analyser.get_compact_lap_at_row(session, session_name, row)
+            return lap
+
+        lap = self._acquire(handle_name, f"lap:{session_name}:row{row}", build_lap)
+        return lap, result["message"]
+
+    @st.fragment
+    def _render_segment_comparison(self, index):
+        if not self._fragment_ready("session_handle"):
+            return
+        st.write("")
+        st.subheader("COMPARE SEGMENTS")
+        st.write("")
+
+        drivers = list(index.progression().index)
+        c1, c2, c3 = st.columns(3)
+        with c1:
+            driver = st.selectbox("Driver", drivers, key = "segment_driver")
+
+        segments = [
+            name for number, name in enumerate(index.SEGMENTS, start = 1)
+            if index.segment_best_lap_row(driver, number) is not None
+        ]
+        if len(segments) < 2:
+            st.info(f"{driver} set a lap time in only one segment.")
+            return
+
+        with c2:
+            segment_a = st.selectbox("First lap", segments, index = 0, key = f"segment_a_{driver}")
+        with c3:
+            segment_b = st.selectbox("Second lap", segments, index = len(segments) - 1, key = f"segment_b_{driver}")
+        if segment_a == segment_b:
+            st.warning("⚠️ Please select two different segments")
+            return
+
+        laps = []
+        with st.spinner(f"Loading {driver}'s {segment_a} and {segment_b} laps..."):
+            for handle_name, segment in (("segment_lap_handle1", segment_a), ("segment_lap_handle2", segment_b)):
+                row = index.segment_best_lap_row(driver, index.SEGMENTS.index(segment) + 1)
+                lap, message = self._acquire_segment_lap(handle_name, row)
+                if lap is None:
+                    st.error(message)
+                    return
+                laps.append(lap)
+
+        label_a, label_b = f"{driver} {segment_a}", f"{driver} {segment_b}"
+        time_a, time_b = laps[0].get("LapTime"), laps[1].get("LapTime")
+        m1, m2, m3 = st.columns(3)
+        m1.metric(label_a, self._format_time(time_a))
+        m2.metric(label_b, self._format_time(time_b))
+        if pd.notna(time_a) and pd.notna(time_b):
+            m3.metric("Difference", f"{(time_b - time_a).total_seconds():+.3f}s")
+
+        self._render_alignment_control("segment_alignment")
+        telemetry_a, telemetry_b = self._aligned(
+            "segment_alignment", [laps[0].telemetry.copy(deep = False), laps[1].telemetry.copy(deep = False)]
+        )
+        figs = [
+            self.chart_creator.create_speed_comparison_chart(telemetry_a, telemetry_b, label_a, label_b),
+            self.chart_creator.create_throttle_comparison_chart(telemetry_a, telemetry_b, label_a, label_b),
+            self.chart_creator.create_delta_chart(telemetry_a, telemetry_b, label_a, label_b),
+        ]
+        for i, fig in enumerate(figs):
+            if fig is not None:
+                st.plotly_chart(fig, use_container_width = True, key = f"segment_compare_{i}")
+
+    @st.fragment
+    def _render_ideal_lap_section(self):
+        if not self._fragment_ready("session_handle"):
+            return
+        def custom_metric(label, value):
+            return f"""
+            <div style="padding: 0.5rem 0; margin-bottom: 0.5rem;">
+                <div style="color: #888888; font-size: 0.8rem; margin-bottom: 0.2rem;">{label}</div>
+                <div style="color: #444444; font-size: 1.5rem; font-weight: bold;">{value}</div>
+            </div>
+            """
+
+        session = self._current_session()
+
+        st.write("")
+        st.subheader("IDEAL LAP")
+        st.write("")
+
+        n_sectors = st.slider(
+            "Mini-Sectors per Lap",
+            min_value = 10, max_value = 60, value = 25, step = 5,
+            key = "ideal_minisector_count",
+            help = "Each timed lap is split into this many mini-sectors before taking the best of each.",
+        )
+
+        with st.spinner("Evaluating every timed lap of the session..."):
+            lap_samples = self.data_analyser.get_session_lap_samples(
+                session, self._session_key()
+            )
+        ideal_laps = self.minisector_analyser.calculate_ideal_laps(lap_samples, n_sectors = n_sectors)
+        if not ideal_laps:
+            st.warning("Not enough lap data to build ideal laps.")
+            return
+
+        pole_time = ideal_laps["pole_time"]
+        field_ideal = ideal_laps["field_ideal"]
+        fmt = lambda seconds: self._format_time(pd.Timedelta(seconds = seconds))
+
+        c1, c2, c3 = st.columns(3)
+        with c1:
+            st.markdown(custom_metric("Pole Lap", fmt(pole_time)), unsafe_allow_html = True)
+        with c2:
+            st.markdown(custom_metric("Field Ideal Lap", fmt(field_ideal)), unsafe_allow_html = True)
+        with c3:
+            st.markdown(custom_metric("Ideal vs Pole", f"{field_ideal - pole_time:+.3f}s"), unsafe_allow_html = True)
+
+        st.caption(f"Built from {ideal_laps['n_laps']} timed laps split into {n_sectors} mini-sectors.")
+
+        ideal_chart = self.chart_creator.create_ideal_lap_chart(ideal_laps)
+        if ideal_chart:
+            st.plotly_chart(ideal_chart, use_container_width = True, key = "ideal_lap_chart")
 
     def _render_lap_comparison(self):
-        lap1 = st.session_state.pole_lap1
-        lap2 = st.session_state.pole_lap2
+        lap1 = self._lap(1)
+        lap2 = self._lap(2)
 
         def time_to_seconds(td):
             if pd.isna(td):
@@ -720,7 +1689,7 @@ class F1QualifyingApp:
 
         st.write("")
 
-    def _render_performance_metrics(self, telemetry, driver_code, driver_num, show_patterns=None, show_heading=None):
+    def _render_performance_metrics(self, channels, driver_code, driver_num, show_patterns=None, show_heading=None):
         
         # --- Renders metric cards ---
         
@@ -738,7 +1707,8 @@ class F1QualifyingApp:
                 <div style="color: #444444; font-size: 1.5rem; font-weight: bold;">{value}</div>
             </div>
             """
-        metrics = self.data_analyser.calculate_performance_metrics(telemetry)
+        # Channels come from the lap's derived channels, computed once per lap
+        metrics = self.data_analyser.calculate_performance_metrics(channels)
         st.session_state[f"metrics{driver_num}"] = metrics  # cache for later
 
         if not metrics:
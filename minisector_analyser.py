@@ -0,0 +1,177 @@
+import numpy as np
+import pandas as pd
+from lap_alignment import ensure_distance, distance_time, interp_rows, interp_concatenated
+
+
+class MiniSectorAnalyser:
+    # Splits a lap into equal-distance mini-sectors and compares the whole field on one aligned grid
+
+    def __init__(self, points_per_sector = 40):
+        self.points_per_sector = points_per_sector
+
+    # ---------------- Aligned grid ----------------
+    def build_aligned_grid(self, telemetry_by_driver, n_sectors):
+        # Put every driver's cumulative lap time on one shared distance grid.
+        # Distance is normalised to each lap's own length so every lap starts and
+        # ends on the timing line, which keeps mini-sector sums equal to lap time.
+        drivers = [d for d, tel in telemetry_by_driver.items() if tel is not None and not tel.empty]
+        if not drivers:
+            return None
+
+        laps = [ensure_distance(telemetry_by_driver[d]) for d in drivers]
+        dist_time = [distance_time(tel) for tel in laps]
+
+        lap_lengths = np.array([d[-1] - d[0] for d, _ in dist_time])
+        lap_m = float(np.median(lap_lengths))
+
+        # normalised lap fraction per sample (0 -> 1)
+        fractions = [(d - d[0]) / max(d[-1] - d[0], 1e-9) for d, _ in dist_time]
+        times = [t for _, t in dist_time]
+
+        n_points = n_sectors * self.points_per_sector + 1
+        grid = np.linspace(0.0, 1.0, n_points)
+
+        cumulative_time = interp_rows(grid, fractions, times)
+        x = interp_rows(grid, fractions, [tel["X"].to_numpy(float) for tel in laps])
+        y = interp_rows(grid, fractions, [tel["Y"].to_numpy(float) for tel in laps])
+
+        return {
+            "drivers": drivers,
+            "distance": grid * lap_m,
+            "cumulative_time": cumulative_time,
+            "x": x,
+            "y": y,
+        }
+
+    # ---------------- Mini-sector times ----------------
+    def calculate_minisector_times(self, telemetry_by_driver, n_sectors = 25, reference_driver = None):
+        # Drivers x sectors matrix of mini-sector times and the fastest driver in each
+        if not telemetry_by_driver or n_sectors < 1:
+            return None
+
+        try:
+            aligned = self.build_aligned_grid(telemetry_by_driver, n_sectors)
+            if aligned is None:
+                return None
+
+            drivers = aligned["drivers"]
+            edges = np.arange(0, n_sectors + 1) * self.points_per_sector
+
+            # sector times from cumulative time at each mini-sector boundary
+            sector_times = np.diff(aligned["cumulative_time"][:, edges], axis = 1)
+
+            fastest_idx = np.nanargmin(sector_times, axis = 0)
+            ordered = np.sort(sector_times, axis = 0)
+            margin = ordered[1] - ordered[0] if len(drivers) > 1 else np.zeros(n_sectors)
+
+            # reference path for drawing: pole / requested driver, else first row
+            ref = drivers.index(reference_driver) if reference_driver in drivers else 0
+
+            return {
+                "drivers": drivers,
+                "n_sectors": n_sectors,
+                "distance": aligned["distance"],
+                "edges": edges,
+                "sector_times": pd.DataFrame(
+                    sector_times, index = drivers, columns = np.arange(1, n_sectors + 1)
+                ),
+                "fastest_idx": fastest_idx,
+                "fastest_driver": [drivers[i] for i in fastest_idx],
+                "margin": margin,
+                "x": aligned["x"][ref],
+                "y": aligned["y"][ref],
+            }
+
+        except Exception as e:
+            print(f"Error calculating mini-sector times: {e}")
+            return None
+
+    def fastest_by_team(self, minisectors, driver_teams):
+        # Collapse the drivers x sectors matrix to teams (best of each team's drivers)
+        if not minisectors:
+            return None
+
+        try:
+            sector_times = minisectors["sector_times"]
+            teams = sector_times.index.map(lambda d: driver_teams.get(d, d))
+            team_times = sector_times.groupby(teams).min()
+
+            values = team_times.to_numpy()
+            fastest_idx = np.nanargmin(values, axis = 0)
+            ordered = np.sort(values, axis = 0)
+            margin = ordered[1] - ordered[0] if len(team_times) > 1 else np.zeros(values.shape[1])
+
+            return {
+                **minisectors,
+                "sector_times": team_times,
+                "fastest_idx": fastest_idx,
+                "fastest_driver": [team_times.index[i] for i in fastest_idx],
+                "margin": margin,
+            }
+
+        except Exception as e:
+            print(f"Error grouping mini-sectors by team: {e}")
+            return None
+
+    # ---------------- Ideal lap ----------------
+    def calculate_ideal_laps(self, lap_samples, n_sectors = 25):
+        # Best possible lap per driver and for the field, from the best mini-sectors of every timed lap
+        if not lap_samples or n_sectors < 1:
+            return None
+
+        try:
+            laps = lap_samples["laps"]
+            lap_times = laps["LapTime"].to_numpy(dtype = float)
+
+            # laps x boundaries matrix of cumulative time; pin the ends to the official lap time
+            edges = np.linspace(0.0, 1.0, n_sectors + 1)
+            cumulative_time = interp_concatenated(
+                edges, lap_samples["fraction"], lap_samples["time"], lap_samples["lengths"]
+            )
+            cumulative_time[:, 0] = 0.0
+            cumulative_time[:, -1] = lap_times
+
+            sector_times = pd.DataFrame(
+                np.diff(cumulative_time, axis = 1),
+                index = laps["Driver"].to_numpy(),
+                columns = np.arange(1, n_sectors + 1),
+            )
+
+            best_sectors = sector_times.groupby(level = 0).min()
+            best_lap = laps.groupby("Driver")["LapTime"].min()
+
+            # Gaps are to the actual pole lap when the samples carry it
+            pole_time = lap_samples.get("pole_time", np.nan)
+            if pole_time is None or not np.isfinite(pole_time):
+                pole_time = best_lap.min()
+            pole_time = float(pole_time)
+
+            summary = pd.DataFrame({
+                "best_lap": best_lap,
+                "ideal_lap": best_sectors.sum(axis = 1),
+            })
+            summary["potential_gain"] = summary["best_lap"] - summary["ideal_lap"]
+            summary["ideal_gap_to_pole"] = summary["ideal_lap"] - pole_time
+            summary["best_gap_to_pole"] = summary["best_lap"] - pole_time
+
+            field_idx = np.argmin(sector_times.to_numpy(), axis = 0)
+
+            return {
+                "summary": summary.sort_values("ideal_lap"),
+                "pole_time": pole_time,
+                "field_ideal": float(sector_times.to_numpy().min(axis = 0).sum()),
+                "field_sector_owner": list(sector_times.index[field_idx]),
+                "n_laps": len(laps),
+            }
+
+        except Exception as e:
+            print(f"Error calculating ideal laps: {e}")
+            return None
+
+    def count_sectors_won(self, minisectors):
+        # Number of mini-sectors each driver (or team) was fastest in
+        if not minisectors:
+            return pd.Series(dtype = int)
+        labels = minisectors["sector_times"].index
+        counts = np.bincount(minisectors["fastest_idx"], minlength = len(labels))
+        return pd.Series(counts, index = labels).sort_values(ascending = False)
@@ -0,0 +1,108 @@
+import threading
+import time
+
+
+class ObjectStore:
+    # Process-wide store for the heavy objects behind the UI (FastF1 sessions, analysed
+    # laps, figures). Browser sessions keep only the string keys in st.session_state and
+    # every acquire() is one counted reference, so two users looking at the same lap share
+    # one copy. An object is dropped when its last reference is released or its holders
+    # have been idle for longer than idle_timeout seconds.
+
+    def __init__(self, idle_timeout = 30 * 60, sweep_interval = 60):
+        self.idle_timeout = idle_timeout
+        self.sweep_interval = sweep_interval
+
+        self._lock = threading.Lock()
+        self._objects = {}    # key -> object
+        self._holders = {}    # key -> {owner id: handle count}
+        self._handles = {}    # owner id -> {key: handle count}
+        self._last_seen = {}  # owner id -> time.monotonic() of last activity
+        self._last_sweep = time.monotonic()
+
+    # ---------------- Handles ----------------
+    def acquire(self, owner, key, factory = None):
+        # Return the object for key, building it with factory() if nobody holds it yet,
+        # and record owner as one of its holders. Returns None if it cannot be provided.
+        with self._lock:
+            if key in self._objects:
+                self._hold(owner, key)
+                return self._objects[key]
+
+        if factory is None:
+            return None
+
+        # Build outside the lock: loading a session can take seconds and must not block
+        # other users. If two users race, the first stored object wins.
+        obj = factory()
+        if obj is None:
+            return None
+
+        with self._lock:
+            obj = self._objects.setdefault(key, obj)
+            self._hold(owner, key)
+            return obj
+
+    def get(self, key):
+        with self._lock:
+            return self._objects.get(key)
+
+    def release(self, owner, key):
+        if key is None:
+            return
+        with self._lock:
+            self._drop(owner, key)
+
+    def release_all(self, owner):
+        with self._lock:
+            for key, count in list(self._handles.get(owner, {}).items()):
+                self._drop(owner, key, count)
+            self._handles.pop(owner, None)
+            self._last_seen.pop(owner, None)
+
+    # ---------------- Idle eviction ----------------
+    def touch(self, owner):
+        # Mark owner as active; occasionally release everything held by idle owners
+        now = time.monotonic()
+        with self._lock:
+            self._last_seen[owner] = now
+            if now - self._last_sweep < self.sweep_interval:
+                return
+            self._last_sweep = now
+            idle = [o for o, seen in self._last_seen.items() if now - seen > self.idle_timeout]
+
+        for idle_owner in idle:
+            self.release_all(idle_owner)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "objects": len(self._objects),
+                "owners": len(self._handles),
+                "references": sum(sum(h.values()) for h in self._holders.values()),
+            }
+
+    # ---------------- Internals (lock held) ----------------
+    def _hold(self, owner, key):
+        holders = self._holders.setdefault(key, {})
+        holders[owner] = holders.get(owner, 0) + 1
+        handles = self._handles.setdefault(owner, {})
+        handles[key] = handles.get(key, 0) + 1
+        self._last_seen[owner] = time.monotonic()
+
+    def _drop(self, owner, key, count = 1):
+        holders = self._holders.get(key)
+        if holders is None or owner not in holders:
+            return
+
+        holders[owner] -= count
+        if holders[owner] <= 0:
+            del holders[owner]
+        if not holders:
+            del self._holders[key]
+            self._objects.pop(key, None)
+
+        handles = self._handles.get(owner, {})
+        handles[key] = handles.get(key, 0) - count
+        if handles[key] <= 0:
+            del handles[key]
@@ -0,0 +1,288 @@
+import json
+import os
+import struct
+import threading
+
+import numpy as np
+import pandas as pd
+
+from lap_data import CompactLap
+from session_index import SessionIndex
+
+
+class SessionBundle:
+    # Read-only, memory-mapped bundle of prebuilt qualifying sessions (see build_bundle.py).
+    #
+    # File layout: b"F1BUNDLE", a uint64 header length, a JSON header, then raw NumPy
+    # arrays, each aligned to 64 bytes. Opening reads only the header; arrays are views
+    # into one read-only memory map and are paged in when a session actually uses them.
+    # Data is kept compact by type (float32 telemetry, int8 gears, bool brake) rather than
+    # by a general-purpose compressor, which would rule out memory-mapping.
+    #
+    # The app opens the bundle named by F1_SESSION_BUNDLE (default: session_bundle.f1b
+    # next to the app) and falls back to FastF1 for anything missing from it.
+
+    MAGIC = b"F1BUNDLE"
+    VERSION = 1
+    ALIGN = 64
+    ENV_VAR = "F1_SESSION_BUNDLE"
+    DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "session_bundle.f1b")
+
+    _opened = {}
+    _opened_lock = threading.Lock()
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(self.MAGIC)) != self.MAGIC:
+                raise ValueError(f"{path} is not a session bundle")
+            (header_len,) = struct.unpack("<Q", f.read(8))
+            self.header = json.loads(f.read(header_len).decode("utf-8"))
+
+        if self.header.get("version") != self.VERSION:
+            raise ValueError(f"Unsupported session bundle version in {path}")
+
+        self._data_start = self.data_start(header_len)
+        self._map = np.memmap(path, dtype = np.uint8, mode = "r")
+        self._sessions = {}
+
+    @classmethod
+    def shared(cls, path):
+        # The process-wide bundle for path: its header is parsed and the file mapped once,
+        # however many times sessions from it are unpickled from st.cache_data
+        path = os.path.abspath(path)
+        with cls._opened_lock:
+            bundle = cls._opened.get(path)
+            if bundle is None:
+                bundle = cls._opened[path] = cls(path)
+            return bundle
+
+    @classmethod
+    def from_env(cls):
+        # Bundle configured for this deployment, or None when there is none
+        path = os.environ.get(cls.ENV_VAR, cls.DEFAULT_PATH)
+        if not os.path.exists(path):
+            return None
+        try:
+            return cls.shared(path)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring session bundle {path}: {e}")
+            return None
+
+    @classmethod
+    def data_start(cls, header_len):
+        # Arrays start at the first aligned offset after the header
+        prefix = len(cls.MAGIC) + 8 + header_len
+        return -(-prefix // cls.ALIGN) * cls.ALIGN
+
+    @staticmethod
+    def session_key(year, gp_name):
+        return f"{int(year)}:{gp_name}"
+
+    # ---------------- Lookup ----------------
+    def events_for_year(self, year):
+        return self.header["events"].get(str(int(year)))
+
+    def has_session(self, year, gp_name):
+        return self.session_key(year, gp_name) in self.header["sessions"]
+
+    def open_session(self, year, gp_name):
+        # One BundleSession per session, so its decoded tables and SessionIndex are reused
+        key = self.session_key(year, gp_name)
+        if key not in self.header["sessions"]:
+            return None
+        with self._opened_lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._sessions[key] = BundleSession(self, key)
+            return session
+
+    # ---------------- Decoding ----------------
+    def array(self, ref):
+        dtype = np.dtype(ref["dtype"])
+        count = int(np.prod(ref["shape"]))
+        offset = self._data_start + ref["offset"]
+        return np.frombuffer(self._map, dtype = dtype, count = count, offset = offset).reshape(ref["shape"])
+
+    def table(self, spec):
+        columns = {}
+        for name, col in spec["columns"].items():
+            kind = col["kind"]
+            if kind == "values":
+                columns[name] = col["values"]
+            elif kind == "timedelta":
+                columns[name] = pd.to_timedelta(self.array(col["array"]), unit = "s")
+            elif kind == "datetime":
+                columns[name] = pd.to_datetime(self.array(col["array"]), unit = "s")
+            else:
+                columns[name] = self.array(col["array"])
+        return pd.DataFrame(columns, index = pd.RangeIndex(spec["rows"]))
+
+
+class BundleSession:
+    # Stands in for a fastf1 Session loaded from a SessionBundle: results, laps, event and
+    # name/date like FastF1, plus each driver's extracted fastest lap and the lap samples
+    # of every timed lap, which DataAnalyser uses instead of re-extracting telemetry.
+
+    def __init__(self, bundle, key):
+        self.bundle = bundle
+        self.key = key
+        self._spec = bundle.header["sessions"][key]
+
+        self.name = self._spec["name"]
+        self.date = pd.Timestamp(self._spec["date"]) if self._spec.get("date") else pd.NaT
+        self.event = pd.Series({
+            "EventName": self._spec["event_name"],
+            "EventDate": pd.Timestamp(self._spec["event_date"]) if self._spec.get("event_date") else pd.NaT,
+        })
+        self._results = None
+        self._laps = None
+
+    def __reduce__(self):
+        # st.cache_data pickles returned sessions: keep just the reference, not the arrays;
+        # unpickling hands back the same session of the process-wide bundle
+        return _reopen_bundle_session, (self.bundle.path, self.key)
+
+    @property
+    def results(self):
+        if self._results is None:
+            self._results = self.bundle.table(self._spec["results"])
+        return self._results
+
+    @property
+    def laps(self):
+        if self._laps is None:
+            self._laps = self.bundle.table(self._spec["laps"])
+        return self._laps
+
+    def get_lap(self, driver_code):
+        # The driver's fastest lap as a CompactLap over the memory-mapped arrays
+        spec = self._spec["fastest_laps"].get(driver_code)
+        if spec is None:
+            return None
+        columns = {name: self.bundle.array(ref) for name, ref in spec["channels"].items()}
+        return CompactLap(driver_code, CompactLap.info_from_json(spec["info"]), columns)
+
+    def lap_samples(self):
+        # Same structure as DataAnalyser.get_session_lap_samples
+        spec = self._spec.get("lap_samples")
+        if spec is None:
+            return None
+        return {
+            "laps": self.bundle.table(spec["laps"]),
+            "fraction": self.bundle.array(spec["fraction"]),
+            "time": self.bundle.array(spec["time"]),
+            "lengths": self.bundle.array(spec["lengths"]),
+        }
+
+
+def _reopen_bundle_session(path, key):
+    return SessionBundle.shared(path).open_session(*key.split(":", 1))
+
+
+class SessionBundleWriter:
+    # Collects sessions and writes them as a single SessionBundle file
+
+    def __init__(self):
+        self._header = {"version": SessionBundle.VERSION, "events": {}, "sessions": {}}
+        self._chunks = []
+        self._size = 0
+
+    def add_events(self, year, events):
+        self._header["events"][str(int(year))] = list(events)
+
+    def add_session(self, year, gp_name, session, fastest_laps, lap_samples):
+        # session: a loaded fastf1 Session; fastest_laps: {driver: CompactLap};
+        # lap_samples: the dict returned by DataAnalyser.get_session_lap_samples
+        event = session.event
+
+        # Store the Q1 / Q2 / Q3 split with the laps: it needs FastF1's session status
+        # data, which the bundle does not keep
+        laps = pd.DataFrame(session.laps)
+        laps[SessionIndex.SEGMENT_COLUMN] = SessionIndex.for_session(session).lap_segment
+
+        spec = {
+            "name": session.name,
+            "date": _iso(session.date),
+            "event_name": event["EventName"],
+            "event_date": _iso(event.get("EventDate")),
+            "results": self._table(session.results),
+            "laps": self._table(laps),
+            "fastest_laps": {
+                driver: {
+                    "info": lap.info_to_json(),
+                    "channels": {name: self._array(values) for name, values in lap.columns.items()},
+                }
+                for driver, lap in fastest_laps.items()
+            },
+        }
+        if lap_samples:
+            spec["lap_samples"] = {
+                "laps": self._table(lap_samples["laps"]),
+                "fraction": self._array(lap_samples["fraction"].astype(np.float32)),
+                "time": self._array(lap_samples["time"].astype(np.float32)),
+                "lengths": self._array(lap_samples["lengths"].astype(np.int32)),
+            }
+        self._header["sessions"][SessionBundle.session_key(year, gp_name)] = spec
+
+    def write(self, path):
+        header = json.dumps(self._header).encode("utf-8")
+        data_start = SessionBundle.data_start(len(header))
+
+        # Write next to the target and rename, so a running app never maps a partial file
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, "wb") as f:
+            f.write(SessionBundle.MAGIC)
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            f.write(b"\0" * (data_start - f.tell()))
+            for chunk in self._chunks:
+                f.write(chunk)
+        os.replace(tmp_path, path)
+
+    # ---------------- Encoding ----------------
+    def _array(self, values):
+        # Offsets are relative to the start of the data section
+        values = np.ascontiguousarray(values)
+        ref = {"offset": self._size, "dtype": values.dtype.str, "shape": list(values.shape)}
+        data = values.tobytes()
+        padding = -len(data) % SessionBundle.ALIGN
+        self._chunks.append(data + b"\0" * padding)
+        self._size += len(data) + padding
+        return ref
+
+    def _table(self, frame):
+        columns = {}
+        for name in frame.columns:
+            values = frame[name]
+            if pd.api.types.is_timedelta64_dtype(values):
+                columns[name] = {"kind": "timedelta", "array": self._array(values.dt.total_seconds().to_numpy(float))}
+            elif pd.api.types.is_datetime64_any_dtype(values):
+                seconds = (values - pd.Timestamp(0, tz = values.dt.tz)).dt.total_seconds()
+                columns[name] = {"kind": "datetime", "array": self._array(seconds.to_numpy(float))}
+            elif isinstance(values.dtype, np.dtype) and values.dtype.kind in "biuf":
+                columns[name] = {"kind": "array", "array": self._array(values.to_numpy())}
+            elif pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+                # Nullable integer / float extension types: store as float with NaN
+                array = values.to_numpy(dtype = float, na_value = np.nan)
+                columns[name] = {"kind": "array", "array": self._array(array)}
+            else:
+                columns[name] = {
+                    "kind": "values",
+                    "values": [None if pd.isna(v) else _json_value(v) for v in values],
+                }
+        return {"rows": len(frame), "columns": columns}
+
+
+def _iso(value):
+    if value is None or pd.isna(value):
+        return None
+    return pd.Timestamp(value).isoformat()
+
+
+def _json_value(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
@@ -0,0 +1,233 @@
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+
+class SessionIndex:
+    # Lookup tables for one loaded session, built once when the session is loaded so the
+    # sidebar and analysis code never scan session.results / session.laps while rendering:
+    #   - position -> driver code
+    #   - driver code -> name / team / colour / positions (the sidebar's driver_info)
+    #   - driver code -> row range of its laps (rows grouped by driver via lap_order)
+    #   - driver code -> row of its fastest lap (same choice as Laps.pick_fastest)
+    #   - Q1 / Q2 / Q3 of every lap, each driver's laps per segment as a row range and
+    #     the driver's best lap in each segment
+    # Sessions whose laps grow (LiveSession) carry a version; the index is rebuilt when
+    # it changes.
+
+    SEGMENTS = ("Q1", "Q2", "Q3")
+    SEGMENT_COLUMN = "QualifyingSegment"
+
+    _indexes = weakref.WeakKeyDictionary()
+    _lock = threading.Lock()
+
+    def __init__(self, session):
+        self.version = getattr(session, "version", None)
+        laps = getattr(session, "laps", None)
+        self._build_results(getattr(session, "results", None))
+        self.lap_segment = self._split_segments(laps)
+        self._build_laps(laps)
+
+        # No classification (e.g. results not published yet): fall back to lap data
+        if not self.driver_info:
+            for driver in self.drivers:
+                self.driver_info[driver] = {
+                    "full_name": driver,
+                    "team": self.lap_team.get(driver, "Unknown Team"),
+                    "grid_position": "N/A",
+                    "position": "N/A",
+                    "team_color": None,
+                }
+
+    @classmethod
+    def for_session(cls, session):
+        # The index of a session, built on first request and kept for as long as the session
+        if session is None:
+            return None
+        with cls._lock:
+            index = cls._indexes.get(session)
+            if index is None or index.version != getattr(session, "version", None):
+                index = cls(session)
+                cls._indexes[session] = index
+            return index
+
+    # ---------------- Build ----------------
+    def _build_results(self, results):
+        self.driver_by_position = {}
+        self.driver_info = {}
+        if results is None or results.empty or "Abbreviation" not in results.columns:
+            return
+
+        def column(name, default):
+            if name in results.columns:
+                return results[name].to_numpy()
+            return np.full(len(results), default, dtype = object)
+
+        codes = column("Abbreviation", None)
+        full_names = column("FullName", "Unknown")
+        teams = column("TeamName", "Unknown Team")
+        grid_positions = column("GridPosition", "N/A")
+        positions = column("Position", "N/A")
+        team_colors = column("TeamColor", None)
+
+        for i, code in enumerate(codes):
+            if pd.isna(code):
+                continue
+            team_color = team_colors[i]
+            self.driver_info[code] = {
+                "full_name": full_names[i],
+                "team": teams[i],
+                "grid_position": grid_positions[i],
+                "position": positions[i],
+                "team_color": f"#{team_color}" if pd.notna(team_color) and team_color else None,
+            }
+            if isinstance(positions[i], (int, float, np.number)) and pd.notna(positions[i]):
+                self.driver_by_position.setdefault(int(positions[i]), code)
+
+    def _split_segments(self, laps):
+        # Segment number (1-3, 0 = unknown) of every lap row. Sessions from the bundle
+        # carry it as a column; FastF1 sessions are split with the session status data.
+        if laps is None or laps.empty:
+            return np.zeros(0, dtype = np.int8)
+        if self.SEGMENT_COLUMN in laps.columns:
+            return laps[self.SEGMENT_COLUMN].to_numpy(dtype = np.int8)
+
+        segment = np.zeros(len(laps), dtype = np.int8)
+        try:
+            parts = laps.split_qualifying_sessions()
+        except Exception:
+            # Not a FastF1 Laps object, or no session status to split by
+            return segment
+        for number, part in enumerate(parts, start = 1):
+            if part is not None and len(part):
+                rows = laps.index.get_indexer(part.index)
+                segment[rows[rows >= 0]] = number
+        return segment
+
+    def _build_laps(self, laps):
+        self.n_laps = 0
+        self.drivers = []
+        self.lap_order = np.empty(0, dtype = np.int64)
+        self.lap_ranges = {}
+        self.fastest_row = {}
+        self.lap_team = {}
+        self.segment_ranges = {}
+        self.segment_best_row = {}
+        self.segment_best_time = {}
+        if laps is None or laps.empty or "Driver" not in laps.columns:
+            return
+
+        self.n_laps = len(laps)
+        drivers = laps["Driver"]
+        rows = np.flatnonzero((drivers.notna() & (drivers.astype(str) != "nan")).to_numpy())
+        if rows.size == 0:
+            return
+
+        # Group row numbers by driver, then by segment, with one stable sort; each driver
+        # and each (driver, segment) is then a slice
+        codes, inverse = np.unique(drivers.to_numpy()[rows].astype(str), return_inverse = True)
+        order = np.lexsort((self.lap_segment[rows], inverse))
+        self.lap_order = rows[order]
+        bounds = np.searchsorted(inverse[order], np.arange(len(codes) + 1))
+        self.drivers = codes.tolist()
+        self.lap_ranges = {code: (int(bounds[k]), int(bounds[k + 1])) for k, code in enumerate(self.drivers)}
+
+        if "Team" in laps.columns:
+            teams = laps["Team"].to_numpy()
+            first_rows = self.lap_order[bounds[:-1]]
+            self.lap_team = {code: teams[row] for code, row in zip(self.drivers, first_rows)}
+
+        # Fastest lap per driver: personal-best laps only when that flag exists, as
+        # Laps.pick_fastest does, then the minimum lap time within the driver's slice
+        if "LapTime" not in laps.columns:
+            return
+        lap_time = pd.to_timedelta(laps["LapTime"]).dt.total_seconds().to_numpy()
+        candidate = ~np.isnan(lap_time)
+        if "IsPersonalBest" in laps.columns:
+            candidate &= (laps["IsPersonalBest"] == True).to_numpy()
+
+        key = np.where(candidate, lap_time, np.inf)[self.lap_order]
+        for code, (start, stop) in self.lap_ranges.items():
+            if stop > start:
+                k = start + int(np.argmin(key[start:stop]))
+                if np.isfinite(key[k]):
+                    self.fastest_row[code] = int(self.lap_order[k])
+
+        self._build_segment_bests(laps, lap_time, inverse[order], codes)
+
+    def _build_segment_bests(self, laps, lap_time, driver_of, codes):
+        # Best lap per (driver, segment) with group-wise minima over the sorted rows.
+        # Personal-best flags are session-wide, so any valid lap counts here; laps deleted
+        # for track limits do not.
+        segment_of = self.lap_segment[self.lap_order]
+        if not segment_of.any():
+            return
+
+        valid = ~np.isnan(lap_time)
+        if "Deleted" in laps.columns:
+            valid &= (laps["Deleted"] != True).to_numpy()
+        key = np.where(valid, lap_time, np.inf)[self.lap_order]
+
+        group = driver_of.astype(np.int64) * 4 + segment_of
+        starts = np.flatnonzero(np.diff(group, prepend = -1))
+        stops = np.append(starts[1:], group.size)
+        minima = np.minimum.reduceat(key, starts)
+
+        # First row of each group that attains the group's minimum
+        group_id = np.repeat(np.arange(starts.size), stops - starts)
+        at_min = np.flatnonzero(key == minima[group_id])
+        first = at_min[np.unique(group_id[at_min], return_index = True)[1]]
+        best_pos = np.full(starts.size, -1)
+        best_pos[group_id[first]] = first
+
+        for g, (start, stop) in enumerate(zip(starts, stops)):
+            number = int(segment_of[start])
+            if number == 0:
+                continue
+            code = str(codes[driver_of[start]])
+            self.segment_ranges[(code, number)] = (int(start), int(stop))
+            if np.isfinite(minima[g]):
+                self.segment_best_row[(code, number)] = int(self.lap_order[best_pos[g]])
+                self.segment_best_time[(code, number)] = float(minima[g])
+
+    # ---------------- Lookups ----------------
+    def driver_at(self, position):
+        return self.driver_by_position.get(int(position))
+
+    def full_name(self, driver_code):
+        return self.driver_info.get(driver_code, {}).get("full_name", driver_code)
+
+    def driver_lap_rows(self, driver_code):
+        start, stop = self.lap_ranges.get(driver_code, (0, 0))
+        return self.lap_order[start:stop]
+
+    def fastest_lap_row(self, driver_code):
+        return self.fastest_row.get(driver_code)
+
+    @property
+    def has_segments(self):
+        return bool(self.segment_ranges)
+
+    def segment_lap_rows(self, driver_code, segment):
+        start, stop = self.segment_ranges.get((driver_code, segment), (0, 0))
+        return self.lap_order[start:stop]
+
+    def segment_best_lap_row(self, driver_code, segment):
+        return self.segment_best_row.get((driver_code, segment))
+
+    def progression(self):
+        # Best lap time (s) of every driver in Q1 / Q2 / Q3, in classification order:
+        # drivers who reached Q3 by their Q3 time, then Q2 eliminations, then Q1
+        drivers = sorted({code for code, _ in self.segment_best_time})
+        table = pd.DataFrame(np.nan, index = drivers, columns = list(self.SEGMENTS))
+        for (code, number), seconds in self.segment_best_time.items():
+            table.loc[code, self.SEGMENTS[number - 1]] = seconds
+        if table.empty:
+            return table
+
+        values = table.to_numpy()
+        reached = np.where(np.isnan(values), 0, np.arange(1, len(self.SEGMENTS) + 1)).max(axis = 1)
+        last_time = values[np.arange(len(values)), np.maximum(reached - 1, 0)]
+        return table.iloc[np.lexsort((np.nan_to_num(last_time, nan = np.inf), -reached))]
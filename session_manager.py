@@ -1,26 +1,45 @@
+import os
 import streamlit as st
-import fastf1
 import pandas as pd
+from live_timing import LiveSession
+from session_bundle import SessionBundle
+from session_index import SessionIndex
 
 
 class SessionManager:
     # Handles F1 session loading and driver management for pole position analysis
 
-    def __init__(self):
-        # ---- Initialise FastF1 cache on first use ----
-        self._initialise_fastf1_cache()
+    def __init__(self, use_bundle = True):
+        # FastF1 is slow to import, so it is only loaded (and its cache initialised)
+        # the first time a schedule or session is requested that the prebuilt
+        # session bundle (if the deployment ships one) does not cover
+        self.bundle = self._open_session_bundle() if use_bundle else None
+
+    @st.cache_resource
+    def _open_session_bundle(_self):
+        # Reads only the bundle header; session data is memory-mapped on demand
+        return SessionBundle.from_env()
 
     @st.cache_resource
     def _initialise_fastf1_cache(_self):
         # Enable FastF1 cache so that data loads faster after first request
+        # (created on first use; the directory is not part of the repository)
+        import fastf1
+        os.makedirs("f1_cache", exist_ok = True)
         fastf1.Cache.enable_cache("f1_cache")
-        return True
+        return fastf1
 
     @st.cache_data
     def get_available_events_for_year(_self, year: int):
         # Get list of available Grand Prix events for a specific year
+        if _self.bundle is not None:
+            events = _self.bundle.events_for_year(year)
+            if events:
+                return events, f"Found {len(events)} events for {year}"
+
         try:
             # get season schedule using FastF1
+            fastf1 = _self._initialise_fastf1_cache()
             schedule = fastf1.get_event_schedule(year)
             if schedule is None or schedule.empty:
                 return [], f"No events found for {year}"
@@ -46,29 +65,53 @@ class SessionManager:
     @st.cache_data
     def load_qualifying_session(_self, gp_name: str, year: int):
         # Load F1 qualifying session data for a given year 
+        if _self.bundle is not None:
+            session = _self.bundle.open_session(year, gp_name)
+            if session is not None:
+                return session, f"✅ Successfully loaded {year} {gp_name} Qualifying"
+
         try:
+            fastf1 = _self._initialise_fastf1_cache()
             session = fastf1.get_session(year, gp_name, "Q")  # Q = qualifying
             session.load()  # Load timing and lap data
             return session, f"✅ Successfully loaded {year} {gp_name} Qualifying"
         except Exception as e:
             return None, f"❌ Error loading session: {str(e)}"
 
+    def load_live_session(self, gp_name: str, year: int, recording: str, speed: float = 1.0):
+        # Qualifying replayed from a FastF1 live-timing recording. Not cached: the session
+        # changes as its replay clock runs, and is shared through the object store instead
+        try:
+            fastf1 = self._initialise_fastf1_cache()
+            from fastf1.livetiming.data import LiveTimingData
+            source = fastf1.get_session(year, gp_name, "Q")
+            source.load(livedata = LiveTimingData(recording))
+            return (
+                LiveSession(source, speed = speed),
+                f"🔴 Replaying {year} {gp_name} Qualifying live from {os.path.basename(recording)}",
+            )
+        except Exception as e:
+            return None, f"❌ Error loading live recording: {str(e)}"
+
+    def get_session_index(self, session):
+        # Lookup tables for the session, built once (at load time) and reused on every rerun
+        return SessionIndex.for_session(session)
+
     def get_pole_position_driver(self, session):
         # Identify pole position (P1)
         if session is None:
             return None, "No session loaded"
         
         try:
-            results = session.results
-            if results is None or results.empty:
+            index = self.get_session_index(session)
+            if not index.driver_by_position:
                 return None, "No qualifying results available"
             
-            pole_driver = results[results['Position'] == 1]
-            if pole_driver.empty:
+            driver_code = index.driver_at(1)
+            if driver_code is None:
                 return None, "No pole position data found"
             
-            driver_code = pole_driver['Abbreviation'].iloc[0]  
-            driver_name = pole_driver['FullName'].iloc[0]
+            driver_name = index.full_name(driver_code)
             
             return driver_code, f"Pole position: {driver_name} ({driver_code})"
             
@@ -81,16 +124,15 @@ class SessionManager:
             return None, "No session loaded"
         
         try:
-            results = session.results
-            if results is None or results.empty:
+            index = self.get_session_index(session)
+            if not index.driver_by_position:
                 return None, "No qualifying results available"
             
-            p2_driver = results[results['Position'] == 2]
-            if p2_driver.empty:
+            driver_code = index.driver_at(2)
+            if driver_code is None:
                 return None, "No P2 data found"
             
-            driver_code = p2_driver['Abbreviation'].iloc[0]
-            driver_name = p2_driver['FullName'].iloc[0]
+            driver_name = index.full_name(driver_code)
             
             return driver_code, f"P2: {driver_name} ({driver_code})"
             
@@ -103,16 +145,15 @@ class SessionManager:
             return None, "No session loaded"
         
         try:
-            results = session.results
-            if results is None or results.empty:
+            index = self.get_session_index(session)
+            if not index.driver_by_position:
                 return None, "No qualifying results available"
             
-            driver = results[results['Position'] == position]
-            if driver.empty:
+            driver_code = index.driver_at(position)
+            if driver_code is None:
                 return None, f"No driver found at position {position}"
             
-            driver_code = driver['Abbreviation'].iloc[0]
-            driver_name = driver['FullName'].iloc[0]
+            driver_name = index.full_name(driver_code)
             
             return driver_code, f"P{position}: {driver_name} ({driver_code})"
             
@@ -124,8 +165,7 @@ class SessionManager:
         if session is None:
             return []
         try:
-            drivers = session.laps["Driver"].unique()
-            return sorted([d for d in drivers if str(d) != "nan"])
+            return list(self.get_session_index(session).drivers)
         except Exception as e:
             print(f"Error getting drivers: {e}")
             return []
@@ -145,7 +185,7 @@ class SessionManager:
                 "event_name": session.event["EventName"],
                 "session_name": session.name,
                 "date": session.date,
-                "total_laps": len(session.laps),
+                "total_laps": self.get_session_index(session).n_laps,
                 "year": session.event.get("EventDate", pd.NaT).year if hasattr(session, 'event') else None,
             }
         except Exception as e:
@@ -158,33 +198,9 @@ class SessionManager:
         if session is None:
             return {}
         try:
-            driver_info = {}
-
-            # Use official results first
-            if hasattr(session, 'results') and session.results is not None:
-                results = session.results
-                for _, driver in results.iterrows():
-                    if pd.notna(driver.get('Abbreviation')):
-                        driver_info[driver['Abbreviation']] = {
-                            'full_name': driver.get('FullName', 'Unknown'),
-                            'team': driver.get('TeamName', 'Unknown Team'),
-                            'grid_position': driver.get('GridPosition', 'N/A'),
-                            'position': driver.get('Position', 'N/A')
-                        }
-            
-            # If no results, fall back to lap data
-            if not driver_info and hasattr(session, 'laps'):
-                unique_drivers = session.laps[['Driver', 'Team']].drop_duplicates()
-                for _, row in unique_drivers.iterrows():
-                    if pd.notna(row['Driver']):
-                        driver_info[row['Driver']] = {
-                            'full_name': row['Driver'],
-                            'team': row.get('Team', 'Unknown Team'),
-                            'grid_position': 'N/A',
-                            'position': 'N/A'
-                        }
-            
-            return driver_info
+            # Official results first, lap data when there are none (see SessionIndex)
+            index = self.get_session_index(session)
+            return {code: dict(info) for code, info in index.driver_info.items()}
         except Exception as e:
             print(f"Error getting driver info: {e}")
             return {}
@@ -196,4 +212,4 @@ class SessionManager:
         try:
             return hasattr(session, "laps") and not session.laps.empty
         except Exception:
-            return False
\ No newline at end of file
+            return False
\ No newline at end of file
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+
+from lap_data import CompactLap
+
+
+class SharedTelemetryStore:
+    # Optional host-wide store for extracted lap telemetry, shared by every server process.
+    # Each lap is a directory of plain .npy files (one per channel) plus meta.json; readers
+    # open the arrays with np.load(mmap_mode = "r"), so all processes map the same pages
+    # instead of each holding its own copy. Put the directory on a RAM-backed filesystem
+    # (e.g. /dev/shm) to make it true shared memory.
+    #
+    # Enabled by pointing F1_SHARED_TELEMETRY_DIR at a writable directory.
+
+    ENV_VAR = "F1_SHARED_TELEMETRY_DIR"
+    META_FILE = "meta.json"
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(self.root, exist_ok = True)
+
+    @classmethod
+    def from_env(cls):
+        # Store configured through the environment, or None when the backend is off
+        root = os.environ.get(cls.ENV_VAR)
+        return cls(root) if root else None
+
+    # ---------------- Lookup ----------------
+    def _lap_dir(self, key):
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+        return os.path.join(self.root, digest)
+
+    def get(self, key):
+        # Attach zero-copy to a lap some process already published, or None
+        path = self._lap_dir(key)
+        try:
+            with open(os.path.join(path, self.META_FILE), encoding = "utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if meta.get("key") != key:
+            return None
+
+        return CompactLap(
+            meta["driver"],
+            CompactLap.info_from_json(meta["info"]),
+            self.load_columns(path, meta["channels"]),
+            shared_path = path,
+        )
+
+    @classmethod
+    def load_columns(cls, path, channels = None):
+        if channels is None:
+            with open(os.path.join(path, cls.META_FILE), encoding = "utf-8") as f:
+                channels = json.load(f)["channels"]
+        return {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode = "r")
+            for name in channels
+        }
+
+    def index(self):
+        # Small index of everything published on this host: key -> (driver, samples)
+        entries = {}
+        for name in os.listdir(self.root):
+            try:
+                with open(os.path.join(self.root, name, self.META_FILE), encoding = "utf-8") as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            entries[meta["key"]] = {"driver": meta["driver"], "samples": meta["samples"]}
+        return entries
+
+    # ---------------- Publishing ----------------
+    def publish(self, key, lap):
+        # Write the lap once for the whole host and return the shared, memory-mapped copy.
+        # The lap is written to a private temporary directory and renamed into place, so
+        # readers never see a half-written lap; if another process won the race, its copy
+        # is used and ours is discarded.
+        existing = self.get(key)
+        if existing is not None:
+            return existing
+
+        path = self._lap_dir(key)
+        tmp_path = f"{path}.tmp-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        try:
+            os.makedirs(tmp_path)
+            for name, values in lap.columns.items():
+                np.save(os.path.join(tmp_path, f"{name}.npy"), np.ascontiguousarray(values))
+
+            meta = {
+                "key": key,
+                "driver": lap.driver,
+                "info": lap.info_to_json(),
+                "channels": list(lap.columns),
+                "samples": len(lap),
+            }
+            with open(os.path.join(tmp_path, self.META_FILE), "w", encoding = "utf-8") as f:
+                json.dump(meta, f)
+
+            os.rename(tmp_path, path)
+        except OSError:
+            # Lost the race (path already exists) or the directory is not writable
+            shutil.rmtree(tmp_path, ignore_errors = True)
+
+        shared = self.get(key)
+        return shared if shared is not None else lap
+
+    def clear(self):
+        for name in os.listdir(self.root):
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors = True)
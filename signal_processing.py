@@ -0,0 +1,64 @@
+from functools import lru_cache
+
+import numpy as np
+
+
+# ---------------- Signal-processing kernels ----------------
+# Savitzky-Golay smoothing and gap filling in NumPy. A filter's coefficients depend only on
+# (window, order), so they are computed once and cached; the signals to smooth are stacked
+# as the rows of one 2-D array (channels, laps, or both) and filtered in a single batched
+# product. Results match scipy.signal.savgol_filter's default "interp" mode, without
+# importing SciPy.
+
+@lru_cache(maxsize = None)
+def savgol_coeffs(window_length, polyorder):
+    # (interior weights, left-edge matrix, right-edge matrix) of the filter. Interior
+    # samples are the least-squares polynomial of the window centred on them, evaluated at
+    # the centre; the first / last half-window samples evaluate the polynomial fitted to
+    # the first / last full window, as savgol_filter's "interp" mode does.
+    half = window_length // 2
+    offsets = np.arange(window_length, dtype = float)
+    fit = np.linalg.pinv(np.vander(offsets - half, polyorder + 1, increasing = True))
+    interior = fit[0]
+
+    positions = np.vander(offsets - half, polyorder + 1, increasing = True)
+    edges = positions @ fit
+    left, right = edges[:half], edges[window_length - half:]
+    for array in (interior, left, right):
+        array.flags.writeable = False
+    return interior, left, right
+
+
+def fill_gaps(values):
+    # NaNs along the last axis replaced by the previous valid sample (the next one for
+    # leading NaNs). Rows without any valid sample stay NaN.
+    values = np.array(values, dtype = float)
+    valid = ~np.isnan(values)
+    if valid.all() or values.size == 0:
+        return values
+
+    index = np.arange(values.shape[-1])
+    previous = np.maximum.accumulate(np.where(valid, index, -1), axis = -1)
+    following = np.minimum.accumulate(np.where(valid, index, values.shape[-1])[..., ::-1], axis = -1)[..., ::-1]
+    source = np.where(previous >= 0, previous, np.minimum(following, values.shape[-1] - 1))
+    return np.take_along_axis(values, source, axis = -1)
+
+
+def savgol(values, window_length, polyorder, fill = True):
+    # Savitzky-Golay filter along the last axis of a 1-D signal or a 2-D stack of signals
+    # (each row filtered on its own). Gaps are filled first unless fill is False. A window
+    # longer than the signal is shortened to the longest odd one that fits.
+    values = fill_gaps(values) if fill else np.asarray(values, dtype = float)
+    n = values.shape[-1]
+    window_length = min(window_length, n if n % 2 else n - 1)
+    if window_length <= polyorder:
+        return values.copy()
+
+    interior, left, right = savgol_coeffs(window_length, polyorder)
+    half = window_length // 2
+    out = np.empty_like(values)
+    windows = np.lib.stride_tricks.sliding_window_view(values, window_length, axis = -1)
+    out[..., half:n - half] = windows @ interior
+    out[..., :half] = values[..., :window_length] @ left.T
+    out[..., n - half:] = values[..., n - window_length:] @ right.T
+    return out
@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+
+from lap_alignment import ensure_distance, distance_time, common_distance_grid, interp_rows
+from signal_processing import savgol
+from derived_channels import DerivedChannels
+from lap_events import find_corners, BRAKE_ON_PCT
+
+
+# ---------------- Time-loss attribution ----------------
+# The time delta of two laps on one distance grid, with each driver's speed, brake and
+# throttle resampled onto the same grid. Integrating the delta's derivative over a segment
+# gives the time won or lost there; the channels then say why (later braking, a higher
+# minimum speed, a better exit, a higher top speed). Every segment statistic is a reduceat
+# over the (drivers, grid) arrays, so a whole attribution table is one vectorised pass.
+
+SEGMENTATIONS = {"corners": "Corners & straights", "minisectors": "Mini-sectors"}
+
+# Margin that counts as a real difference for each cause: the largest margin relative to
+# its scale names the segment's dominant cause
+CAUSE_SCALES = {
+    "braking later": 5.0,           # m
+    "higher minimum speed": 1.0,    # km/h
+    "better exit": 2.0,             # km/h
+    "higher top speed": 2.0,        # km/h
+}
+
+
+class LapDelta:
+
+    def __init__(self, telemetry1, telemetry2, drivers = ("1", "2"), n_points = 2000, n_minisectors = 25):
+        self.drivers = tuple(drivers)
+        self.n_minisectors = n_minisectors
+        laps = [ensure_distance(telemetry1), ensure_distance(telemetry2)]
+        series = [distance_time(t) for t in laps]
+        distances = [d for d, _ in series]
+
+        # delta in seconds (driver2 - driver1), smoothed
+        self.x = common_distance_grid(distances, n_points)
+        times = interp_rows(self.x, distances, [t for _, t in series])
+        self.delta = savgol(times[1] - times[0], 31, 2)
+
+        def channel(name, fill):
+            values = [DerivedChannels(t).get(name) for t in laps]
+            return interp_rows(self.x, distances, [
+                v.astype(float) if v is not None else np.full(len(d), fill) for v, d in zip(values, distances)
+            ])
+
+        self.speed = channel("Speed", np.nan)
+        self.throttle = channel("throttle_pct", 100.0)
+        self.brake = channel("brake_pct", 0.0) > BRAKE_ON_PCT
+        self._tables = {}
+
+    @property
+    def final_gap(self):
+        return float(self.delta[-1])
+
+    # ---------------- Segments ----------------
+    def _corner_segments(self):
+        # Corner zones run from the last full-throttle sample of both drivers before an apex
+        # to the first one after it; overlapping zones (chicanes) merge. Straights fill the
+        # gaps. Returns (boundary indices into the grid, labels, kinds).
+        n = self.x.size
+        apexes = np.searchsorted(self.x, find_corners(self.x, self.speed[0]))
+        full = np.flatnonzero(np.nanmin(self.throttle, axis = 0) >= 98)
+        if apexes.size == 0:
+            return self._minisector_segments()
+
+        if full.size:
+            k = np.searchsorted(full, apexes)
+            entry = np.where(k > 0, full[np.maximum(k - 1, 0)], 0)
+            exit = np.where(k < full.size, full[np.minimum(k, full.size - 1)], n - 1)
+        else:
+            entry, exit = np.zeros_like(apexes), np.full_like(apexes, n - 1)
+
+        zones = []
+        for number, (a, b) in enumerate(zip(entry, exit), start = 1):
+            if zones and a <= zones[-1][1]:
+                zones[-1] = (zones[-1][0], max(b, zones[-1][1]), zones[-1][2] + [number])
+            else:
+                zones.append((a, b, [number]))
+
+        bounds, labels, kinds = [0], [], []
+        previous = "Start"
+        for a, b, numbers in zones:
+            name = f"T{numbers[0]}" if len(numbers) == 1 else f"T{numbers[0]}–T{numbers[-1]}"
+            if a > bounds[-1]:
+                bounds.append(a)
+                labels.append(f"{previous} → {name}")
+                kinds.append("straight")
+            if b > bounds[-1]:
+                bounds.append(b)
+                labels.append(name)
+                kinds.append("corner")
+            previous = name
+        if bounds[-1] < n - 1:
+            bounds.append(n - 1)
+            labels.append(f"{previous} → Finish")
+            kinds.append("straight")
+        return np.array(bounds), labels, kinds
+
+    def _minisector_segments(self):
+        bounds = np.unique(np.linspace(0, self.x.size - 1, self.n_minisectors + 1).round().astype(int))
+        labels = [f"MS{i}" for i in range(1, bounds.size)]
+        return bounds, labels, ["minisector"] * len(labels)
+
+    # ---------------- Attribution ----------------
+    def attribution(self, segmentation = "corners"):
+        # Segments ranked by time won or lost, each with its dominant cause. Differences are
+        # given in favour of the faster driver of the segment.
+        if segmentation not in self._tables:
+            segments = self._corner_segments() if segmentation == "corners" else self._minisector_segments()
+            self._tables[segmentation] = self._attribute(*segments)
+        return self._tables[segmentation]
+
+    def _attribute(self, bounds, labels, kinds):
+        starts, stops = bounds[:-1], bounds[1:]
+        kinds = np.array(kinds)
+
+        # Time change = the delta's derivative integrated over the segment (driver2 - driver1)
+        change = np.add.reduceat(np.diff(self.delta), starts)
+
+        # Per-driver channel statistics, one reduceat each over the (2, grid) arrays
+        speed = np.nan_to_num(self.speed, nan = 0.0)
+        v_min = np.minimum.reduceat(speed, starts, axis = 1)
+        v_max = np.maximum.reduceat(speed, starts, axis = 1)
+        v_entry, v_exit = speed[:, starts], speed[:, stops]
+        first_brake = np.minimum.reduceat(np.where(self.brake, np.arange(self.x.size), self.x.size), starts, axis = 1)
+        brakes = (first_brake < stops).all(axis = 0)
+        onset = self.x[np.minimum(first_brake, self.x.size - 1)]
+
+        # Margins of the faster driver over the slower one
+        faster = np.where(change > 0, 0, 1)   # driver2 lost time -> driver1 (row 0) was faster
+        rows = np.arange(starts.size)
+        f, s = faster, 1 - faster
+
+        def margin(values):
+            return values[f, rows] - values[s, rows]
+
+        corner = kinds != "straight"
+        margins = {
+            "braking later": np.where(corner & brakes, margin(onset), np.nan),
+            "higher minimum speed": np.where(corner, margin(v_min), np.nan),
+            "better exit": np.where(corner, margin(v_exit), margin(v_entry)),
+            "higher top speed": np.where(corner, np.nan, margin(v_max)),
+        }
+        scores = np.column_stack([margins[c] / CAUSE_SCALES[c] for c in CAUSE_SCALES])
+        scores = np.where(np.isnan(scores), -np.inf, scores)
+        best = scores.argmax(axis = 1)
+        causes = np.array(list(CAUSE_SCALES), dtype = object)[best]
+        causes = np.where(scores[rows, best] >= 1.0, causes, "no clear cause")
+
+        table = pd.DataFrame({
+            "Segment": labels,
+            "From (m)": self.x[starts].round(0),
+            "To (m)": self.x[stops].round(0),
+            "Faster": np.array(self.drivers, dtype = object)[faster],
+            "Time (s)": np.abs(change).round(3),
+            "Cause": causes,
+            "Braking Δ (m)": margins["braking later"].round(0),
+            "Min speed Δ (km/h)": margins["higher minimum speed"].round(1),
+            "Exit speed Δ (km/h)": margins["better exit"].round(1),
+        })
+        return table.sort_values("Time (s)", ascending = False, ignore_index = True)
@@ -0,0 +1,107 @@
+import base64
+import struct
+import zlib
+
+import numpy as np
+from plotly.colors import hex_to_rgb, sample_colorscale, unlabel_rgb
+
+
+# ---------------- Server-side track rasteriser ----------------
+# Draws circuit paths into an RGBA image with NumPy and encodes it as a PNG, so a dense
+# track map (every sample of a lap, many laps, full-field colouring) reaches the browser
+# as one image instead of thousands of SVG path segments.
+
+def rgba(color, alpha = 255):
+    # "#rrggbb", "rgb(r, g, b)" or a named grey used by the charts -> (r, g, b, a)
+    named = {"lightgray": (211, 211, 211), "white": (255, 255, 255), "black": (0, 0, 0)}
+    if color in named:
+        r, g, b = named[color]
+    elif color.startswith("#"):
+        r, g, b = hex_to_rgb(color)
+    else:
+        r, g, b = unlabel_rgb(color)
+    return np.array([r, g, b, alpha], dtype = np.uint8)
+
+
+def colorscale_lut(name, n = 256):
+    # (n, 4) uint8 lookup table sampled from a plotly colorscale
+    return np.stack([rgba(c) for c in sample_colorscale(name, list(np.linspace(0.0, 1.0, n)))])
+
+
+class TrackRaster:
+    # Canvas covering a set of circuit coordinates. Paths are drawn in order, later ones
+    # on top; the finished image is placed back on the figure in data coordinates, so
+    # vector traces (hover outline, markers) line up with it exactly.
+
+    def __init__(self, xs, ys, size_px = 1400, pad_px = 12):
+        x_min, x_max = float(np.nanmin(xs)), float(np.nanmax(xs))
+        y_min, y_max = float(np.nanmin(ys)), float(np.nanmax(ys))
+        span = max(x_max - x_min, y_max - y_min, 1e-9)
+
+        # data units per pixel; the longer side gets size_px pixels
+        self.res = span / (size_px - 2 * pad_px)
+        self.x0 = x_min - pad_px * self.res
+        self.y0 = y_max + pad_px * self.res
+        self.width = int(np.ceil((x_max - x_min) / self.res)) + 2 * pad_px
+        self.height = int(np.ceil((y_max - y_min) / self.res)) + 2 * pad_px
+        self.canvas = np.zeros((self.height, self.width, 4), dtype = np.uint8)
+
+    def draw(self, x, y, colors, width_px):
+        # Polyline through (x, y); colors is one RGBA for the whole path or one per
+        # segment (len(x) - 1 rows). NaN coordinates break the line.
+        px = (np.asarray(x, dtype = float) - self.x0) / self.res
+        py = (self.y0 - np.asarray(y, dtype = float)) / self.res
+        if px.size < 2:
+            return
+        colors = np.asarray(colors, dtype = np.uint8)
+        if colors.ndim == 1:
+            colors = np.broadcast_to(colors, (px.size - 1, 4))
+
+        # Densify every segment to half-pixel steps
+        dx, dy = np.diff(px), np.diff(py)
+        valid = np.isfinite(dx) & np.isfinite(dy)
+        steps = np.where(valid, np.maximum(np.ceil(np.hypot(dx, dy) * 2), 1), 0).astype(np.int64)
+        segment = np.repeat(np.arange(steps.size), steps)
+        t = (np.arange(segment.size) - np.repeat(np.cumsum(steps) - steps, steps)) / np.repeat(steps, steps)
+        sx = np.rint(px[segment] + t * dx[segment]).astype(np.int64)
+        sy = np.rint(py[segment] + t * dy[segment]).astype(np.int64)
+        color = colors[segment]
+
+        # Stamp a disc of the line width at every sample
+        r = max(width_px / 2.0, 0.5)
+        reach = int(np.ceil(r))
+        oy, ox = np.mgrid[-reach:reach + 1, -reach:reach + 1]
+        disc = (ox ** 2 + oy ** 2) <= r * r
+        for dx_px, dy_px in zip(ox[disc], oy[disc]):
+            cx, cy = sx + dx_px, sy + dy_px
+            inside = (cx >= 0) & (cx < self.width) & (cy >= 0) & (cy < self.height)
+            self.canvas[cy[inside], cx[inside]] = color[inside]
+
+    def to_png(self):
+        # Minimal RGBA PNG: one zlib stream of rows, each with filter byte 0
+        rows = np.concatenate(
+            (np.zeros((self.height, 1), dtype = np.uint8), self.canvas.reshape(self.height, -1)), axis = 1
+        )
+
+        def chunk(tag, data):
+            return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+        header = struct.pack(">IIBBBBB", self.width, self.height, 8, 6, 0, 0, 0)
+        return (
+            b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(rows.tobytes(), 6))
+            + chunk(b"IEND", b"")
+        )
+
+    def add_to_figure(self, fig):
+        # The image as a layout image under the traces, stretched over its data extent
+        fig.add_layout_image(
+            source = "data:image/png;base64," + base64.b64encode(self.to_png()).decode("ascii"),
+            xref = "x", yref = "y",
+            x = self.x0, y = self.y0,
+            sizex = self.width * self.res, sizey = self.height * self.res,
+            xanchor = "left", yanchor = "top",
+            sizing = "stretch", layer = "below",
+        )
+        return fig
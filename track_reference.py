@@ -0,0 +1,90 @@
+import numpy as np
+
+from lap_alignment import ensure_distance
+from signal_processing import fill_gaps
+
+
+# ---------------- Position-based lap alignment ----------------
+# Lap distance drifts between cars (line choice, GPS noise), so comparing laps by their own
+# Distance lets errors build up through the lap. A TrackReference is the circuit's line,
+# taken from one reference lap; every sample's X / Y is projected onto it, which gives all
+# drivers the same along-track coordinate. The line's vertices sit in a KD-tree built once
+# per circuit, and a whole field is projected with one query.
+
+class TrackReference:
+
+    def __init__(self, telemetry, spacing_m = 2.0):
+        telemetry = ensure_distance(telemetry)
+        d = np.maximum.accumulate(telemetry["Distance"].to_numpy(float))
+        xy = fill_gaps(np.vstack((telemetry["X"].to_numpy(float), telemetry["Y"].to_numpy(float))))
+        d, first = np.unique(d, return_index = True)
+
+        # Vertices every spacing_m metres of the reference lap
+        grid = np.append(np.arange(d[0], d[-1], spacing_m), d[-1])
+        self.s = grid - d[0]
+        self.points = np.column_stack((np.interp(grid, d, xy[0, first]), np.interp(grid, d, xy[1, first])))
+        self.length = float(self.s[-1])
+
+        # Circuit units per metre (FastF1 X / Y are in 0.1 m)
+        path = np.hypot(*np.diff(self.points, axis = 0).T).sum()
+        self.units_per_m = path / self.length if self.length > 0 else 1.0
+        self._tree = None
+
+    @property
+    def tree(self):
+        if self._tree is None:
+            from scipy.spatial import cKDTree  # SciPy is slow to import; only load it when aligning
+            self._tree = cKDTree(self.points)
+        return self._tree
+
+    def project(self, x, y, hint, k = 4, hint_weight = 0.05):
+        # Along-track coordinate (m) of every (x, y): the closest point on the segments either
+        # side of the k nearest vertices. Where the track passes close to itself, the
+        # expected coordinate (hint, m) decides: each metre away from it counts hint_weight
+        # metres of offset. Far-off projections fall back to the hint.
+        p = np.column_stack((x, y))
+        _, nearest = self.tree.query(p, k = k)
+        nearest = nearest.reshape(len(p), -1)
+
+        last = len(self.s) - 2
+        segment = np.concatenate((np.clip(nearest - 1, 0, last), np.clip(nearest, 0, last)), axis = 1)
+        a, b = self.points[segment], self.points[segment + 1]
+        ab = b - a
+        t = np.clip(((p[:, None] - a) * ab).sum(-1) / np.maximum((ab ** 2).sum(-1), 1e-12), 0.0, 1.0)
+        offset = np.hypot(*(a + t[..., None] * ab - p[:, None]).transpose(2, 0, 1)) / self.units_per_m
+        s = self.s[segment] + t * (self.s[segment + 1] - self.s[segment])
+
+        best = np.argmin(offset + hint_weight * np.abs(s - hint[:, None]), axis = 1)
+        s = s[np.arange(len(p)), best]
+        return np.where(np.abs(s - hint) > 0.1 * self.length, hint, s)
+
+    def align_many(self, telemetries):
+        # Shallow copies of the laps with Distance replaced by the along-track coordinate,
+        # all projected in one query. Laps without X / Y keep their own Distance.
+        telemetries = [ensure_distance(t) for t in telemetries]
+        usable = [
+            i for i, t in enumerate(telemetries)
+            if "X" in t.columns and "Y" in t.columns and len(t) > 1 and t["X"].notna().any() and t["Y"].notna().any()
+        ]
+        if not usable:
+            return telemetries
+
+        xs, ys, hints = [], [], []
+        for i in usable:
+            t = telemetries[i]
+            d = np.maximum.accumulate(t["Distance"].to_numpy(float))
+            xy = fill_gaps(np.vstack((t["X"].to_numpy(float), t["Y"].to_numpy(float))))
+            xs.append(xy[0])
+            ys.append(xy[1])
+            hints.append((d - d[0]) * self.length / max(d[-1] - d[0], 1.0))
+
+        s = self.project(np.concatenate(xs), np.concatenate(ys), np.concatenate(hints))
+        aligned = list(telemetries)
+        for i, lap_s in zip(usable, np.split(s, np.cumsum([len(h) for h in hints])[:-1])):
+            frame = telemetries[i].copy(deep = False)
+            frame["Distance"] = np.maximum.accumulate(lap_s)
+            aligned[i] = frame
+        return aligned
+
+    def align(self, telemetry):
+        return self.align_many([telemetry])[0]